@@ -3,8 +3,8 @@
 התיק החכם - גרסה מתקדמת עם UI משופר
 """
 
+import os
 import uuid
-import io
 import requests
 from datetime import datetime
 import pandas as pd
@@ -12,10 +12,27 @@ import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import yfinance as yf
 import warnings
+from core.ledger import TradeLedger, export_columns
+from core.portfolio_db import DEFAULT_USER, load_ledger, save_ledger
+from core.data import (
+    load_close_panel, load_return_panel, load_stock_data, load_many, latest_prices, period_since, slice_period
+)
+from core.memo import get_advanced_indicators, get_recommendations, indicator_cache
+from core.intraday import INTERVALS, load_intraday
+from core.providers import get_provider
+from core.screener import list_universes, load_universe, screen_universe
+from core.backtest import PERIODS_PER_YEAR, RULES, backtest_indicators, summarize
+from core.timing import TIMING_JSON, TIMING_LOG, begin_run, stage, timed, write_json
+from core.risk import BENCHMARK as RISK_BENCHMARK, portfolio_risk
+from core.valuation import equity_curve, totals, valuate
+from utils.charts import candlestick_figure
+from utils.export import csv_bytes, portfolio_sheets, read_export, submit_workbook, to_arrow_ipc, to_parquet
 warnings.filterwarnings('ignore')
 
+# מדידת זמנים לכל rerun (מוצגת בחלונית הדיבאג: ?debug=1 או STOCK_TRACKER_DEBUG=1)
+timing_run = begin_run()
+
 # ----------------------------------------------------------------------
 # 1️⃣ הגדרות וסטייל
 # ----------------------------------------------------------------------
@@ -164,114 +181,16 @@ h1, h2, h3, h4 {
 # 2️⃣ פונקציות ליבה
 # ----------------------------------------------------------------------
 
-@st.cache_data(ttl=3600)
-def load_stock_data(ticker):
-    """טוען נתוני מניות"""
-    try:
-        df = yf.download(ticker, period="6mo", progress=False, auto_adjust=True)
-        
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        
-        if df.empty:
-            return None, None, ticker
-        
-        info = {}
-        full_name = ticker
-        
-        try:
-            t_obj = yf.Ticker(ticker)
-            info = t_obj.info
-            full_name = info.get('longName', info.get('shortName', ticker))
-        except:
-            pass
-        
-        return df, info, full_name
-        
-    except Exception as e:
-        return None, None, ticker
-
-def calculate_advanced_indicators(df):
-    """מחשב את כל האינדיקטורים הטכניים"""
-    df_calc = df.copy()
-    
-    if 'Close' not in df_calc.columns:
-        if 'Adj Close' in df_calc.columns:
-            df_calc['Close'] = df_calc['Adj Close']
-        else:
-            return df_calc
-    
-    # ===== ממוצעים נעים =====
-    df_calc['SMA_10'] = df_calc['Close'].rolling(10, min_periods=1).mean()
-    df_calc['SMA_20'] = df_calc['Close'].rolling(20, min_periods=1).mean()
-    df_calc['SMA_50'] = df_calc['Close'].rolling(50, min_periods=1).mean()
-    df_calc['SMA_200'] = df_calc['Close'].rolling(200, min_periods=1).mean()
-    
-    # ===== EMA =====
-    df_calc['EMA_12'] = df_calc['Close'].ewm(span=12, min_periods=1).mean()
-    df_calc['EMA_26'] = df_calc['Close'].ewm(span=26, min_periods=1).mean()
-    
-    # ===== MACD =====
-    df_calc['MACD'] = df_calc['EMA_12'] - df_calc['EMA_26']
-    df_calc['MACD_Signal'] = df_calc['MACD'].ewm(span=9, min_periods=1).mean()
-    df_calc['MACD_Histogram'] = df_calc['MACD'] - df_calc['MACD_Signal']
-    
-    # ===== RSI =====
-    delta = df_calc['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    
-    avg_gain = gain.rolling(14, min_periods=1).mean()
-    avg_loss = loss.rolling(14, min_periods=1).mean()
-    
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    df_calc['RSI'] = 100 - (100 / (1 + rs))
-    df_calc['RSI'] = df_calc['RSI'].fillna(50)
-    
-    # ===== Bollinger Bands =====
-    df_calc['BB_Middle'] = df_calc['Close'].rolling(20, min_periods=1).mean()
-    bb_std = df_calc['Close'].rolling(20, min_periods=1).std().fillna(0)
-    df_calc['BB_Upper'] = df_calc['BB_Middle'] + (bb_std * 2)
-    df_calc['BB_Lower'] = df_calc['BB_Middle'] - (bb_std * 2)
-    df_calc['BB_Width'] = (df_calc['BB_Upper'] - df_calc['BB_Lower']) / df_calc['BB_Middle']
-    
-    # ===== Stochastic =====
-    low_14 = df_calc['Low'].rolling(14, min_periods=1).min()
-    high_14 = df_calc['High'].rolling(14, min_periods=1).max()
-    df_calc['%K'] = 100 * ((df_calc['Close'] - low_14) / (high_14 - low_14).replace(0, np.nan))
-    df_calc['%D'] = df_calc['%K'].rolling(3, min_periods=1).mean()
-    
-    # ===== ATR (Average True Range) =====
-    high_low = df_calc['High'] - df_calc['Low']
-    high_close = np.abs(df_calc['High'] - df_calc['Close'].shift())
-    low_close = np.abs(df_calc['Low'] - df_calc['Close'].shift())
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df_calc['ATR'] = true_range.rolling(14, min_periods=1).mean()
-    
-    # ===== Volume Indicators =====
-    df_calc['Volume_SMA'] = df_calc['Volume'].rolling(20, min_periods=1).mean()
-    df_calc['Volume_Ratio'] = df_calc['Volume'] / df_calc['Volume_SMA'].replace(0, np.nan)
-    df_calc['Volume_Ratio'] = df_calc['Volume_Ratio'].fillna(1)
-    
-    # ===== Momentum Indicators =====
-    df_calc['Momentum'] = df_calc['Close'] - df_calc['Close'].shift(10)
-    df_calc['ROC'] = ((df_calc['Close'] - df_calc['Close'].shift(10)) / df_calc['Close'].shift(10)) * 100
-    
-    # ===== Support & Resistance =====
-    df_calc['Resistance_20'] = df_calc['High'].rolling(20, min_periods=1).max()
-    df_calc['Support_20'] = df_calc['Low'].rolling(20, min_periods=1).min()
-    
-    return df_calc
-
+@timed('app.market_sentiment')
 def get_market_sentiment():
     """מביא נתוני שוק כלליים"""
     sentiment_data = {}
     
     # שער דולר/שקל
+    sentiment_data['usd_ils'] = {'rate': 3.65, 'change': -0.5}
     try:
-        usd_ticker = yf.Ticker("USDILS=X")
-        usd_hist = usd_ticker.history(period="1d")
-        if not usd_hist.empty:
+        usd_hist = get_provider().history(["USDILS=X"], period="5d").get("USDILS=X")
+        if usd_hist is not None and not usd_hist.empty:
             usd_rate = usd_hist['Close'].iloc[-1]
             usd_change = ((usd_hist['Close'].iloc[-1] - usd_hist['Open'].iloc[-1]) / usd_hist['Open'].iloc[-1]) * 100
             sentiment_data['usd_ils'] = {
@@ -279,7 +198,7 @@ def get_market_sentiment():
                 'change': round(usd_change, 2)
             }
     except:
-        sentiment_data['usd_ils'] = {'rate': 3.65, 'change': -0.5}
+        pass
     
     # מדדי שוק (סימולציה)
     sectors = {
@@ -315,142 +234,6 @@ def get_market_sentiment():
     
     return sentiment_data
 
-def get_trading_recommendations(df, indicators):
-    """מספק המלצות מסחר מפורטות לפי אינדיקטורים"""
-    recommendations = []
-    last = df.iloc[-1]
-    
-    # ===== RSI המלצות =====
-    if 'RSI' in last:
-        rsi = last['RSI']
-        if rsi > 70:
-            recommendations.append({
-                'indicator': 'RSI',
-                'value': f"{rsi:.1f}",
-                'action': 'מכירה',
-                'reason': 'קניית יתר - RSI מעל 70',
-                'confidence': 'גבוהה',
-                'details': 'המניה בקניית יתר. שקול מכירה חלקית או הגנה עם Stop-Loss'
-            })
-        elif rsi < 30:
-            recommendations.append({
-                'indicator': 'RSI',
-                'value': f"{rsi:.1f}",
-                'action': 'קנייה',
-                'reason': 'מכירת יתר - RSI מתחת 30',
-                'confidence': 'גבוהה',
-                'details': 'המניה במכירת יתר. הזדמנות לכניסה עם Stop-Loss מתחת לתמיכה'
-            })
-        else:
-            recommendations.append({
-                'indicator': 'RSI',
-                'value': f"{rsi:.1f}",
-                'action': 'המתנה',
-                'reason': 'RSI בטווח ניטרלי',
-                'confidence': 'נמוכה',
-                'details': 'אין איתות ברור. המתין לאיתות חדש'
-            })
-    
-    # ===== MACD המלצות =====
-    if 'MACD' in last and 'MACD_Signal' in last:
-        if last['MACD'] > last['MACD_Signal']:
-            recommendations.append({
-                'indicator': 'MACD',
-                'value': f"{last['MACD']:.4f} > {last['MACD_Signal']:.4f}",
-                'action': 'קנייה',
-                'reason': 'MACD מעל קו הסיגנל',
-                'confidence': 'בינונית',
-                'details': 'מומנטום חיובי. ניתן להיכנס עם Stop-Loss מתחת ל-SMA 20'
-            })
-        else:
-            recommendations.append({
-                'indicator': 'MACD',
-                'value': f"{last['MACD']:.4f} < {last['MACD_Signal']:.4f}",
-                'action': 'מכירה',
-                'reason': 'MACD מתחת לקו הסיגנל',
-                'confidence': 'בינונית',
-                'details': 'מומנטום שלילי. שקול מכירה או Short'
-            })
-    
-    # ===== Bollinger Bands המלצות =====
-    if 'Close' in last and 'BB_Upper' in last and 'BB_Lower' in last:
-        if last['Close'] > last['BB_Upper']:
-            recommendations.append({
-                'indicator': 'Bollinger Bands',
-                'value': 'מחיר מעל הרצועה העליונה',
-                'action': 'מכירה',
-                'reason': 'מחיר חורג מהרצועה העליונה',
-                'confidence': 'גבוהה',
-                'details': 'יתר קנייה. צפוי תיקון. מכור או Short עם Stop-Loss מעל השיא'
-            })
-        elif last['Close'] < last['BB_Lower']:
-            recommendations.append({
-                'indicator': 'Bollinger Bands',
-                'value': 'מחיר מתחת לרצועה התחתונה',
-                'action': 'קנייה',
-                'reason': 'מחיר חורג מהרצועה התחתונה',
-                'confidence': 'גבוהה',
-                'details': 'הזדמנות קנייה. היכנס עם Stop-Loss מתחת לשפל'
-            })
-    
-    # ===== ממוצעים נעים המלצות =====
-    if 'SMA_20' in last and 'SMA_50' in last and 'SMA_200' in last:
-        # Golden Cross / Death Cross
-        if last['SMA_20'] > last['SMA_50'] > last['SMA_200']:
-            recommendations.append({
-                'indicator': 'ממוצעים נעים',
-                'value': '20 > 50 > 200',
-                'action': 'קנייה',
-                'reason': 'ממוצעים מסודרים לעלייה (Golden Cross)',
-                'confidence': 'גבוהה',
-                'details': 'מגמה עולה חזקה. קנה במשיכות למטה'
-            })
-        elif last['SMA_20'] < last['SMA_50'] < last['SMA_200']:
-            recommendations.append({
-                'indicator': 'ממוצעים נעים',
-                'value': '20 < 50 < 200',
-                'action': 'מכירה',
-                'reason': 'ממוצעים מסודרים לירידה (Death Cross)',
-                'confidence': 'גבוהה',
-                'details': 'מגמה יורדת חזקה. מכור בגואים'
-            })
-    
-    # ===== Stochastic המלצות =====
-    if '%K' in last and '%D' in last:
-        if last['%K'] > 80 and last['%D'] > 80:
-            recommendations.append({
-                'indicator': 'Stochastic',
-                'value': f"%K={last['%K']:.1f}, %D={last['%D']:.1f}",
-                'action': 'מכירה',
-                'reason': 'Stochastic בקניית יתר',
-                'confidence': 'בינונית',
-                'details': 'שקול מכירה חלקית או הגנה'
-            })
-        elif last['%K'] < 20 and last['%D'] < 20:
-            recommendations.append({
-                'indicator': 'Stochastic',
-                'value': f"%K={last['%K']:.1f}, %D={last['%D']:.1f}",
-                'action': 'קנייה',
-                'reason': 'Stochastic במכירת יתר',
-                'confidence': 'בינונית',
-                'details': 'הזדמנות קנייה. היכנס בהדרגה'
-            })
-    
-    # ===== ATR המלצות =====
-    if 'ATR' in last:
-        atr_percent = (last['ATR'] / last['Close']) * 100
-        if atr_percent > 3:
-            recommendations.append({
-                'indicator': 'ATR',
-                'value': f"{atr_percent:.1f}%",
-                'action': 'זהירות',
-                'reason': 'תנודתיות גבוהה',
-                'confidence': 'בינונית',
-                'details': 'תנודתיות גבוהה - הגדר Stop-Loss רחב יותר'
-            })
-    
-    return recommendations
-
 def get_company_logo_url(ticker):
     """מביא URL ללוגו החברה"""
     # מאגר לוגואים ידועים
@@ -470,47 +253,51 @@ def get_company_logo_url(ticker):
 # ----------------------------------------------------------------------
 # 3️⃣ Session State
 # ----------------------------------------------------------------------
-if "trades" not in st.session_state:
-    st.session_state.trades = {}
-if "portfolio" not in st.session_state:
-    st.session_state.portfolio = pd.DataFrame(
-        columns=["Ticker", "EntryPrice", "Shares", "Date", "TradeID"]
-    )
+# יומן העסקאות הוא מקור האמת היחיד לפוזיציות (core/ledger.py), שמור ב-SQLite
+# לכל משתמש (core/portfolio_db.py); המשתמש נבחר דרך ?user= בכתובת
+portfolio_user = st.query_params.get("user") or DEFAULT_USER
+if "ledger" not in st.session_state or st.session_state.get("ledger_user") != portfolio_user:
+    try:
+        st.session_state.ledger = load_ledger(portfolio_user)
+    except Exception as e:
+        st.warning(f"⚠️  לא הצלחנו לטעון את התיק השמור: {str(e)}")
+        st.session_state.ledger = TradeLedger()
+    st.session_state.ledger_user = portfolio_user
+    st.session_state.pop("excel_export", None)
+
+# קידומת לקובצי הייצוא של הסשן - הניקוי בייצוא חדש לא נוגע בקבצים של סשנים אחרים
+if "export_prefix" not in st.session_state:
+    st.session_state.export_prefix = f"portfolio_{uuid.uuid4().hex[:8]}_"
+
+def persist_trades():
+    """כתיבת השינויים הממתינים למסד (בכישלון הם נשארים ממתינים לניסיון הבא)"""
+    try:
+        save_ledger(st.session_state.ledger, portfolio_user)
+    except Exception as e:
+        st.warning(f"⚠️  לא הצלחנו לשמור את התיק: {str(e)}")
 
 def add_trade(ticker: str, price: float, shares: int = 1):
     """הוספת פוזיציה חדשה"""
-    trade_id = uuid.uuid4().hex[:8]
-    now = datetime.now()
-    
-    st.session_state.trades[trade_id] = {
-        "Ticker": ticker,
-        "Price": round(price, 2),
-        "Shares": shares,
-        "Date": now.strftime("%Y-%m-%d %H:%M"),
-        "TradeID": trade_id
-    }
-    
-    new_row = {
-        "Ticker": ticker,
-        "EntryPrice": round(price, 2),
-        "Shares": shares,
-        "Date": now,
-        "TradeID": trade_id
-    }
-    st.session_state.portfolio = pd.concat(
-        [st.session_state.portfolio, pd.DataFrame([new_row])],
-        ignore_index=True,
-    )
+    trade_id = st.session_state.ledger.append(ticker, round(price, 2), shares)
+    persist_trades()
+    # קובץ ה-Excel שהוכן כבר לא משקף את היומן
+    st.session_state.pop("excel_export", None)
+    return trade_id
 
 def delete_trade(trade_id: str):
     """מחיקת פוזיציה"""
-    if trade_id in st.session_state.trades:
-        del st.session_state.trades[trade_id]
-        st.session_state.portfolio = st.session_state.portfolio[
-            st.session_state.portfolio["TradeID"] != trade_id
-        ]
-        return True
-    return False
+    deleted = st.session_state.ledger.delete(trade_id)
+    if deleted:
+        persist_trades()
+        st.session_state.pop("excel_export", None)
+    return deleted
+
+@st.fragment(run_every=1)
+def wait_for_export(future):
+    """בודק כל שנייה אם ייצוא הרקע הסתיים, ומריץ את הדף מחדש כשהוא מוכן"""
+    if future.done():
+        st.rerun()
+    st.caption("⏳ מכין קובץ Excel ברקע...")
 
 # ----------------------------------------------------------------------
 # 4️⃣ כותרת וחיפוש
@@ -532,6 +319,10 @@ with col_search2:
         placeholder="לדוגמה: AAPL, TSLA, GOOGL",
         help="יש להזין סימול מנייה באנגלית"
     ).upper().strip()
+    
+    # מרווח הנרות: יומי מההיסטוריה הקנונית, תוך-יומי מהחוצצים בזיכרון (core/intraday)
+    interval_map = {"יומי": "1d", "שעה": "1h", "15 דקות": "15m", "5 דקות": "5m", "דקה": "1m"}
+    bar_interval = interval_map[st.radio("**⏱️ מרווח נרות:**", list(interval_map), horizontal=True, key="bar_interval")]
 
 # מניות מובילות
 st.markdown("### 📋 מניות מובילות")
@@ -549,20 +340,30 @@ for idx, stock in enumerate(popular_stocks):
 # ----------------------------------------------------------------------
 if ticker_input:
     with st.spinner(f"טוען נתונים עבור {ticker_input}..."):
-        df_price, stock_info, full_name = load_stock_data(ticker_input)
+        with stage('data.load_stock_data', cache='hit'):
+            df_price, stock_info, full_name = load_stock_data(ticker_input)
     
     if df_price is None or df_price.empty:
         st.error(f"❌ לא נמצאו נתונים עבור {ticker_input}")
         st.stop()
     
-    # טעינת אינדיקטורים
-    df_with_indicators = calculate_advanced_indicators(df_price)
+    if bar_interval != "1d":
+        with stage('data.load_intraday', interval=bar_interval):
+            df_intraday = load_intraday([ticker_input], bar_interval).get(ticker_input)
+        if df_intraday is None or len(df_intraday) < 5:
+            st.warning(f"⚠️  אין נתונים תוך-יומיים עבור {ticker_input} - מוצגים נרות יומיים")
+            bar_interval = "1d"
+        else:
+            df_price = df_intraday
+    
+    # טעינת אינדיקטורים (מה-cache כל עוד נתוני המחיר לא השתנו)
+    df_with_indicators = get_advanced_indicators(ticker_input, df_price)
     
     # נתוני שוק
     market_data = get_market_sentiment()
     
     # המלצות מסחר
-    trading_recommendations = get_trading_recommendations(df_with_indicators, df_with_indicators.columns)
+    trading_recommendations = get_recommendations(ticker_input, df_with_indicators)
     
     # לוגו החברה
     logo_url = get_company_logo_url(ticker_input)
@@ -587,7 +388,7 @@ with col_name:
 
     
     # טאבים ראשיים
-    tab_names = ["📊 גרף נרות", "📈 ניתוח טכני", "🏢 נתונים פונדמנטליים", "💼 ניהול פוזיציות", "🌐 מצב השוק"]
+    tab_names = ["📊 גרף נרות", "📈 ניתוח טכני", "🏢 נתונים פונדמנטליים", "💼 ניהול פוזיציות", "🌐 מצב השוק", "🔎 סורק מניות"]
     tabs = st.tabs(tab_names)
     
     # ==============================================================
@@ -611,49 +412,18 @@ with col_name:
             "2 שנים": "2y"
         }
         
-        # טעינת נתונים לפי התקופה
-        period_df = yf.download(ticker_input, period=period_map[period], progress=False, auto_adjust=True)
-        if isinstance(period_df.columns, pd.MultiIndex):
-            period_df.columns = period_df.columns.get_level_values(0)
-        
-        # יצירת גרף נרות
-        fig_candles = go.Figure(data=[go.Candlestick(
-            x=period_df.index,
-            open=period_df['Open'],
-            high=period_df['High'],
-            low=period_df['Low'],
-            close=period_df['Close'],
-            name='מחיר'
-        )])
-        
-        # הוספת ממוצעים נעים
-        period_df['SMA_20'] = period_df['Close'].rolling(20, min_periods=1).mean()
-        period_df['SMA_50'] = period_df['Close'].rolling(50, min_periods=1).mean()
-        
-        fig_candles.add_trace(go.Scatter(
-            x=period_df.index,
-            y=period_df['SMA_20'],
-            name="ממוצע 20 ימים",
-            line=dict(color='orange', width=1)
-        ))
-        
-        fig_candles.add_trace(go.Scatter(
-            x=period_df.index,
-            y=period_df['SMA_50'],
-            name="ממוצע 50 ימים",
-            line=dict(color='purple', width=1)
-        ))
-        
-        fig_candles.update_layout(
-            title=f"גרף נרות - {period}",
-            xaxis_title="תאריך",
-            yaxis_title="מחיר (USD)",
-            template="plotly_white",
-            height=600,
-            xaxis_rangeslider_visible=True
-        )
+        # חיתוך ההיסטוריה הקנונית לפי התקופה (ללא קריאת רשת נוספת)
+        with stage('tab1.slice_period'):
+            period_df = slice_period(df_with_indicators, period_map[period])
         
-        st.plotly_chart(fig_candles, use_container_width=True)
+        with stage('tab1.figure', bars=len(period_df)):
+            # גרף נרות; טווח ארוך מאוחד לנרות רחבים יותר והממוצעים מוקטנים ב-LTTB (utils/charts)
+            fig_candles = candlestick_figure(
+                period_df, f"גרף נרות - {period}", bar_label="ימים" if bar_interval == "1d" else "נרות"
+            )
+        
+        with stage('tab1.plotly_chart'):
+            st.plotly_chart(fig_candles, use_container_width=True)
         
         # סטטיסטיקות מהירות
         col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
@@ -665,12 +435,12 @@ with col_name:
         with col_stats2:
             daily_change = ((df_with_indicators['Close'].iloc[-1] - df_with_indicators['Close'].iloc[-2]) / 
                           df_with_indicators['Close'].iloc[-2]) * 100 if len(df_with_indicators) > 1 else 0
-            st.metric("שינוי יומי", f"{daily_change:+.2f}%")
+            st.metric("שינוי יומי" if bar_interval == "1d" else "שינוי מהנר הקודם", f"{daily_change:+.2f}%")
         
         with col_stats3:
-            monthly_change = ((df_with_indicators['Close'].iloc[-1] - df_with_indicators['Close'].iloc[0]) / 
-                            df_with_indicators['Close'].iloc[0]) * 100
-            st.metric("שינוי חודשי", f"{monthly_change:+.2f}%")
+            period_change = ((period_df['Close'].iloc[-1] - period_df['Close'].iloc[0]) / 
+                           period_df['Close'].iloc[0]) * 100
+            st.metric(f"שינוי ({period})", f"{period_change:+.2f}%")
         
         with col_stats4:
             volume = df_with_indicators['Volume'].iloc[-1]
@@ -786,6 +556,79 @@ with col_name:
             st.markdown("**איתותים פעילים:**")
             active_signals = sum(1 for rec in trading_recommendations if rec['confidence'] in ['גבוהה', 'בינונית'])
             st.metric("איתותים", active_signals)
+        
+        # בדיקה היסטורית של הכללים על כל ההיסטוריה הטעונה
+        with st.expander("🧪 בדיקה היסטורית (Backtest)"):
+            col_bt1, col_bt2, col_bt3 = st.columns(3)
+            with col_bt1:
+                bt_rule = st.selectbox("כלל מסחר", list(RULES), format_func=RULES.get, key="bt_rule")
+            with col_bt2:
+                bt_cost = st.number_input("עמלה (נקודות בסיס)", min_value=0.0, value=5.0, step=1.0, key="bt_cost")
+            with col_bt3:
+                bt_slippage = st.number_input("החלקה (נקודות בסיס)", min_value=0.0, value=5.0, step=1.0, key="bt_slippage")
+            
+            with stage('tab2.backtest'):
+                bt_sim, _ = backtest_indicators(df_with_indicators, bt_rule, bt_cost, bt_slippage)
+                bars_per_year = INTERVALS[bar_interval].bars_per_year if bar_interval != "1d" else PERIODS_PER_YEAR
+                bt = summarize(bt_sim, periods_per_year=bars_per_year).iloc[0]
+            
+            col_btm1, col_btm2, col_btm3, col_btm4, col_btm5 = st.columns(5)
+            with col_btm1:
+                st.metric("תשואת האסטרטגיה", f"{bt['Total Return']:+.1%}",
+                          f"{bt['Total Return'] - bt['Buy & Hold']:+.1%} מול קנה והחזק")
+            with col_btm2:
+                st.metric("ירידה מקסימלית", f"{bt['Max Drawdown']:.1%}")
+            with col_btm3:
+                st.metric("עסקאות מרוויחות", f"{bt['Hit Rate']:.0%}" if bt['Trades'] else "-")
+            with col_btm4:
+                st.metric("עסקאות", int(bt['Trades']))
+            with col_btm5:
+                st.metric("מחזור שנתי", f"{bt['Turnover']:.1f}x")
+            
+            with stage('tab2.backtest_chart'):
+                fig_bt = go.Figure()
+                fig_bt.add_trace(go.Scatter(
+                    x=df_with_indicators.index, y=bt_sim['equity'],
+                    name="אסטרטגיה", line=dict(color='#2c3e50', width=2)
+                ))
+                fig_bt.add_trace(go.Scatter(
+                    x=df_with_indicators.index, y=np.cumprod(1 + bt_sim['asset']),
+                    name="קנה והחזק", line=dict(color='#95a5a6', width=1)
+                ))
+                fig_bt.update_layout(
+                    title="עקומת הון (1 = השקעה התחלתית)",
+                    template="plotly_white",
+                    height=350
+                )
+                st.plotly_chart(fig_bt, use_container_width=True)
+        
+        # כל ההיסטוריה עם האינדיקטורים, לניתוח חיצוני (pd.read_parquet / pd.read_feather)
+        with st.expander("💾 ייצוא אינדיקטורים"):
+            col_ind1, col_ind2, col_ind3 = st.columns(3)
+            with col_ind1:
+                st.download_button(
+                    label="⬇️ Parquet",
+                    data=lambda df=df_with_indicators: to_parquet(df),
+                    file_name=f"{ticker_input}_indicators.parquet",
+                    mime="application/vnd.apache.parquet",
+                    use_container_width=True
+                )
+            with col_ind2:
+                st.download_button(
+                    label="⬇️ Arrow",
+                    data=lambda df=df_with_indicators: to_arrow_ipc(df),
+                    file_name=f"{ticker_input}_indicators.arrow",
+                    mime="application/vnd.apache.arrow.file",
+                    use_container_width=True
+                )
+            with col_ind3:
+                st.download_button(
+                    label="⬇️ CSV",
+                    data=lambda df=df_with_indicators: csv_bytes(df, index=True),
+                    file_name=f"{ticker_input}_indicators.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
     
     # ==============================================================
     # טאב 3: נתונים פונדמנטליים
@@ -959,69 +802,94 @@ with col_name:
         st.markdown("---")
         st.markdown("#### 📋 פוזיציות שלי")
         
-        if not st.session_state.trades:
+        ledger = st.session_state.ledger
+        
+        if not len(ledger):
             st.info("📝 עדיין אין לך פוזיציות. הוסף פוזיציה ראשונה למעלה.")
         else:
-            # יצירת DataFrame עם חישוב רווח והפסד
-            trades_list = []
+            # טעינה מרוכזת של מחירים לכל הסימולים בתיק (קריאה אחת במקום קריאה לכל פוזיציה)
+            portfolio_df = ledger.to_frame()
+            price_frames = load_many(ledger.tickers())
+            # שערוך וקטורי: ערכים לכל עסקה ואגרגציה לכל סימול מווקטור מחירים אחד
+            lots_df, positions_df = valuate(portfolio_df, latest_prices(price_frames))
+            summary_df = lots_df.dropna(subset=['CurrentPrice'])
+            positions_df = positions_df.dropna(subset=['CurrentPrice'])
             
-            for trade_id, trade in st.session_state.trades.items():
-                try:
-                    # טעינת מחיר נוכחי
-                    df_tmp, _, _ = load_stock_data(trade['Ticker'])
-                    if df_tmp is not None and not df_tmp.empty:
-                        current_price_tmp = df_tmp['Close'].iloc[-1]
-                        current_value = current_price_tmp * trade['Shares']
-                        invested = trade['Price'] * trade['Shares']
-                        pnl = current_value - invested
-                        pnl_pct = (pnl / invested) * 100 if invested > 0 else 0
-                        
-                        trades_list.append({
-                            'סימול': trade['Ticker'],
-                            'מחיר קנייה': trade['Price'],
-                            'מניות': trade['Shares'],
-                            'הושקע': invested,
-                            'מחיר נוכחי': current_price_tmp,
-                            'שווי נוכחי': current_value,
-                            'רווח/הפסד': pnl,
-                            'אחוז': pnl_pct,
-                            'תאריך': trade['Date'],
-                            'מזהה': trade_id
-                        })
-                except:
-                    continue
+            trades_df = pd.DataFrame({
+                'סימול': summary_df['Ticker'],
+                'מחיר קנייה': summary_df['EntryPrice'],
+                'מניות': summary_df['Shares'],
+                'הושקע': summary_df['Invested'],
+                'מחיר נוכחי': summary_df['CurrentPrice'],
+                'שווי נוכחי': summary_df['CurrentValue'],
+                'רווח/הפסד': summary_df['P&L ($)'],
+                'אחוז': summary_df['P&L (%)'],
+                'תאריך': pd.to_datetime(summary_df['Date']).dt.strftime("%Y-%m-%d %H:%M"),
+                'מזהה': summary_df['TradeID']
+            })
             
-            if trades_list:
-                trades_df = pd.DataFrame(trades_list)
+            if not trades_df.empty:
+                with stage('tab4.table'):
+                    # תצוגה מעוצבת
+                    st.dataframe(
+                        trades_df.style.format({
+                            'מחיר קנייה': '${:,.2f}',
+                            'הושקע': '${:,.2f}',
+                            'מחיר נוכחי': '${:,.2f}',
+                            'שווי נוכחי': '${:,.2f}',
+                            'רווח/הפסד': '${:+,.2f}',
+                            'אחוז': '{:+.2f}%'
+                        }).apply(
+                            lambda x: ['background-color: #d4edda' if isinstance(v, (int, float)) and v > 0 
+                                      else 'background-color: #f8d7da' if isinstance(v, (int, float)) and v < 0 
+                                      else '' for v in x],
+                            subset=['רווח/הפסד', 'אחוז']
+                        ),
+                        use_container_width=True,
+                        height=300,
+                        hide_index=True
+                    )
                 
-                # תצוגה מעוצבת
-                st.dataframe(
-                    trades_df.style.format({
-                        'מחיר קנייה': '${:,.2f}',
-                        'הושקע': '${:,.2f}',
-                        'מחיר נוכחי': '${:,.2f}',
-                        'שווי נוכחי': '${:,.2f}',
-                        'רווח/הפסד': '${:+,.2f}',
-                        'אחוז': '{:+.2f}%'
-                    }).apply(
-                        lambda x: ['background-color: #d4edda' if isinstance(v, (int, float)) and v > 0 
-                                  else 'background-color: #f8d7da' if isinstance(v, (int, float)) and v < 0 
-                                  else '' for v in x],
-                        subset=['רווח/הפסד', 'אחוז']
-                    ),
-                    use_container_width=True,
-                    height=300,
-                    hide_index=True
-                )
+                # אגרגציה לפי מניה (עלות ממוצעת משוקללת)
+                st.markdown("---")
+                st.markdown("#### 🧮 פוזיציות לפי מניה")
+                
+                with stage('tab4.positions_table', tickers=len(positions_df)):
+                    st.dataframe(
+                        pd.DataFrame({
+                            'סימול': positions_df.index,
+                            'עסקאות': positions_df['Lots'],
+                            'מניות': positions_df['Shares'],
+                            'עלות ממוצעת': positions_df['AvgCost'],
+                            'הושקע': positions_df['Invested'],
+                            'מחיר נוכחי': positions_df['CurrentPrice'],
+                            'שווי נוכחי': positions_df['CurrentValue'],
+                            'רווח/הפסד': positions_df['P&L ($)'],
+                            'אחוז': positions_df['P&L (%)'],
+                            'משקל': positions_df['Weight'] * 100,
+                        }),
+                        column_config={
+                            'עלות ממוצעת': st.column_config.NumberColumn('עלות ממוצעת', format="$%.2f"),
+                            'הושקע': st.column_config.NumberColumn('הושקע', format="$%.2f"),
+                            'מחיר נוכחי': st.column_config.NumberColumn('מחיר נוכחי', format="$%.2f"),
+                            'שווי נוכחי': st.column_config.NumberColumn('שווי נוכחי', format="$%.2f"),
+                            'רווח/הפסד': st.column_config.NumberColumn('רווח/הפסד', format="$%+.2f"),
+                            'אחוז': st.column_config.NumberColumn('אחוז', format="%+.2f%%"),
+                            'משקל': st.column_config.ProgressColumn('משקל', min_value=0, max_value=100, format="%.1f%%"),
+                        },
+                        use_container_width=True,
+                        hide_index=True
+                    )
                 
                 # סיכום תיק
                 st.markdown("---")
                 st.markdown("#### 📊 סיכום תיק")
                 
-                total_invested = trades_df['הושקע'].sum()
-                total_current = trades_df['שווי נוכחי'].sum()
-                total_pnl = total_current - total_invested
-                total_pnl_pct = (total_pnl / total_invested) * 100 if total_invested > 0 else 0
+                portfolio_totals = totals(positions_df)
+                total_invested = portfolio_totals['Invested']
+                total_current = portfolio_totals['CurrentValue']
+                total_pnl = portfolio_totals['P&L ($)']
+                total_pnl_pct = portfolio_totals['P&L (%)']
                 
                 col_sum1, col_sum2, col_sum3 = st.columns(3)
                 
@@ -1034,43 +902,190 @@ with col_name:
                 with col_sum3:
                     st.metric("רווח/הפסד", f"${total_pnl:+,.2f}", f"{total_pnl_pct:+.2f}%")
                 
+                # עקומת הון היסטורית: שווי התיק מול ההון המושקע, ו-drawdown
+                st.markdown("#### 📈 עקומת הון")
+                
+                with stage('data.close_panel', cache='hit'):
+                    close_panel = load_close_panel(
+                        tuple(sorted(ledger.tickers())), period_since(portfolio_df['Date'].min())
+                    )
+                with stage('tab4.equity_curve'):
+                    curve = equity_curve(portfolio_df, close_panel)
+                    if len(curve) > 1:
+                        fig_eq = make_subplots(
+                            rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05
+                        )
+                        fig_eq.add_trace(go.Scatter(
+                            x=curve.index, y=curve['Equity'],
+                            name="שווי התיק", line=dict(color='#2c3e50', width=2)
+                        ), row=1, col=1)
+                        fig_eq.add_trace(go.Scatter(
+                            x=curve.index, y=curve['Invested'],
+                            name="הון מושקע", line=dict(color='#95a5a6', width=1, shape='hv')
+                        ), row=1, col=1)
+                        fig_eq.add_trace(go.Scatter(
+                            x=curve.index, y=curve['Drawdown'] * 100,
+                            name="Drawdown (%)", fill='tozeroy', line=dict(color='#e74c3c', width=1)
+                        ), row=2, col=1)
+                        fig_eq.update_layout(template="plotly_white", height=450, hovermode='x unified')
+                        st.plotly_chart(fig_eq, use_container_width=True)
+                        st.caption(
+                            f"ירידה מקסימלית מהשיא (תשואה משוקללת-זמן, ללא השפעת הפקדות): "
+                            f"{curve['Drawdown'].min() * 100:.2f}%"
+                        )
+                    else:
+                        st.info("📅 עקומת ההון תוצג אחרי יום מסחר מלא מאז העסקה הראשונה")
+                
+                # סיכון: תנודתיות, VaR/CVaR, בטא וקורלציות מפאנל התשואות ומשקלי הפוזיציות
+                st.markdown("---")
+                st.markdown("#### ⚠️ סיכון")
+                
+                col_risk1, col_risk2 = st.columns(2)
+                with col_risk1:
+                    risk_periods = {"1 שנה": "1y", "2 שנים": "2y", "5 שנים": "5y"}
+                    risk_period = risk_periods[st.selectbox("חלון היסטוריה", list(risk_periods), index=1, key="risk_period")]
+                with col_risk2:
+                    risk_confidence = st.selectbox(
+                        "רמת ביטחון", [0.95, 0.99], format_func=lambda c: f"{c:.0%}", key="risk_confidence"
+                    )
+                
+                with stage('data.return_panel', cache='hit'):
+                    return_panel = load_return_panel(
+                        tuple(sorted(set(positions_df.index) | {RISK_BENCHMARK})), risk_period
+                    )
+                with stage('tab4.risk'):
+                    risk = portfolio_risk(
+                        return_panel, positions_df['Weight'],
+                        benchmark=return_panel.get(RISK_BENCHMARK), confidence=risk_confidence
+                    )
+                    risk_summary = risk['summary']
+                    
+                    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+                    with col_r1:
+                        st.metric("תנודתיות שנתית", f"{risk_summary['Volatility (ann.)'] * 100:.2f}%")
+                    with col_r2:
+                        st.metric(
+                            f"VaR יומי ({risk_confidence:.0%})", f"${risk_summary['VaR (hist)'] * total_current:,.0f}",
+                            f"פרמטרי: ${risk_summary['VaR (param)'] * total_current:,.0f}", delta_color="off"
+                        )
+                    with col_r3:
+                        st.metric(
+                            f"CVaR יומי ({risk_confidence:.0%})", f"${risk_summary['CVaR (hist)'] * total_current:,.0f}",
+                            f"פרמטרי: ${risk_summary['CVaR (param)'] * total_current:,.0f}", delta_color="off"
+                        )
+                    with col_r4:
+                        st.metric(f"בטא מול {RISK_BENCHMARK}", f"{risk_summary['Beta']:.2f}")
+                    st.caption(f"מבוסס על {risk_summary['Days']} ימי מסחר; VaR/CVaR היסטורי, ובשורה השנייה בהנחת התפלגות נורמלית")
+                    
+                    holdings = risk['holdings']
+                    st.dataframe(
+                        pd.DataFrame({
+                            'סימול': holdings.index,
+                            'משקל': holdings['Weight'] * 100,
+                            'תנודתיות שנתית': holdings['Volatility'] * 100,
+                            'בטא': holdings['Beta'],
+                            'תרומה לסיכון': holdings['Risk Contribution'] / holdings['Risk Contribution'].sum() * 100,
+                        }),
+                        column_config={
+                            'משקל': st.column_config.NumberColumn('משקל', format="%.1f%%"),
+                            'תנודתיות שנתית': st.column_config.NumberColumn('תנודתיות שנתית', format="%.1f%%"),
+                            'בטא': st.column_config.NumberColumn('בטא', format="%.2f"),
+                            'תרומה לסיכון': st.column_config.NumberColumn('תרומה לסיכון', format="%.1f%%"),
+                        },
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    
+                    if len(holdings) > 1:
+                        correlation = risk['correlation']
+                        fig_corr = go.Figure(go.Heatmap(
+                            z=correlation.to_numpy(), x=correlation.columns, y=correlation.index,
+                            zmin=-1, zmax=1, colorscale='RdBu_r'
+                        ))
+                        fig_corr.update_layout(
+                            title="מטריצת קורלציות", template="plotly_white",
+                            height=min(300 + 15 * len(correlation), 900)
+                        )
+                        st.plotly_chart(fig_corr, use_container_width=True)
+                
                 # כפתורי פעולה
                 st.markdown("---")
                 col_actions1, col_actions2, col_actions3 = st.columns(3)
                 
                 with col_actions1:
                     if st.button("🗑️ מחק פוזיציה אחרונה", use_container_width=True):
-                        last_trade_id = list(st.session_state.trades.keys())[-1]
-                        delete_trade(last_trade_id)
+                        delete_trade(ledger.last_id())
                         st.success("✅ הפוזיציה נמחקה!")
                         st.rerun()
                 
                 with col_actions2:
-                    if st.session_state.trades:
-                        csv_buffer = io.StringIO()
-                        pd.DataFrame.from_dict(st.session_state.trades, orient='index').to_csv(csv_buffer, index=False)
+                    if len(ledger):
+                        # ה-CSV נוצר רק בלחיצה (ב-thread של ההורדה), במנות, מ-snapshot של היומן
                         st.download_button(
                             label="📥 הורד CSV",
-                            data=csv_buffer.getvalue(),
+                            data=lambda trades=portfolio_df: csv_bytes(export_columns(trades)),
                             file_name=f"פוזיציות_{datetime.now().strftime('%Y%m%d')}.csv",
                             mime="text/csv",
                             use_container_width=True
                         )
                 
                 with col_actions3:
-                    if st.session_state.trades:
-                        excel_buffer = io.BytesIO()
-                        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                            pd.DataFrame.from_dict(st.session_state.trades, orient='index').to_excel(writer, index=False)
-                        excel_buffer.seek(0)
+                    if len(ledger):
+                        # חוברת מלאה (עסקאות, שערוך, פוזיציות ואינדיקטורים לכל סימול) נכתבת
+                        # בזרם ב-thread רקע; האינדיקטורים מחושבים אחד-אחד בזמן הכתיבה
+                        if st.button("📊 הכן קובץ Excel", use_container_width=True, key="excel_export_start"):
+                            with stage('tab4.export_excel'):
+                                st.session_state.excel_export = submit_workbook(portfolio_sheets(
+                                    ledger.export_frame(), lots_df, positions_df,
+                                    ((t, get_advanced_indicators(t, df)) for t, df in price_frames.items()),
+                                ), prefix=st.session_state.export_prefix)
                         
-                        st.download_button(
-                            label="📊 הורד Excel",
-                            data=excel_buffer,
-                            file_name=f"פוזיציות_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
+                        excel_export = st.session_state.get("excel_export")
+                        if (excel_export is not None and excel_export.done() and excel_export.exception() is None
+                                and not os.path.exists(excel_export.result())):
+                            # הקובץ נמחק בניקוי קבצים ישנים - מציעים להכין אותו מחדש
+                            del st.session_state.excel_export
+                            excel_export = None
+                        if excel_export is not None and not excel_export.done():
+                            wait_for_export(excel_export)
+                        elif excel_export is not None and excel_export.exception() is not None:
+                            st.error(f"❌ שגיאה ביצירת קובץ Excel: {excel_export.exception()}")
+                        elif excel_export is not None:
+                            # הקובץ נקרא רק בלחיצה על הכפתור, לא בכל rerun (אם נמחק בינתיים -
+                            # ה-rerun שאחרי הלחיצה מציע להכין אותו מחדש)
+                            st.download_button(
+                                label="📊 הורד Excel",
+                                data=lambda path=excel_export.result(): read_export(path),
+                                file_name=f"פוזיציות_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                use_container_width=True
+                            )
+                
+                # ייצוא בינארי לניתוח (pd.read_parquet / pd.read_feather)
+                with st.expander("💾 ייצוא לניתוח (Parquet / Arrow)"):
+                    export_frames = {
+                        "עסקאות": ("trades", portfolio_df, False),
+                        "שערוך": ("valuation", lots_df, False),
+                        "פוזיציות": ("positions", positions_df, True),
+                    }
+                    for label, (name, frame, keep_index) in export_frames.items():
+                        col_pq, col_ipc = st.columns(2)
+                        with col_pq:
+                            st.download_button(
+                                label=f"⬇️ {label} - Parquet",
+                                data=lambda frame=frame, keep_index=keep_index: to_parquet(frame, index=keep_index),
+                                file_name=f"{name}_{datetime.now().strftime('%Y%m%d')}.parquet",
+                                mime="application/vnd.apache.parquet",
+                                use_container_width=True
+                            )
+                        with col_ipc:
+                            st.download_button(
+                                label=f"⬇️ {label} - Arrow",
+                                data=lambda frame=frame, keep_index=keep_index: to_arrow_ipc(frame, index=keep_index),
+                                file_name=f"{name}_{datetime.now().strftime('%Y%m%d')}.arrow",
+                                mime="application/vnd.apache.arrow.file",
+                                use_container_width=True
+                            )
     
     # ==============================================================
     # טאב 5: מצב השוק
@@ -1167,8 +1182,125 @@ with col_name:
         for insight in market_insights:
             st.markdown(f"- {insight}")
 
+    # ==============================================================
+    # טאב 6: סורק מניות
+    # ==============================================================
+    with tabs[5]:
+        st.markdown("### 🔎 סורק מניות")
+        st.caption("דירוג כל המניות ברשימה לפי הציון הטכני - חישוב אחד על כל היקום")
+        
+        universes = list_universes()
+        universe_options = ["מניות מובילות"] + list(universes) + ["רשימה אישית"]
+        
+        col_scan1, col_scan2 = st.columns([2, 1])
+        with col_scan1:
+            universe_name = st.selectbox("יקום מניות", universe_options, key="screen_universe")
+        
+        if universe_name == "רשימה אישית":
+            custom = st.text_area("סימולים (מופרדים בפסיק או בשורה חדשה)", "AAPL, MSFT, NVDA")
+            universe = [t.strip().upper() for t in custom.replace("\n", ",").split(",") if t.strip()]
+        elif universe_name in universes:
+            universe = load_universe(universes[universe_name])
+        else:
+            universe = popular_stocks
+        
+        with col_scan2:
+            st.metric("מניות ביקום", len(universe))
+        
+        if st.button("🔎 הרץ סריקה", use_container_width=True, disabled=not universe):
+            with st.spinner(f"סורק {len(universe)} מניות..."), stage('tab6.scan', tickers=len(universe)):
+                screen_frames = load_many(universe)
+                st.session_state.screen_result = (universe_name, screen_universe(screen_frames))
+        
+        if "screen_result" in st.session_state:
+            scanned_name, screen_df = st.session_state.screen_result
+            
+            if screen_df.empty:
+                st.warning("⚠️ לא נמצאו נתונים עבור המניות ברשימה")
+            else:
+                st.markdown(f"#### 🏆 תוצאות: {scanned_name}")
+                
+                labels = list(dict.fromkeys(screen_df['Recommendation']))
+                chosen = st.multiselect("סינון לפי המלצה", labels, default=labels)
+                shown = screen_df[screen_df['Recommendation'].isin(chosen)]
+                
+                col_res1, col_res2, col_res3 = st.columns(3)
+                with col_res1:
+                    st.metric("נסרקו", len(screen_df))
+                with col_res2:
+                    st.metric("ציון ממוצע", f"{screen_df['Score'].mean():.1f}")
+                with col_res3:
+                    st.metric("איתותי קנייה", int((screen_df['Score'] >= 60).sum()))
+                
+                results_df = pd.DataFrame({
+                    'דירוג': shown['Rank'],
+                    'סימול': shown.index,
+                    'ציון': shown['Score'],
+                    'המלצה': shown['Recommendation'],
+                    'מחיר': shown['Close'],
+                    'RSI': shown['RSI'],
+                    'MACD': shown['MACD'] - shown['MACD_Signal'],
+                    'מעל SMA 200': shown['Close'] > shown['SMA_200'],
+                    'ROC 10': shown['ROC'],
+                    'נפח יחסי': shown['Volume_Ratio'],
+                    'תאריך': pd.to_datetime(shown['Date']).dt.strftime("%Y-%m-%d"),
+                })
+                
+                st.dataframe(
+                    results_df,
+                    column_config={
+                        'ציון': st.column_config.ProgressColumn('ציון', min_value=0, max_value=100, format="%d"),
+                        'מחיר': st.column_config.NumberColumn('מחיר', format="$%.2f"),
+                        'RSI': st.column_config.NumberColumn('RSI', format="%.1f"),
+                        'MACD': st.column_config.NumberColumn('MACD - סיגנל', format="%+.3f"),
+                        'ROC 10': st.column_config.NumberColumn('ROC 10', format="%+.2f%%"),
+                        'נפח יחסי': st.column_config.NumberColumn('נפח יחסי', format="%.2f"),
+                    },
+                    use_container_width=True,
+                    height=500,
+                    hide_index=True
+                )
+
+# ----------------------------------------------------------------------
+# 6️⃣ חלונית דיבאג - זמני השלבים ב-rerun הנוכחי
+# ----------------------------------------------------------------------
+if st.query_params.get("debug") == "1" or os.environ.get("STOCK_TRACKER_DEBUG") == "1":
+    with st.expander("🐞 זמני ריצה (דיבאג)"):
+        timing_summary = timing_run.summary()
+        timing_summary['stage'] = [
+            "\u2003" * depth + name for name, depth in zip(timing_summary['stage'], timing_summary['depth'])
+        ]
+        
+        col_dbg1, col_dbg2, col_dbg3 = st.columns(3)
+        with col_dbg1:
+            st.metric("זמן rerun", f"{timing_run.elapsed_ms():,.0f} ms")
+        with col_dbg2:
+            cache_stats = indicator_cache.stats()
+            st.metric("cache אינדיקטורים", f"{cache_stats['hit_rate']:.0%}",
+                      f"{cache_stats['hits']} פגיעות / {cache_stats['misses']} החטאות", delta_color="off")
+        with col_dbg3:
+            st.metric("רשומות במטמון", f"{cache_stats['size']}/{cache_stats['maxsize']}")
+        
+        st.dataframe(
+            timing_summary.drop(columns='depth'),
+            column_config={
+                'stage': st.column_config.TextColumn('שלב'),
+                'calls': st.column_config.NumberColumn('קריאות'),
+                'total_ms': st.column_config.NumberColumn('סה"כ (ms)', format="%.1f"),
+                'max_ms': st.column_config.NumberColumn('מקסימום (ms)', format="%.1f"),
+                'hits': st.column_config.NumberColumn('פגיעות cache'),
+                'misses': st.column_config.NumberColumn('החטאות cache'),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        if st.checkbox("כתיבת הזמנים כלוג JSON", key="timing_json_log",
+                       value=TIMING_JSON, disabled=TIMING_JSON):
+            st.caption(f"נכתב ל-{TIMING_LOG}")
+
 # ----------------------------------------------------------------------
-# 6️⃣ Footer
+# 7️⃣ Footer
 # ----------------------------------------------------------------------
 st.markdown("---")
 st.markdown(
@@ -1183,3 +1315,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# לוג JSON של הזמנים - בכל rerun כש-STOCK_TRACKER_TIMING_JSON=1, גם בלי חלונית הדיבאג
+if TIMING_JSON or st.session_state.get("timing_json_log"):
+    write_json(timing_run)
@@ -0,0 +1,86 @@
+"""
+בנצ'מרק לבדיקה ההיסטורית הווקטורית על נתוני ה-replay (ללא רשת)
+
+ההיסטוריות נטענות דרך sync_history והמאגר המקומי, כמו באפליקציה, מ-ReplayProvider
+(הקלטות fixtures או נתונים סינתטיים דטרמיניסטיים). לפני המדידה נבדק על סימול אחד
+שהסימולציה הווקטורית זהה לסימולציה נר-אחר-נר עם calculate_final_score.
+
+הרצה:
+    python -m benchmarks.bench_backtest --sizes 100 500 --years 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from streamlit.logger import set_log_level
+
+# מאגר נתונים זמני ונפרד - הבנצ'מרק לא נוגע בנתונים האמיתיים
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import core.data as data
+from core.backtest import RULES, SCORE_PERIODS, run_backtest
+from core.indicators import calculate_advanced_indicators, calculate_final_score
+from core.providers import ReplayProvider, set_provider
+
+COST_BPS = 10.0
+
+
+def naive_total_return(df, buy=60, sell=40):
+    """סימולציה נר-אחר-נר של כלל הציון - לבדיקת השקילות בלבד"""
+    ind = calculate_advanced_indicators(df)
+    close = ind['Close'].to_numpy()
+    target, position, prev, equity = 0, 0, 0, 1.0
+    for i in range(len(ind)):
+        position = target
+        ret = position * (close[i] / close[i - 1] - 1) if i else 0.0
+        equity *= 1 + ret - abs(position - prev) * COST_BPS / 1e4
+        prev = position
+        score = calculate_final_score(ind.iloc[i], SCORE_PERIODS)[0]
+        target = 1 if score >= buy else 0 if score <= sell else target
+    return equity - 1
+
+
+def run(sizes, years, fixtures):
+    set_log_level('error')
+    set_provider(ReplayProvider(fixtures_dir=fixtures, bars=years * 252))
+    period = f"{years}y"
+
+    print(f"{'tickers':>8} {'bars':>6} {'load (s)':>9} " + " ".join(f"{r + ' (s)':>18}" for r in RULES))
+    for n in sizes:
+        tickers = [f"B{i:04d}" for i in range(n)]
+        data.sync_history(tickers, period)  # הורדה ראשונה - ממלאת את המאגר המקומי
+
+        start = time.perf_counter()
+        frames = data.sync_history(tickers, period)
+        t_load = time.perf_counter() - start
+
+        timings = []
+        for rule in RULES:
+            start = time.perf_counter()
+            metrics, _ = run_backtest(frames, rule, cost_bps=COST_BPS, slippage_bps=0.0)
+            timings.append(time.perf_counter() - start)
+
+            if rule == 'score':
+                first = tickers[0]
+                expected = naive_total_return(frames[first])
+                assert np.isclose(metrics.loc[first, 'Total Return'], expected, rtol=1e-12), \
+                    "הסימולציה הווקטורית שונה מהסימולציה נר-אחר-נר"
+
+        bars = max(len(df) for df in frames.values())
+        print(f"{n:>8} {bars:>6} {t_load:>9.2f} " + " ".join(f"{t:>18.2f}" for t in timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--fixtures', default=None, help="תיקיית הקלטות (ברירת מחדל: נתונים סינתטיים)")
+    args = parser.parse_args()
+    run(args.sizes, args.years, args.fixtures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+בנצ'מרק לגרף הנרות: כל הנרות (Scatter) מול איחוד OHLC + LTTB (Scattergl)
+
+לכל גודל סדרה נבנה גרף הנרות של טאב 1 בשני המצבים, ונמדדים גודל ה-JSON
+שנשלח לדפדפן, זמן הבנייה וזמן הסריאליזציה (מה ש-st.plotly_chart עושה בשרת).
+עם --render נמדד גם זמן הרינדור לתמונה (דורש kaleido; לא חלק מהתלויות).
+
+הרצה:
+    python -m benchmarks.bench_chart --sizes 126 504 2520 98280 --max-bars 600 --max-points 1200
+"""
+
+import argparse
+import time
+
+import plotly.io as pio
+
+from core.providers import synthetic_ohlcv
+from utils.charts import candlestick_figure
+
+
+def make_frame(n):
+    """נרות דקה סינתטיים עם SMA_20/SMA_50"""
+    df = synthetic_ohlcv(n, seed=n, freq="min", volatility=0.001)
+    return df.assign(SMA_20=df['Close'].rolling(20).mean(), SMA_50=df['Close'].rolling(50).mean())
+
+
+def measure(df, render, **kwargs):
+    start = time.perf_counter()
+    fig = candlestick_figure(df, "bench", **kwargs)
+    built = time.perf_counter()
+    payload = pio.to_json(fig)
+    serialized = time.perf_counter()
+    render_s = None
+    if render:
+        start_render = time.perf_counter()
+        pio.to_image(fig, format='png', width=1200, height=600)
+        render_s = time.perf_counter() - start_render
+    points = sum(len(trace.x) for trace in fig.data)
+    return {
+        'points': points,
+        'kb': len(payload) / 1024,
+        'build': built - start,
+        'json': serialized - built,
+        'render': render_s,
+    }
+
+
+def run(sizes, max_bars, max_points, render):
+    header = f"{'bars':>9} | {'points':>7} {'JSON KB':>9} {'build':>7} {'json':>7}"
+    if render:
+        header += f" {'render':>7}"
+    # חימום: טעינת ה-validators של plotly בבנייה הראשונה
+    measure(make_frame(100), False)
+    print(f"{'':>9} | {'before':^33} | {'after':^33}")
+    print(header + " |" + header.split("|", 1)[1])
+    for n in sizes:
+        df = make_frame(n)
+        before = measure(df, render, max_bars=0, max_points=0, webgl=False)
+        after = measure(df, render, max_bars=max_bars, max_points=max_points, webgl=True)
+        cells = []
+        for r in (before, after):
+            cell = f"{r['points']:>7} {r['kb']:>9.0f} {r['build']:>7.3f} {r['json']:>7.3f}"
+            if render:
+                cell += f" {r['render']:>7.2f}"
+            cells.append(cell)
+        print(f"{n:>9} | " + " | ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[126, 504, 2_520, 98_280, 500_000])
+    parser.add_argument('--max-bars', type=int, default=600)
+    parser.add_argument('--max-points', type=int, default=1200)
+    parser.add_argument('--render', action='store_true', help="מדידת רינדור לתמונה (kaleido)")
+    args = parser.parse_args()
+    run(args.sizes, args.max_bars, args.max_points, args.render)
+
+
+if __name__ == "__main__":
+    main()
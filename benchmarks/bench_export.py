@@ -0,0 +1,93 @@
+"""
+בנצ'מרק לייצוא Excel: pd.ExcelWriter (openpyxl רגיל) מול כתיבה בזרם (write-only)
+
+שני הנתיבים כותבים את אותה חוברת - עסקאות, שערוך, פוזיציות וגיליון
+אינדיקטורים לכל סימול - לקובץ זמני. הנתיב הישן בונה את כל התאים בזיכרון
+לפני השמירה; הנתיב החדש כותב מנות שורות ישירות לקובץ. נמדדים זמן ושיא
+הזיכרון (tracemalloc, בהרצה נפרדת), ולפני המדידה נבדק ששני הקבצים זהים בתוכן.
+
+הרצה:
+    python -m benchmarks.bench_export --trades 10000 100000 --histories 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import pandas as pd
+
+from benchmarks.suite import make_portfolio
+from core.indicators import calculate_advanced_indicators
+from core.ledger import TradeLedger
+from core.providers import synthetic_ohlcv
+from core.valuation import valuate
+from utils.export import portfolio_sheets, write_workbook
+
+
+def make_inputs(n_trades, n_histories, bars):
+    portfolio, prices = make_portfolio(n_trades)
+    ledger = TradeLedger.from_frame(portfolio)
+    lots, positions = valuate(ledger.to_frame(), prices)
+    histories = [
+        (f"T{i:04d}", calculate_advanced_indicators(synthetic_ohlcv(bars, seed=i)))
+        for i in range(n_histories)
+    ]
+    return ledger.export_frame(), lots, positions, histories
+
+
+def old_path(path, trades, lots, positions, histories):
+    """כל הגיליונות דרך pd.ExcelWriter (כמו הכפתור הקודם, עם אותם גיליונות)"""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, df in portfolio_sheets(trades, lots, positions, histories):
+            df.to_excel(writer, index=False, sheet_name=name)
+
+
+def new_path(path, trades, lots, positions, histories):
+    write_workbook(portfolio_sheets(trades, lots, positions, histories), path)
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def run(trade_sizes, n_histories, bars):
+    out = tempfile.mkdtemp(prefix="bench_export_")
+    print(f"{'trades':>8} {'sheets':>7} {'old (s)':>9} {'old (MB)':>9} {'new (s)':>9} {'new (MB)':>9}")
+    for n in trade_sizes:
+        inputs = make_inputs(n, n_histories, bars)
+        old_file, new_file = os.path.join(out, f"old_{n}.xlsx"), os.path.join(out, f"new_{n}.xlsx")
+
+        t_old, m_old = measure(old_path, old_file, *inputs)
+        t_new, m_new = measure(new_path, new_file, *inputs)
+
+        expected = pd.read_excel(old_file, sheet_name=None)
+        result = pd.read_excel(new_file, sheet_name=None)
+        assert list(result) == list(expected), "הגיליונות שונים"
+        for name in expected:
+            pd.testing.assert_frame_equal(result[name], expected[name], check_dtype=False)
+
+        print(f"{n:>8} {len(expected):>7} {t_old:>9.2f} {m_old:>9.1f} {t_new:>9.2f} {m_new:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--trades', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--histories', type=int, default=50, help="גיליונות אינדיקטורים")
+    parser.add_argument('--bars', type=int, default=500, help="נרות בכל היסטוריה")
+    args = parser.parse_args()
+    run(args.trades, args.histories, args.bars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+בנצ'מרק לנרות תוך-יומיים: טעינה מהמאגר בכל רענון מול חוצצים טבעתיים
+
+ספק מדומה "מתקדם בזמן" - בכל רענון מתווספים --step נרות דקה לכל סימול.
+הנתיב הישן קורא בכל רענון את קובצי ה-Parquet של כל הסימולים, מוריד את
+הנרות החדשים וכותב מחדש את הקבצים (sync_history); הנתיב החדש מחזיק את N
+הנרות האחרונים בחוצץ (core/intraday), מוסיף רק את החדשים וכותב למאגר רק
+כל PERSIST_BARS נרות. נמדדים זמן הרענון, זיכרון החוצצים והזיכרון
+שנשאר מוקצה (tracemalloc) אחרי הרענון הראשון והאחרון. בסוף נבדק ששני
+הנתיבים החזירו את אותם נרות אחרונים. הזמן המקסימלי בנתיב החדש הוא הרענון
+שבו כל החוצצים נכתבים למאגר.
+
+הרצה:
+    python -m benchmarks.bench_intraday --tickers 100 --refreshes 20 --step 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import numpy as np
+import pandas as pd
+
+from core import intraday, store
+from core.data import sync_history
+from core.providers import set_provider, synthetic_ohlcv
+
+
+class TickingProvider:
+    """ספק נרות דקה שבו הנר האחרון הזמין מתקדם ב-advance()"""
+
+    def __init__(self, full, available):
+        self.full = full
+        self.available = available
+
+    def advance(self, step):
+        self.available += step
+
+    def history(self, tickers, period=None, start=None, interval="1d"):
+        frames = {}
+        for t in tickers:
+            df = self.full[t].iloc[:self.available]
+            if start is not None:
+                df = df.iloc[df.index.searchsorted(pd.Timestamp(start)):]
+            frames[t] = df.copy()
+        return frames
+
+    def info(self, ticker):
+        return {}
+
+
+def old_refresh(tickers):
+    return {t: df.iloc[-intraday.INTRADAY_BARS:] for t, df in sync_history(tickers, "7d", "1m").items()}
+
+
+def new_refresh(tickers):
+    return intraday.load_intraday(tickers, "1m", force=True)
+
+
+def run_path(name, refresh, full, refreshes, step):
+    tickers = list(full)
+    for t in tickers:
+        store.clear(t, "1m")
+    intraday.clear(persist=False)
+    provider = TickingProvider(full, len(full[tickers[0]]) - refreshes * step)
+    set_provider(provider)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    refresh(tickers)
+    seed = time.perf_counter() - start
+    base = tracemalloc.get_traced_memory()[0]
+
+    times, held = [], []
+    for _ in range(refreshes):
+        provider.advance(step)
+        start = time.perf_counter()
+        frames = refresh(tickers)
+        times.append(time.perf_counter() - start)
+        held.append((tracemalloc.get_traced_memory()[0] - base) / 2**20)
+    tracemalloc.stop()
+
+    print(f"{name:>8} {seed:>9.2f} {np.median(times) * 1000:>12.1f} {max(times) * 1000:>10.1f} "
+          f"{held[0]:>9.1f} {held[-1]:>9.1f}")
+    return frames
+
+
+def run(n_tickers, refreshes, step):
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    # הנר האחרון הזמין בסוף הבנצ'מרק הוא "עכשיו" (בתוך חלון ה-7d של נרות דקה)
+    end = pd.Timestamp.now().floor('min')
+    full = {t: synthetic_ohlcv(7 * 390 + refreshes * step, seed=i, freq="min", volatility=0.001, end=end)
+            for i, t in enumerate(tickers)}
+    intraday.MAX_RINGS = max(intraday.MAX_RINGS, n_tickers)
+
+    print(f"{n_tickers} סימולים, נרות דקה, {refreshes} רענונים של {step} נרות; חוצץ של {intraday.INTRADAY_BARS} נרות")
+    print(f"{'path':>8} {'seed (s)':>9} {'refresh (ms)':>12} {'max (ms)':>10} {'held MB':>9} {'final MB':>9}")
+    expected = run_path("store", old_refresh, full, refreshes, step)
+    result = run_path("ring", new_refresh, full, refreshes, step)
+
+    for t in tickers:
+        pd.testing.assert_frame_equal(result[t], expected[t][list(intraday.FIELDS)].astype(np.float64),
+                                      check_freq=False, check_names=False, check_index_type=False)
+    usage = intraday.memory_usage()
+    print(f"חוצצים: {usage['rings']}, {usage['bars']:,} נרות, {usage['bytes'] / 2**20:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--refreshes', type=int, default=20)
+    parser.add_argument('--step', type=int, default=5, help="נרות חדשים בכל רענון")
+    args = parser.parse_args()
+    run(args.tickers, args.refreshes, args.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+בנצ'מרק ליומן העסקאות: pd.concat + dict לכל הוספה מול TradeLedger
+
+הנתיב הישן משכפל כל עסקה ל-dict ול-DataFrame ובונה את ה-DataFrame מחדש בכל
+הוספה (O(n) להוספה); מחיקה מסננת את כל ה-DataFrame. הנתיב החדש מוסיף ומוחק
+ב-O(1) ובונה DataFrame רק לתצוגה. לפני המדידה נבדק ששני הנתיבים נותנים את
+אותו תיק.
+
+הרצה:
+    python -m benchmarks.bench_ledger --sizes 100 1000 5000 --deletes 0.1
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.ledger import TradeLedger
+
+
+def make_trades(n):
+    rng = np.random.default_rng(n)
+    tickers = rng.choice([f"T{i:03d}" for i in range(max(1, n // 4))], n)
+    prices = rng.uniform(50, 150, n).round(2)
+    shares = rng.integers(1, 500, n)
+    return [(t, float(p), int(s), f"{i:08x}") for i, (t, p, s) in enumerate(zip(tickers, prices, shares))]
+
+
+def old_path(trades, deletes):
+    """dict + pd.concat בכל הוספה, סינון בכל מחיקה (כמו add_trade/delete_trade הקודמים)"""
+    book = {}
+    portfolio = pd.DataFrame(columns=["Ticker", "EntryPrice", "Shares", "Date", "TradeID"])
+    now = datetime(2024, 6, 1)
+    for ticker, price, shares, trade_id in trades:
+        book[trade_id] = {"Ticker": ticker, "Price": price, "Shares": shares,
+                          "Date": now.strftime("%Y-%m-%d %H:%M"), "TradeID": trade_id}
+        row = {"Ticker": ticker, "EntryPrice": price, "Shares": shares, "Date": now, "TradeID": trade_id}
+        portfolio = pd.concat([portfolio, pd.DataFrame([row])], ignore_index=True)
+    for trade_id in deletes:
+        del book[trade_id]
+        portfolio = portfolio[portfolio["TradeID"] != trade_id]
+    return portfolio
+
+
+def new_path(trades, deletes):
+    ledger = TradeLedger()
+    now = datetime(2024, 6, 1)
+    for ticker, price, shares, trade_id in trades:
+        ledger.append(ticker, price, shares, now, trade_id)
+    for trade_id in deletes:
+        ledger.delete(trade_id)
+    return ledger.to_frame()
+
+
+def run(sizes, delete_ratio):
+    print(f"{'trades':>8} {'deletes':>8} {'old (s)':>10} {'ledger (s)':>11} {'speedup':>8}")
+    for n in sizes:
+        trades = make_trades(n)
+        rng = np.random.default_rng(0)
+        deletes = [trades[i][3] for i in rng.choice(n, int(n * delete_ratio), replace=False)]
+
+        start = time.perf_counter()
+        expected = old_path(trades, deletes)
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = new_path(trades, deletes)
+        t_new = time.perf_counter() - start
+
+        assert list(result['TradeID']) == list(expected['TradeID']), "סדר העסקאות שונה"
+        for col in ('EntryPrice', 'Shares'):
+            assert np.array_equal(result[col].to_numpy(), expected[col].to_numpy(dtype=result[col].dtype)), col
+
+        print(f"{n:>8} {len(deletes):>8} {t_old:>10.3f} {t_new:>11.4f} {t_old / t_new:>7.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--deletes', type=float, default=0.1, help="חלק העסקאות שנמחקות")
+    args = parser.parse_args()
+    run(args.sizes, args.deletes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+בנצ'מרק לטאב ניהול פוזיציות: לולאת load_stock_data לכל פוזיציה מול load_many מרוכז
+
+הנתונים מוגשים מ-ReplayProvider (ללא רשת) שמדמה זמן הלוך-חזור קבוע לכל בקשה,
+כך שההשוואה משקפת את מספר הקריאות ולא את מצב הרשת.
+
+הרצה:
+    python -m benchmarks.bench_positions --sizes 1 10 40 100 --latency 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.logger import set_log_level
+
+# מאגר נתונים זמני ונפרד - הבנצ'מרק לא נוגע בנתונים האמיתיים
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import core.data as data
+from core import store
+from core.providers import ReplayProvider, set_provider
+from utils.export import format_portfolio_summary
+
+
+def make_portfolio(n_trades, n_tickers):
+    """יוצר תיק סינתטי עם n_trades פוזיציות על n_tickers סימולים"""
+    rng = np.random.default_rng(0)
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    return pd.DataFrame({
+        'Ticker': rng.choice(tickers, n_trades),
+        'EntryPrice': rng.uniform(50, 150, n_trades).round(2),
+        'Shares': rng.integers(1, 500, n_trades),
+        'Date': pd.Timestamp("2024-06-01"),
+        'TradeID': [f"{i:08x}" for i in range(n_trades)],
+    })
+
+
+def old_path(portfolio):
+    """הנתיב הישן: קריאת load_stock_data נפרדת לכל פוזיציה"""
+    rows = []
+    for _, trade in portfolio.iterrows():
+        df_tmp, _, _ = data.load_stock_data(trade['Ticker'])
+        if df_tmp is not None and not df_tmp.empty:
+            price = df_tmp['Close'].iloc[-1]
+            invested = trade['EntryPrice'] * trade['Shares']
+            rows.append({'Ticker': trade['Ticker'], 'P&L': price * trade['Shares'] - invested})
+    return pd.DataFrame(rows)
+
+
+def new_path(portfolio):
+    """הנתיב החדש: load_many מרוכז + format_portfolio_summary"""
+    frames = data.load_many(portfolio['Ticker'].unique())
+    return format_portfolio_summary(portfolio, data.latest_prices(frames))
+
+
+def run(sizes, latency, tickers_ratio):
+    # הרצה מחוץ ל-streamlit run - השתקת אזהרות ScriptRunContext
+    set_log_level('error')
+    recorded = ReplayProvider(bars=504, latency=latency)
+    set_provider(recorded)
+
+    print(f"{'trades':>8} {'tickers':>8} {'old (s)':>10} {'old req':>8} {'new (s)':>10} {'new req':>8} {'speedup':>8}")
+    for n in sizes:
+        portfolio = make_portfolio(n, max(1, int(n * tickers_ratio)))
+        n_tickers = portfolio['Ticker'].nunique()
+        results = []
+        for fn in (old_path, new_path):
+            # cache קר בכל מדידה (גם בזיכרון וגם במאגר המקומי)
+            data.load_stock_data.clear()
+            data._load_many_cached.clear()
+            store.clear()
+            store.clear_fundamentals()
+            recorded.requests = 0
+            start = time.perf_counter()
+            fn(portfolio)
+            results.append((time.perf_counter() - start, recorded.requests))
+        (t_old, r_old), (t_new, r_new) = results
+        print(f"{n:>8} {n_tickers:>8} {t_old:>10.3f} {r_old:>8} {t_new:>10.3f} {r_new:>8} {t_old / t_new:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 40, 100])
+    parser.add_argument('--latency', type=float, default=0.05, help="השהיה מדומה לבקשה (שניות)")
+    parser.add_argument('--tickers-ratio', type=float, default=0.75, help="יחס סימולים ייחודיים לפוזיציות")
+    args = parser.parse_args()
+    run(args.sizes, args.latency, args.tickers_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+בנצ'מרק לציון הטכני: calculate_final_score עם df.apply(axis=1) מול calculate_final_scores הווקטורי
+
+בודק שהתוצאות (ציון, המלצה, צבע) זהות לחלוטין לכל נר לפני המדידה.
+
+הרצה:
+    python -m benchmarks.bench_score --sizes 250 2500 25000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.indicators import calculate_all_indicators, calculate_final_score, calculate_final_scores
+from core.providers import synthetic_ohlcv
+
+
+def run(sizes, ma_type):
+    print(f"{'bars':>8} {'apply (ms)':>11} {'vector (ms)':>12} {'speedup':>9}")
+    for n in sizes:
+        df, periods = calculate_all_indicators(synthetic_ohlcv(n, seed=n), ma_type)
+
+        start = time.perf_counter()
+        rows = df.apply(lambda row: calculate_final_score(row, periods), axis=1)
+        t_apply = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score, labels, colors = calculate_final_scores(df, periods)
+        t_vector = time.perf_counter() - start
+
+        expected = list(zip(*rows))
+        assert np.array_equal(score, np.array(expected[0])), "ציונים שונים"
+        assert list(labels) == list(expected[1]), "המלצות שונות"
+        assert list(colors) == list(expected[2]), "צבעים שונים"
+
+        print(f"{n:>8} {t_apply * 1e3:>11.1f} {t_vector * 1e3:>12.2f} {t_apply / t_vector:>8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 2500, 25000])
+    parser.add_argument('--ma-type', default="קצר")
+    args = parser.parse_args()
+    run(args.sizes, args.ma_type)
+
+
+if __name__ == "__main__":
+    main()
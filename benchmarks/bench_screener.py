@@ -0,0 +1,105 @@
+"""
+בנצ'מרק לסורק המניות: ניתוח כל סימול בנפרד מול חישוב פאנל אחד על כל היקום
+
+לכל גודל יקום מודדים:
+- load: טעינת ההיסטוריות מהמאגר המקומי (sync_history על נתונים שכבר נשמרו)
+- loop: calculate_advanced_indicators + calculate_final_scores לכל סימול בנפרד
+- panel: screen_universe בתהליך אחד, ועם ProcessPoolExecutor (--workers)
+
+נבדק שהפאנל נותן בדיוק את אותם ערכים כמו הניתוח הנפרד - גם כשביקום יש
+סימולים בלוח מסחר אחר, עם היסטוריה קצרה או עם נרות חסרים (mixed_calendars).
+
+הרצה:
+    python -m benchmarks.bench_screener --sizes 100 500 2000 --workers 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.logger import set_log_level
+
+# מאגר נתונים זמני ונפרד - הבנצ'מרק לא נוגע בנתונים האמיתיים
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import core.data as data
+from core.indicators import calculate_advanced_indicators, calculate_final_scores
+from core.providers import ReplayProvider, set_provider, synthetic_ohlcv
+from core.screener import SCREEN_COLUMNS, SCREEN_PERIODS, screen_universe
+
+
+def loop_path(frames):
+    """ניתוח סימול-סימול: כל האינדיקטורים לכל סימול, ציון לנר האחרון"""
+    rows = {}
+    for ticker, df in frames.items():
+        df_ind = calculate_advanced_indicators(df)
+        score, _, _ = calculate_final_scores(df_ind.iloc[-1:], SCREEN_PERIODS)
+        rows[ticker] = (score[0], df_ind.iloc[-1])
+    return rows
+
+
+def mixed_calendars(bars):
+    """סימולים שהאינדקס שלהם שונה מלוח ימי המסחר הרגיל"""
+    sunday_week = pd.offsets.CustomBusinessDay(weekmask='Sun Mon Tue Wed Thu')
+    gaps = synthetic_ohlcv(bars, seed=3)
+    return {
+        'X-IPO': synthetic_ohlcv(bars, seed=1).iloc[-bars // 4:],
+        'X-HALT': synthetic_ohlcv(bars, seed=2).iloc[:-3],
+        'X-GAPS': gaps.drop(gaps.index[[bars // 5, bars // 2, bars - 10]]),
+        'X-TA1': synthetic_ohlcv(bars, seed=4, freq=sunday_week),
+        'X-TA2': synthetic_ohlcv(bars, seed=5, freq=sunday_week),
+    }
+
+
+def check(result, expected):
+    """שקילות: אותו ציון ואותם ערכים בנר האחרון לכל סימול"""
+    for ticker, (score, last) in expected.items():
+        assert result.loc[ticker, 'Score'] == score, f"ציון שונה: {ticker}"
+        for col in SCREEN_COLUMNS:
+            a, b = result.loc[ticker, col], last[col]
+            assert a == b or (np.isnan(a) and np.isnan(b)), f"ערך שונה: {ticker} {col}"
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(sizes, workers, bars):
+    set_log_level('error')
+    set_provider(ReplayProvider(bars=bars))
+
+    print(f"{'tickers':>8} {'load (s)':>9} {'loop (s)':>9} {'panel (s)':>10} {f'pool x{workers} (s)':>14} {'speedup':>8}")
+    for n in sizes:
+        tickers = [f"S{i:05d}" for i in range(n)]
+        data.sync_history(tickers)  # הורדה ראשונה - ממלאת את המאגר המקומי
+
+        t_load, frames = _timed(lambda: data.sync_history(tickers))
+        t_loop, expected = _timed(lambda: loop_path(frames))
+        t_panel, result = _timed(lambda: screen_universe(frames, workers=1))
+        t_pool, pooled = _timed(lambda: screen_universe(frames, workers=workers, chunk_size=max(1, n // workers)))
+
+        assert pooled.equals(result), "תוצאת ה-pool שונה מהחישוב בתהליך אחד"
+        check(result, expected)
+        mixed = {**frames, **mixed_calendars(bars)}
+        check(screen_universe(mixed, workers=1), loop_path(mixed))
+
+        print(f"{n:>8} {t_load:>9.2f} {t_loop:>9.2f} {t_panel:>10.2f} {t_pool:>14.2f} "
+              f"{t_loop / t_panel:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--bars', type=int, default=504, help="נרות לכל סימול (504 - שנתיים)")
+    args = parser.parse_args()
+    run(args.sizes, args.workers, args.bars)
+
+
+if __name__ == "__main__":
+    main()
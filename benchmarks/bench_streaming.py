@@ -0,0 +1,75 @@
+"""
+בנצ'מרק למנוע האינדיקטורים המצטבר מול חישוב batch מחדש
+
+לכל אורך היסטוריה: בודק שהמנוע שווה לפונקציות ה-batch (core/indicators),
+גם על נתונים עם חורים (High/Low חסרים בנרות בודדים ונרות ריקים), ומשווה את עלות עדכון הנר האחרון - חישוב מחדש של כל ההיסטוריה מול update אחד.
+
+הרצה:
+    python -m benchmarks.bench_streaming --sizes 250 2500 25000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.indicators import calculate_advanced_indicators, calculate_all_indicators
+from core.providers import synthetic_ohlcv
+from core.streaming import StreamingIndicators, compare_with_batch
+
+
+def _per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def with_gaps(df, seed=0, fraction=0.02):
+    """עותק של df עם NaN: High חסר, Low חסר ונר ריק - כל אחד ב-fraction מהנרות"""
+    df = df.copy()
+    rng = np.random.default_rng(seed)
+    for columns in (['High'], ['Low'], list(df.columns)):
+        rows = rng.choice(len(df), max(1, int(len(df) * fraction)), replace=False)
+        df.iloc[rows, [df.columns.get_loc(c) for c in columns]] = np.nan
+    return df
+
+
+def check(df):
+    """שקילות מספרית מול שתי פונקציות ה-batch; מחזיר את ההפרש המקסימלי לכל עמודה"""
+    diffs = compare_with_batch(df, StreamingIndicators.advanced(), calculate_advanced_indicators(df))
+    for ma_type in ("קצר", "ארוך"):
+        batch, _ = calculate_all_indicators(df, ma_type)
+        diffs.update(compare_with_batch(df, StreamingIndicators.core(ma_type), batch))
+    return diffs
+
+
+def run(sizes, repeat):
+    print(f"{'bars':>8} {'max diff':>10} {'batch (ms)':>11} {'update (us)':>12} {'speedup':>9}")
+    for n in sizes:
+        df = synthetic_ohlcv(n, seed=n)
+
+        diffs = check(df)
+        gaps = check(with_gaps(df, seed=n))
+        diffs = {col: max(diffs[col], gaps[col]) for col in diffs}
+
+        engine = StreamingIndicators.advanced()
+        engine.update_frame(df.iloc[:-1])
+        last = tuple(df.iloc[-1][['Open', 'High', 'Low', 'Close', 'Volume']])
+
+        t_batch = _per_call(lambda: calculate_advanced_indicators(df), repeat)
+        t_update = _per_call(lambda: engine.update(*last), repeat * 100)
+        print(f"{n:>8} {max(diffs.values()):>10.2e} {t_batch * 1e3:>11.2f} {t_update * 1e6:>12.1f} "
+              f"{t_batch / t_update:>8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 2500, 25000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
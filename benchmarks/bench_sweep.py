@@ -0,0 +1,74 @@
+"""
+בנצ'מרק לסריקת הפרמטרים: חישוב מחדש לכל צירוף מול core/sweep
+
+הנתיב הנאיבי מחשב לכל צירוף את כל האינדיקטורים, את הציון ואת הבדיקה
+ההיסטורית מאפס; הוא נמדד על מדגם של צירופים ומוכפל למספר הצירופים המלא.
+תוצאות המדגם חייבות להיות זהות לשורות המתאימות בסריקה.
+
+הרצה:
+    python -m benchmarks.bench_sweep --combos 1000 --years 10 --workers 4
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+from streamlit.logger import set_log_level
+
+from core.backtest import _hold, simulate, summarize
+from core.indicators import calculate_all_indicators, calculate_final_scores
+from core.providers import synthetic_ohlcv
+from core.registry import compute_indicators
+from core.sweep import _periods, random_search, run_sweep
+
+
+def naive(df, combo):
+    """צירוף אחד מאפס: אינדיקטורים, ציון, איתותים וסימולציה"""
+    periods = _periods(combo.sma_periods)
+    ind, _ = calculate_all_indicators(df, "קצר")
+    ind = ind.assign(**compute_indicators(df, [f'SMA_{periods[-1]}'], profile='core', periods=periods))
+    weights = {'rsi': combo.w_rsi, 'macd': combo.w_macd, 'trend': combo.w_trend, 'bb': combo.w_bb}
+    score, _, _ = calculate_final_scores(ind, periods, weights, combo.rsi_low, combo.rsi_high)
+    return summarize(simulate(df['Close'], _hold(score >= combo.buy, score <= combo.sell))).iloc[0]
+
+
+def run(n_combos, years, workers, sample):
+    set_log_level('error')
+    df = synthetic_ohlcv(years * 252, seed=years)
+    combos = random_search(n_combos, seed=0)
+
+    start = time.perf_counter()
+    results = run_sweep({'SWEEP': df}, combos, workers=1)
+    t_sweep = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = run_sweep({'SWEEP': df}, combos, workers=workers, chunk_size=max(1, n_combos // workers))
+    t_pool = time.perf_counter() - start
+    assert pooled.equals(results), "תוצאת ה-pool שונה מהחישוב בתהליך אחד"
+
+    picks = np.linspace(0, len(combos) - 1, sample).astype(int)
+    start = time.perf_counter()
+    for i in picks:
+        expected = naive(df, combos.iloc[i])
+        row = results.iloc[i]
+        for name, value in expected.items():
+            assert np.isclose(row[name], value, rtol=1e-12, equal_nan=True), f"צירוף {i}: {name} שונה"
+    t_naive = (time.perf_counter() - start) / sample * len(combos)
+
+    print(f"{'combos':>7} {'bars':>6} {'naive est (s)':>14} {'sweep (s)':>10} {f'pool x{workers} (s)':>14} {'speedup':>8}")
+    print(f"{len(combos):>7} {len(df):>6} {t_naive:>14.1f} {t_sweep:>10.2f} {t_pool:>14.2f} {t_naive / t_sweep:>7.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--combos', type=int, default=1000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sample', type=int, default=20, help="צירופים שנמדדים בנתיב הנאיבי")
+    args = parser.parse_args()
+    run(args.combos, args.years, args.workers, args.sample)
+
+
+if __name__ == "__main__":
+    main()
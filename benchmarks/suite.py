@@ -0,0 +1,469 @@
+"""
+חבילת בנצ'מרקים: זמן ריצה וזיכרון שיא לכל פונקציה מול baseline שמור
+
+המקרים מכסים את הנתיבים החמים של האפליקציה:
+- data.sync_history: טעינה מהמאגר המקומי + עדכון מצטבר (ReplayProvider, ללא רשת)
+- indicators: calculate_advanced_indicators, calculate_all_indicators
+- scoring: calculate_final_scores על כל הנרות
+- recommendations: get_trading_recommendations
+- export: to_excel, to_csv, format_portfolio_summary
+- valuation: שערוך לכל עסקה ואגרגציה לכל סימול (valuate)
+- ledger: הוספה ומחיקה ביומן העסקאות ובניית ה-DataFrame לתצוגה
+- portfolio_db: שמירת התיק ל-SQLite בטרנזקציה אחת וטעינתו בשאילתה אחת
+
+מקרי המחיר רצים על OHLCV סינתטי דטרמיניסטי (250 עד 10M נרות דקה) ומקרי
+התיק על תיקים סינתטיים (10 עד 100k עסקאות). הזמן הוא המינימום מכמה חזרות;
+זיכרון השיא נמדד בהרצה נפרדת עם tracemalloc (הקצאות numpy ו-pandas נספרות).
+
+התוצאות מושוות ל-benchmarks/baseline.json; חריגה מעבר לסף מסומנת כרגרסיה
+וקוד היציאה הוא 1. ה-baseline תלוי מכונה - יש ליצור אותו מחדש (--save) על
+המכונה שמשווים עליה.
+
+הרצה:
+    python -m benchmarks.suite                      # כל הגדלים, השוואה ל-baseline
+    python -m benchmarks.suite --quick              # עד 25k נרות / 1k עסקאות
+    python -m benchmarks.suite --only indicators --max-bars 1000000
+    python -m benchmarks.suite --save               # שמירת baseline חדש
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from streamlit.logger import set_log_level
+
+# מאגר נתונים זמני ונפרד - הבנצ'מרק לא נוגע בנתונים האמיתיים
+os.environ.setdefault("STOCK_TRACKER_DATA_DIR", tempfile.mkdtemp(prefix="bench_data_"))
+
+import core.data as data
+from core import portfolio_db, store
+from core.indicators import (calculate_advanced_indicators, calculate_all_indicators,
+                             calculate_final_scores, get_trading_recommendations)
+from core.ledger import TradeLedger
+from core.risk import portfolio_risk
+from core.valuation import equity_curve, valuate
+from core.providers import ReplayProvider, set_provider, synthetic_ohlcv
+from utils.charts import candlestick_figure
+from utils.export import (format_portfolio_summary, iter_csv, to_arrow_ipc, to_csv, to_excel,
+                          to_parquet)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+BAR_SIZES = [250, 2_500, 25_000, 250_000, 1_000_000, 10_000_000]
+TRADE_SIZES = [10, 100, 1_000, 10_000, 100_000]
+QUICK_BARS = 25_000
+QUICK_TRADES = 1_000
+
+SCORE_PERIODS = [50, 200]
+
+# ספי רגרסיה: יחס לזמן/לזיכרון ב-baseline, והפרש מוחלט מינימלי. הזמן רועש יותר מהזיכרון
+# (מכונות משותפות) ולכן הסף שלו רחב - הוא תופס רגרסיות גסות והזיכרון את העדינות
+TIME_TOLERANCE = 0.50
+MEMORY_TOLERANCE = 0.10
+MIN_TIME_DELTA = 0.010
+MIN_MEMORY_DELTA = 1.0
+
+# קריאה ארוכה מזה נמדדת פעם אחת; קצרה ממנה נחשבת חימום (imports, caches) ונמדדת שוב
+LONG_CALL = 1.0
+
+# name - מזהה המקרה, axis - 'bars' או 'trades', setup - size -> פונקציה ללא פרמטרים למדידה
+Case = namedtuple('Case', ['name', 'axis', 'setup'])
+CASES = []
+
+
+def case(name, axis):
+    """מרשם מקרה בנצ'מרק: הפונקציה המעוטרת מכינה את הקלט ומחזירה את הפונקציה הנמדדת"""
+    def register(setup):
+        CASES.append(Case(name, axis, setup))
+        return setup
+    return register
+
+
+def make_bars(n):
+    """נרות דקה סינתטיים (תדירות דקה - כדי ש-10M נרות ייכנסו בטווח התאריכים של pandas)"""
+    return synthetic_ohlcv(n, seed=n, freq="min", volatility=0.001, drift=0.0)
+
+
+def make_portfolio(n_trades, n_tickers=None):
+    """תיק סינתטי עם n_trades פוזיציות ומחירים עדכניים לכל סימול"""
+    rng = np.random.default_rng(n_trades)
+    n_tickers = n_tickers or max(1, min(n_trades // 4, 2_000))
+    tickers = np.array([f"T{i:04d}" for i in range(n_tickers)])
+    portfolio = pd.DataFrame({
+        'Ticker': rng.choice(tickers, n_trades),
+        'EntryPrice': rng.uniform(50, 150, n_trades).round(2),
+        'Shares': rng.integers(1, 500, n_trades),
+        'Date': pd.Timestamp("2024-06-01") + pd.to_timedelta(rng.integers(0, 86_400 * 365, n_trades), unit='s'),
+        'TradeID': [f"{i:08x}" for i in range(n_trades)],
+    })
+    prices = dict(zip(tickers, rng.uniform(50, 150, n_tickers).round(2)))
+    return portfolio, prices
+
+
+# ----------------------------------------------------------------------
+# מקרים
+# ----------------------------------------------------------------------
+
+@case('data.sync_history', 'bars')
+def _sync_history(n):
+    # הקלטה מקומית של ReplayProvider; הטעינה הראשונה ממלאת את המאגר והנמדדת היא הטעינה החמה
+    fixtures = tempfile.mkdtemp(prefix="bench_fixtures_")
+    make_bars(n).to_parquet(os.path.join(fixtures, "BENCH.parquet"))
+    set_provider(ReplayProvider(fixtures_dir=fixtures))
+    store.clear("BENCH")
+    data.sync_history(["BENCH"], "max")
+    return lambda: data.sync_history(["BENCH"], "max")
+
+
+@case('indicators.advanced', 'bars')
+def _advanced(n):
+    df = make_bars(n)
+    return lambda: calculate_advanced_indicators(df)
+
+
+@case('indicators.all', 'bars')
+def _all(n):
+    df = make_bars(n)
+    return lambda: calculate_all_indicators(df, "ארוך")
+
+
+@case('scoring.final_scores', 'bars')
+def _scores(n):
+    ind = calculate_advanced_indicators(make_bars(n))
+    return lambda: calculate_final_scores(ind, SCORE_PERIODS)
+
+
+@case('recommendations', 'bars')
+def _recommendations(n):
+    ind = calculate_advanced_indicators(make_bars(n))
+    columns = list(ind.columns)
+    return lambda: get_trading_recommendations(ind, columns)
+
+
+@case('chart.candlestick', 'bars')
+def _candlestick(n):
+    # בניית גרף הנרות של טאב 1 וסריאליזציה ל-JSON (מה שנשלח לדפדפן)
+    bars = make_bars(n)
+    bars = bars.assign(SMA_20=bars['Close'].rolling(20).mean(), SMA_50=bars['Close'].rolling(50).mean())
+    return lambda: pio.to_json(candlestick_figure(bars, "bench"))
+
+
+@case('export.to_excel', 'trades')
+def _to_excel(n):
+    portfolio, prices = make_portfolio(n)
+    summary = format_portfolio_summary(portfolio, prices)
+    return lambda: to_excel(summary)
+
+
+@case('export.to_csv', 'trades')
+def _to_csv(n):
+    portfolio, prices = make_portfolio(n)
+    summary = format_portfolio_summary(portfolio, prices)
+    return lambda: to_csv(summary)
+
+
+@case('export.iter_csv', 'trades')
+def _iter_csv(n):
+    portfolio, prices = make_portfolio(n)
+    summary = format_portfolio_summary(portfolio, prices)
+    return lambda: sum(len(part) for part in iter_csv(summary))
+
+
+@case('export.to_parquet', 'trades')
+def _to_parquet(n):
+    portfolio, prices = make_portfolio(n)
+    summary = format_portfolio_summary(portfolio, prices)
+    return lambda: to_parquet(summary, index=False)
+
+
+@case('export.to_arrow_ipc', 'trades')
+def _to_arrow_ipc(n):
+    portfolio, prices = make_portfolio(n)
+    summary = format_portfolio_summary(portfolio, prices)
+    return lambda: to_arrow_ipc(summary, index=False)
+
+
+@case('export.portfolio_summary', 'trades')
+def _portfolio_summary(n):
+    portfolio, prices = make_portfolio(n)
+    return lambda: format_portfolio_summary(portfolio, prices)
+
+
+@case('valuation.valuate', 'trades')
+def _valuate(n):
+    portfolio, prices = make_portfolio(n)
+    return lambda: valuate(portfolio, prices)
+
+
+@case('valuation.equity_curve', 'trades')
+def _equity_curve(n):
+    # 5 שנות מסחר x 200 סימולים; העסקאות מפוזרות על השנה האחרונה
+    portfolio, _ = make_portfolio(n, n_tickers=200)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end="2025-06-30", periods=5 * 252)
+    tickers = sorted(portfolio['Ticker'].unique())
+    steps = rng.normal(0, 0.01, (len(dates), len(tickers)))
+    close = pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), index=dates, columns=tickers)
+    return lambda: equity_curve(portfolio, close)
+
+
+@case('risk.portfolio_risk', 'trades')
+def _portfolio_risk(n):
+    # 5 שנות תשואות יומיות; מספר הפוזיציות = n (עד 1,000)
+    k = min(n, 1_000)
+    rng = np.random.default_rng(k)
+    dates = pd.bdate_range(end="2025-06-30", periods=5 * 252)
+    market = rng.normal(0.0003, 0.01, len(dates))
+    tickers = [f"T{i:04d}" for i in range(k)]
+    returns = pd.DataFrame(
+        market[:, None] * rng.uniform(0.5, 1.5, k) + rng.normal(0, 0.01, (len(dates), k)),
+        index=dates, columns=tickers,
+    )
+    weights = pd.Series(rng.uniform(0, 1, k), index=tickers)
+    benchmark = pd.Series(market, index=dates)
+    return lambda: portfolio_risk(returns, weights, benchmark)
+
+
+@case('ledger.append_delete', 'trades')
+def _ledger(n):
+    portfolio, _ = make_portfolio(n)
+    rows = list(portfolio.itertuples(index=False))
+    deletes = portfolio['TradeID'].iloc[::10].tolist()
+
+    def fn():
+        ledger = TradeLedger()
+        for r in rows:
+            ledger.append(r.Ticker, r.EntryPrice, r.Shares, r.Date, r.TradeID)
+        for trade_id in deletes:
+            ledger.delete(trade_id)
+        return ledger
+    return fn
+
+
+@case('ledger.to_frame', 'trades')
+def _ledger_frame(n):
+    portfolio, _ = make_portfolio(n)
+    ledger = TradeLedger()
+    ledger.extend(portfolio)
+    ledger.delete(portfolio['TradeID'].iloc[0])
+
+    def fn():
+        ledger._view = None  # בלי ה-DataFrame השמור - מודדים את הבנייה עצמה
+        return ledger.to_frame()
+    return fn
+
+
+@case('portfolio_db.save', 'trades')
+def _db_save(n):
+    portfolio, _ = make_portfolio(n)
+    user = f"bench_save_{n}"
+
+    def fn():
+        portfolio_db.clear(user)
+        ledger = TradeLedger()
+        ledger.extend(portfolio)
+        return portfolio_db.save_ledger(ledger, user)
+    return fn
+
+
+@case('portfolio_db.load', 'trades')
+def _db_load(n):
+    portfolio, _ = make_portfolio(n)
+    user = f"bench_load_{n}"
+    portfolio_db.clear(user)
+    ledger = TradeLedger()
+    ledger.extend(portfolio)
+    portfolio_db.save_ledger(ledger, user)
+    return lambda: portfolio_db.load_ledger(user).to_frame()
+
+
+# ----------------------------------------------------------------------
+# מדידה
+# ----------------------------------------------------------------------
+
+def measure(fn, min_time=0.2, max_repeat=5):
+    """
+    מודד זמן ריצה וזיכרון שיא של פונקציה
+
+    פרמטרים:
+    ----------
+    fn : callable
+        הפונקציה הנמדדת (ללא פרמטרים)
+    min_time : float
+        הקריאה הראשונה היא חימום (אלא אם היא ארוכה מ-LONG_CALL); החזרות נמשכות
+        עד שהזמן המצטבר עובר את הסף
+    max_repeat : int
+        מספר חזרות מקסימלי
+
+    מחזיר:
+    -------
+    dict : {'time_s': הזמן המינימלי, 'peak_mb': זיכרון שיא מעבר למצב ההתחלתי, 'repeat': חזרות}
+    """
+    def timed():
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    first = timed()
+    times = [first] if first >= LONG_CALL else []
+    while len(times) < max_repeat and sum(times) < min_time and first < LONG_CALL:
+        times.append(timed())
+
+    # הרצה נפרדת למדידת זיכרון - tracemalloc מאט את ההקצאות ולכן לא משפיע על הזמן
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    return {'time_s': min(times), 'peak_mb': peak / 1e6, 'repeat': len(times)}
+
+
+def sizes_for(axis, args):
+    """הגדלים שנמדדים לציר נתון לפי דגלי שורת הפקודה"""
+    if axis == 'bars':
+        sizes = args.bars or BAR_SIZES
+        limit = QUICK_BARS if args.quick else args.max_bars
+    else:
+        sizes = args.trades or TRADE_SIZES
+        limit = QUICK_TRADES if args.quick else args.max_trades
+    return [s for s in sizes if limit is None or s <= limit]
+
+
+def run(args):
+    """מריץ את המקרים שנבחרו ומחזיר {'מקרה|גודל': תוצאה}"""
+    results = {}
+    for c in CASES:
+        if args.only and not any(c.name.startswith(prefix) for prefix in args.only):
+            continue
+        for n in sizes_for(c.axis, args):
+            fn = c.setup(n)
+            results[f"{c.name}|{n}"] = measure(fn)
+            del fn
+            gc.collect()
+            print(_format_row(c.name, c.axis, n, results[f"{c.name}|{n}"]), flush=True)
+    return results
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """
+    משווה תוצאות ל-baseline
+
+    רגרסיה היא חריגה יחסית מעל הסף שגם גדולה מההפרש המוחלט המינימלי
+    (MIN_TIME_DELTA / MIN_MEMORY_DELTA) - כדי שרעש במדידות של מיקרו-שניות לא ייספר.
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל מדידה עם היחס ל-baseline וסימון רגרסיה
+    """
+    rows = []
+    for key, res in results.items():
+        name, size = key.split('|')
+        ref = baseline.get(key)
+        row = {'case': name, 'size': int(size), 'time_s': res['time_s'], 'peak_mb': res['peak_mb'],
+               'time_ratio': np.nan, 'memory_ratio': np.nan, 'regression': ''}
+        if ref:
+            row['time_ratio'] = res['time_s'] / ref['time_s'] if ref['time_s'] else np.nan
+            row['memory_ratio'] = res['peak_mb'] / ref['peak_mb'] if ref['peak_mb'] else np.nan
+            flags = []
+            if (res['time_s'] > ref['time_s'] * (1 + time_tolerance)
+                    and res['time_s'] - ref['time_s'] > MIN_TIME_DELTA):
+                flags.append('time')
+            if (res['peak_mb'] > ref['peak_mb'] * (1 + memory_tolerance)
+                    and res['peak_mb'] - ref['peak_mb'] > MIN_MEMORY_DELTA):
+                flags.append('memory')
+            row['regression'] = ','.join(flags)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def load_baseline(path):
+    """קורא baseline שמור ({} אם אין)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(results, path, merge=True):
+    """שומר baseline (ממזג עם מדידות קיימות של מקרים וגדלים שלא נמדדו הפעם)"""
+    merged = {**(load_baseline(path) if merge else {}), **results}
+    payload = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': dict(sorted(merged.items(), key=lambda kv: (kv[0].split('|')[0], int(kv[0].split('|')[1])))),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+        f.write('\n')
+
+
+def _format_row(name, axis, n, res):
+    return f"{name:<26} {axis:>6} {n:>10} {res['time_s']:>11.4f} {res['peak_mb']:>10.1f} {res['repeat']:>4}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help=f"עד {QUICK_BARS} נרות ו-{QUICK_TRADES} עסקאות")
+    parser.add_argument('--only', nargs='+', help="קידומות של שמות מקרים (למשל indicators export.to_csv)")
+    parser.add_argument('--bars', type=int, nargs='+', help="גדלי סדרות המחיר")
+    parser.add_argument('--trades', type=int, nargs='+', help="גדלי התיקים")
+    parser.add_argument('--max-bars', type=int, default=None)
+    parser.add_argument('--max-trades', type=int, default=None)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save', action='store_true', help="שמירת התוצאות כ-baseline")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--json', help="נתיב לשמירת התוצאות הגולמיות")
+    args = parser.parse_args()
+
+    set_log_level('error')
+    print(f"{'case':<26} {'axis':>6} {'size':>10} {'time (s)':>11} {'peak (MB)':>10} {'rep':>4}")
+    results = run(args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nbaseline נשמר ב-{args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"\nאין baseline ב-{args.baseline} (הריצו עם --save)")
+        return
+
+    report = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print("\n" + report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    regressions = report[report['regression'] != '']
+    if not regressions.empty:
+        print(f"\n{len(regressions)} רגרסיות מול ה-baseline")
+        sys.exit(1)
+    print("\nאין רגרסיות מול ה-baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+בדיקה היסטורית (backtest) וקטורית לכללי ההמלצה והציון הטכני
+
+הכללים של calculate_final_scores ו-get_trading_recommendations מתורגמים
+למערכי איתותים על כל ההיסטוריה (ללא לולאה על שורות), ומעליהם מדמים
+פוזיציה עם עלויות עסקה והחלקה. הכול מחושב על פאנל (נרות x סימולים),
+כך שמאות סימולים עם 10+ שנות נרות יומיים רצים יחד.
+
+הנחות הסימולציה:
+- האיתות נקבע במחיר הסגירה של נר t והפוזיציה מוחזקת מנר t+1 (ללא הצצה קדימה)
+- פוזיציה 1 (קנייה) או 0 (מחוץ לשוק); עם short=True איתות מכירה פותח -1
+- עלות לכל שינוי פוזיציה: (cost_bps + slippage_bps) / 10,000 מהשווי
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import calculate_final_scores, score_columns
+from core.panel import build_panel, calendar_groups
+from core.registry import compute_indicators
+from core.timing import timed
+
+# תקופות SMA לכלל הציון (כמו בסורק - מגמה לפי SMA_200)
+SCORE_PERIODS = [50, 200]
+
+# אינדיקטורים שכללי ההמלצות קוראים (get_trading_recommendations, ללא ATR שאינו איתות)
+RECOMMENDATION_COLUMNS = ['RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower',
+                          'SMA_20', 'SMA_50', 'SMA_200', '%K', '%D']
+
+BACKTEST_COLUMNS = list(dict.fromkeys(score_columns(SCORE_PERIODS) + RECOMMENDATION_COLUMNS))
+
+RULES = {
+    'score': "ציון טכני",
+    'recommendations': "המלצות מסחר",
+}
+
+# ימי מסחר בשנה לחישובי תשואה ותנודתיות שנתיות
+PERIODS_PER_YEAR = 252
+
+
+# ----------------------------------------------------------------------
+# איתותים
+# ----------------------------------------------------------------------
+
+def _hold(buy, sell, short=False):
+    """
+    מצב פוזיציה מתוך אירועי קנייה/מכירה: האירוע האחרון קובע, ובלי אירוע
+    נשארים בפוזיציה הקודמת (ffill וקטורי לאורך ציר הזמן)
+    """
+    exit_value = -1.0 if short else 0.0
+    events = np.where(buy, 1.0, np.where(sell, exit_value, np.nan))
+    return pd.DataFrame(events).ffill().fillna(0.0).to_numpy().reshape(events.shape)
+
+
+def score_signals(ind, buy=60, sell=40, periods=None, short=False):
+    """
+    פוזיציית יעד לכל נר לפי הציון הטכני
+
+    פרמטרים:
+    ----------
+    ind : pandas.DataFrame או dict
+        אינדיקטורים (עמודות Close ו-score_columns) לסימול אחד או פאנל
+    buy : int
+        ציון שממנו ומעלה נכנסים לקנייה (ברירת מחדל 60 - "קנייה")
+    sell : int
+        ציון שממנו ומטה יוצאים (ברירת מחדל 40 - "מכירה")
+    periods : list, optional
+        תקופות SMA לציון (ברירת מחדל: SCORE_PERIODS)
+    short : bool
+        האם איתות מכירה פותח פוזיציית short
+
+    מחזיר:
+    -------
+    numpy.ndarray : פוזיציית יעד (1/0/-1) לכל נר
+    """
+    score, _, _ = calculate_final_scores(ind, periods or SCORE_PERIODS)
+    return _hold(score >= buy, score <= sell, short)
+
+
+def recommendation_votes(ind):
+    """
+    מאזן ההמלצות (קנייה פחות מכירה) לכל נר - אותם כללים כמו get_trading_recommendations
+
+    מחזיר:
+    -------
+    numpy.ndarray : מספר המלצות הקנייה פחות מספר המלצות המכירה
+    """
+    def col(name):
+        return np.asarray(ind[name], dtype=np.float64)
+
+    close = col('Close')
+    rsi, macd, signal = col('RSI'), col('MACD'), col('MACD_Signal')
+    upper, lower = col('BB_Upper'), col('BB_Lower')
+    sma20, sma50, sma200 = col('SMA_20'), col('SMA_50'), col('SMA_200')
+    k, d = col('%K'), col('%D')
+
+    buys = (
+        (rsi < 30).astype(np.int8)
+        + (macd > signal)
+        + (close < lower)
+        + ((sma20 > sma50) & (sma50 > sma200))
+        + ((k < 20) & (d < 20))
+    )
+    sells = (
+        (rsi > 70).astype(np.int8)
+        # כמו ב-get_trading_recommendations: כל מה שאינו MACD > סיגנל הוא מכירה
+        + ~(macd > signal)
+        + (close > upper)
+        + ((sma20 < sma50) & (sma50 < sma200))
+        + ((k > 80) & (d > 80))
+    )
+    return buys.astype(np.int64) - sells.astype(np.int64)
+
+
+def recommendation_signals(ind, min_votes=1, short=False):
+    """
+    פוזיציית יעד לכל נר לפי מאזן המלצות המסחר
+
+    פרמטרים:
+    ----------
+    ind : pandas.DataFrame או dict
+        אינדיקטורים (Close ו-RECOMMENDATION_COLUMNS) לסימול אחד או פאנל
+    min_votes : int
+        עודף ההמלצות הנדרש לכניסה (קנייה) או ליציאה (מכירה)
+    short : bool
+        האם איתות מכירה פותח פוזיציית short
+
+    מחזיר:
+    -------
+    numpy.ndarray : פוזיציית יעד (1/0/-1) לכל נר
+    """
+    votes = recommendation_votes(ind)
+    return _hold(votes >= min_votes, votes <= -min_votes, short)
+
+
+# ----------------------------------------------------------------------
+# סימולציה ומדדים
+# ----------------------------------------------------------------------
+
+def simulate(close, target, cost_bps=5.0, slippage_bps=5.0):
+    """
+    מדמה פוזיציה לפי פוזיציות יעד
+
+    פרמטרים:
+    ----------
+    close : array-like
+        מחירי סגירה (נרות, או נרות x סימולים)
+    target : array-like
+        פוזיציית יעד שנקבעה בסגירת כל נר
+    cost_bps : float
+        עמלה לכל שינוי פוזיציה (נקודות בסיס מהשווי)
+    slippage_bps : float
+        החלקה לכל שינוי פוזיציה (נקודות בסיס)
+
+    מחזיר:
+    -------
+    dict : מערכים position, returns (נטו לנר), turnover, equity, ו-start - הנר
+    הראשון עם מחיר לכל עמודה (סימול שהונפק אחרי תחילת הפאנל)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+
+    # הפוזיציה בנר t היא היעד שנקבע בסגירת נר t-1
+    position = np.zeros_like(target)
+    position[1:] = target[:-1]
+
+    # נר חסר (חג, סימול שטרם הונפק) - התשואה על פני הפער נזקפת לנר הבא
+    filled = pd.DataFrame(close.reshape(len(close), -1)).ffill().to_numpy().reshape(close.shape)
+    asset = np.zeros_like(close)
+    asset[1:] = filled[1:] / filled[:-1] - 1
+    asset = np.nan_to_num(asset, nan=0.0, posinf=0.0, neginf=0.0)
+
+    turnover = np.abs(np.diff(position, axis=0, prepend=0.0))
+    returns = position * asset - turnover * (cost_bps + slippage_bps) / 1e4
+    equity = np.cumprod(1 + returns, axis=0)
+    start = np.argmax(~np.isnan(close.reshape(len(close), -1)), axis=0)
+    return {'position': position, 'returns': returns, 'turnover': turnover, 'equity': equity,
+            'asset': asset, 'start': start}
+
+
+def _trade_returns(sim):
+    """
+    תשואה לכל עסקה (מהכניסה ועד היציאה, כולל עלויות) - מחושב עם bincount
+    על מזהי עסקאות ולא בלולאה
+
+    מחזיר:
+    -------
+    tuple : (מספר עסקאות לכל סימול, מספר עסקאות מרוויחות לכל סימול)
+    """
+    position = sim['position'].reshape(len(sim['position']), -1)
+    returns = sim['returns'].reshape(position.shape)
+    n_bars, n_cols = position.shape
+
+    prev = np.vstack([np.zeros((1, n_cols)), position[:-1]])
+    entries = (position != 0) & (position != prev)
+    # נר היציאה שייך לעסקה שנסגרת בו (עלות היציאה)
+    in_trade = (position != 0) | (prev != 0)
+
+    trade_id = np.cumsum(entries, axis=0)
+    n_trades = trade_id[-1] if n_bars else np.zeros(n_cols, dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(n_trades)[:-1]))
+    global_id = (trade_id - 1 + offsets)[in_trade & (trade_id > 0)]
+    weights = np.log1p(returns)[in_trade & (trade_id > 0)]
+
+    total = int(n_trades.sum())
+    trade_log = np.bincount(global_id, weights=weights, minlength=total)
+    owner = np.repeat(np.arange(n_cols), n_trades)
+    wins = np.bincount(owner, weights=(trade_log > 0).astype(np.float64), minlength=n_cols)
+    return n_trades, wins
+
+
+def summarize(sim, columns=None, periods_per_year=PERIODS_PER_YEAR):
+    """
+    מדדי ביצוע לכל סימול
+
+    פרמטרים:
+    ----------
+    sim : dict
+        תוצאת simulate
+    columns : list, optional
+        שמות הסימולים (לפאנל)
+    periods_per_year : int
+        נרות בשנה
+
+    מחזיר:
+    -------
+    pandas.DataFrame : תשואה כוללת ושנתית, תנודתיות, Sharpe, ירידה מקסימלית,
+    אחוז עסקאות מרוויחות, מחזור שנתי, חשיפה ותשואת קנה-והחזק
+    """
+    returns = sim['returns'].reshape(len(sim['returns']), -1)
+    equity = sim['equity'].reshape(returns.shape)
+    position = sim['position'].reshape(returns.shape)
+    turnover = sim['turnover'].reshape(returns.shape)
+    # asset יכול להיות עמודה אחת משותפת לכמה פוזיציות (למשל צירופי פרמטרים על סימול אחד)
+    asset = np.broadcast_to(sim['asset'].reshape(len(returns), -1), returns.shape)
+
+    # המדדים השנתיים נמדדים מהנר הראשון של כל סימול (לפניו התשואות אפס), כך
+    # שהם לא תלויים באורך הפאנל שבו הסימול חושב
+    start = np.broadcast_to(np.asarray(sim.get('start', 0)).reshape(-1), (returns.shape[1],))
+    live = np.arange(len(returns))[:, None] >= start
+    bars = live.sum(axis=0)
+    years = np.maximum(bars - 1, 1) / periods_per_year
+    total = equity[-1] - 1
+    peak = np.maximum.accumulate(equity, axis=0)
+    drawdown = equity / peak - 1
+    mean_return = returns.sum(axis=0) / np.maximum(bars, 1)
+    deviation = np.where(live, returns - mean_return, 0.0)
+    vol = np.where(bars > 1, np.sqrt((deviation ** 2).sum(axis=0) / np.maximum(bars - 1, 1)), 0.0)
+    vol = vol * np.sqrt(periods_per_year)
+    mean = mean_return * periods_per_year
+    n_trades, wins = _trade_returns(sim)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = pd.DataFrame({
+            'Total Return': total,
+            'CAGR': np.where(equity[-1] > 0, equity[-1] ** (1 / years) - 1, -1.0),
+            'Volatility': vol,
+            'Sharpe': np.where(vol > 0, mean / vol, np.nan),
+            'Max Drawdown': drawdown.min(axis=0),
+            'Trades': n_trades,
+            'Hit Rate': np.where(n_trades > 0, wins / n_trades, np.nan),
+            'Turnover': turnover.sum(axis=0) / years,
+            'Exposure': ((position != 0) & live).sum(axis=0) / np.maximum(bars, 1),
+            'Buy & Hold': np.prod(1 + asset, axis=0) - 1,
+        }, index=columns)
+    return metrics
+
+
+# ----------------------------------------------------------------------
+# הרצה מלאה
+# ----------------------------------------------------------------------
+
+@timed('backtest.backtest_indicators')
+def backtest_indicators(ind, rule='score', cost_bps=5.0, slippage_bps=5.0, short=False, **params):
+    """
+    בדיקה היסטורית על אינדיקטורים שכבר חושבו
+
+    פרמטרים:
+    ----------
+    ind : pandas.DataFrame או dict
+        אינדיקטורים לסימול אחד (DataFrame) או פאנל {אינדיקטור: DataFrame רחב}
+    rule : str
+        'score' או 'recommendations' (ראו RULES)
+    cost_bps, slippage_bps : float
+        עלויות לכל שינוי פוזיציה
+    short : bool
+        האם איתות מכירה פותח פוזיציית short
+    **params :
+        פרמטרים לכלל (buy/sell/periods לציון, min_votes להמלצות)
+
+    מחזיר:
+    -------
+    tuple : (dict של simulate, פוזיציות יעד)
+    """
+    if rule == 'score':
+        target = score_signals(ind, short=short, **params)
+    elif rule == 'recommendations':
+        target = recommendation_signals(ind, short=short, **params)
+    else:
+        raise ValueError(f"כלל לא מוכר: {rule}")
+    return simulate(ind['Close'], target, cost_bps, slippage_bps), target
+
+
+def run_backtest(frames, rule='score', cost_bps=5.0, slippage_bps=5.0, short=False, **params):
+    """
+    בדיקה היסטורית של כלל מסחר על כל הסימולים יחד
+
+    פרמטרים:
+    ----------
+    frames : dict
+        {סימול: DataFrame עם נתוני מחיר} (למשל מ-load_many או sync_history)
+    rule : str
+        'score' או 'recommendations'
+    cost_bps, slippage_bps : float
+        עלויות לכל שינוי פוזיציה (נקודות בסיס)
+    short : bool
+        האם איתות מכירה פותח פוזיציית short
+    **params :
+        פרמטרים לכלל (ראו backtest_indicators)
+
+    מחזיר:
+    -------
+    tuple : (DataFrame מדדים לכל סימול, DataFrame עקומת הון נרות x סימולים)
+    """
+    # פאנל לכל לוח מסחר (calendar_groups) - שורות NaN של לוח אחר לא נכנסות
+    # לחלונות הנעים, ותוצאת כל סימול לא תלויה בסימולים האחרים בהרצה
+    metrics, equity = [], []
+    for group in calendar_groups(frames):
+        panel = build_panel({t: frames[t] for t in group})
+        close = panel['Close']
+        ind = {'Close': close, **compute_indicators(panel, BACKTEST_COLUMNS, profile='advanced')}
+        sim, _ = backtest_indicators(ind, rule, cost_bps, slippage_bps, short, **params)
+        metrics.append(summarize(sim, columns=close.columns))
+        equity.append(pd.DataFrame(sim['equity'], index=close.index, columns=close.columns)
+                      .where(close.notna().cummax()))
+    if not metrics:
+        return pd.DataFrame(), pd.DataFrame()
+
+    metrics = pd.concat(metrics)
+    equity = pd.concat(equity, axis=1, sort=True)
+    return metrics.sort_values('Total Return', ascending=False), equity
@@ -2,14 +2,112 @@
 מודול לטעינת נתוני מניות
 """
 
-import yfinance as yf
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import pandas as pd
 import streamlit as st
 
+from core import store
+from core.panel import build_panel
+from core.providers import get_provider, period_start
+from core.timing import note, stage, timed
+
+# סטייה יחסית מותרת בנר החופף בין הנתונים השמורים לחדשים; מעבר לה
+# מניחים שבוצעה התאמה (פיצול/דיבידנד) וטוענים מחדש את כל ההיסטוריה
+ADJUSTMENT_TOLERANCE = 1e-4
+
+# תקופת ההיסטוריה הקנונית - כל תצוגות התקופה (1mo-2y) הן חיתוך שלה
+HISTORY_PERIOD = "2y"
+
+# תוקף הנתונים הפונדמנטליים בשניות (ברירת מחדל: 24 שעות)
+FUNDAMENTALS_TTL = int(os.environ.get("STOCK_TRACKER_FUNDAMENTALS_TTL", str(24 * 3600)))
+
+# שדות Ticker.info שנשמרים ב-cache הפונדמנטלי: אלו שנצרכים ע"י
+# core/indicators.analyze_fundamentals ובטאב הנתונים הפונדמנטליים
+FUNDAMENTAL_FIELDS = (
+    # פרטי החברה
+    'longName', 'shortName', 'industry', 'sector', 'exchange', 'country', 'currency',
+    'website', 'fullTimeEmployees', 'city', 'state', 'zip', 'phone', 'longBusinessSummary',
+    # מדדים פיננסיים
+    'marketCap', 'forwardPE', 'trailingPE', 'priceToBook', 'dividendYield', 'profitMargins',
+    'revenueGrowth', 'earningsGrowth', 'debtToEquity', 'currentRatio', 'returnOnAssets',
+    'returnOnEquity',
+    # תחזית אנליסטים
+    'currentPrice', 'regularMarketPrice', 'targetMeanPrice', 'targetMedianPrice',
+)
+
+# מספר מקסימלי של בקשות רשת מקבילות (ניתן לשנות דרך משתנה סביבה)
+FETCH_WORKERS = int(os.environ.get("STOCK_TRACKER_FETCH_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """מחזיר thread pool משותף לבקשות רשת (נוצר בקריאה הראשונה)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, FETCH_WORKERS), thread_name_prefix="fetch")
+        return _executor
+
+
+def _fetch_info(ticker):
+    """
+    מושך את Ticker.info עבור סימול ושומר את השדות הפונדמנטליים במאגר
+    
+    מחזיר:
+    -------
+    tuple : (dict עם מידע, הודעת שגיאה או None)
+    """
+    try:
+        info = get_provider().info(ticker) or {}
+    except Exception as e:
+        return {}, str(e)
+    
+    fields = {k: info[k] for k in FUNDAMENTAL_FIELDS if info.get(k) is not None}
+    if fields:
+        store.write_fundamentals(ticker, fields)
+    return fields, None
+
+
+def _submit_info(ticker):
+    """
+    מחזיר future עם נתונים פונדמנטליים: מה-cache אם בתוקף, אחרת משיכה ברקע
+    """
+    cached = store.read_fundamentals(ticker, FUNDAMENTALS_TTL)
+    if cached is not None:
+        future = Future()
+        future.set_result((cached, None))
+        return future
+    return _get_executor().submit(_fetch_info, ticker)
+
+
+def load_fundamentals(ticker):
+    """
+    מחזיר נתונים פונדמנטליים עבור סימול מה-cache הייעודי
+    
+    הנתונים נשמרים בדיסק ומתרעננים רק לאחר FUNDAMENTALS_TTL שניות, ללא
+    קשר לרענון נתוני המחיר.
+    
+    פרמטרים:
+    ----------
+    ticker : str
+        סימול המניה
+    
+    מחזיר:
+    -------
+    dict : השדות הפונדמנטליים (FUNDAMENTAL_FIELDS) הזמינים
+    """
+    info, _ = _submit_info(ticker.upper().strip()).result()
+    return info
+
 @st.cache_data(ttl=3600)
 def load_stock_data(ticker):
     """
-    טוען נתוני מניות מ-yfinance
+    טוען נתוני מניות מספק הנתונים הפעיל (ברירת מחדל: yfinance)
     
     פרמטרים:
     ----------
@@ -20,37 +118,28 @@ def load_stock_data(ticker):
     -------
     tuple : (DataFrame עם נתוני מחיר, dict עם מידע, str עם שם החברה)
     """
+    # הגוף רץ רק כשאין פגיעה ב-st.cache_data
+    note(cache='miss')
     try:
-        # שימוש ב-download עם תקופת זמן ארוכה יותר
-        df = yf.download(
-            ticker, 
-            period="2y", 
-            auto_adjust=True, 
-            progress=False,
-            timeout=10
-        )
+        # נתונים פונדמנטליים מה-cache הייעודי; אם פג תוקפם הם נמשכים במקביל להיסטוריה
+        info_future = _submit_info(ticker)
         
-        # טיפול ב-MultiIndex columns
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        # היסטוריה מהמאגר המקומי + השלמת הנרות החסרים בלבד
+        df = sync_history([ticker], period=HISTORY_PERIOD).get(ticker.upper().strip())
         
-        if df.empty or len(df) < 5:
+        if df is None or df.empty or len(df) < 5:
             st.warning(f"⚠️  נתונים מוגבלים או ריקים עבור {ticker}")
             return None, None, ticker
         
-        # משיכת מידע נוסף בנפרד
-        info = {}
-        full_name = ticker
+        info, error = info_future.result()
+        if error:
+            st.warning(f"⚠️  לא הצלחנו לקבל מידע נוסף: {error}")
         
-        try:
-            t_obj = yf.Ticker(ticker)
-            info = t_obj.info
-            
-            # שם מלא של החברה
-            full_name = info.get('longName', info.get('shortName', ticker))
-            
-        except Exception as e:
-            st.warning(f"⚠️  לא הצלחנו לקבל מידע נוסף: {str(e)}")
+        # שם מלא של החברה
+        full_name = info.get('longName', info.get('shortName', ticker))
+        
+        # המחיר הנוכחי נלקח מההיסטוריה העדכנית ולא מה-cache הפונדמנטלי
+        info = dict(info, currentPrice=float(df['Close'].iloc[-1]))
         
         return df, info, full_name
         
@@ -66,3 +155,269 @@ def load_stock_data(ticker):
         """)
         
         return None, None, ticker
+
+
+def _normalize_tickers(tickers):
+    """
+    מנקה ומסיר כפילויות מרשימת סימולים תוך שמירה על הסדר המקורי
+    """
+    unique = []
+    seen = set()
+    for t in tickers:
+        if not t:
+            continue
+        t = str(t).upper().strip()
+        if t and t not in seen:
+            seen.add(t)
+            unique.append(t)
+    return unique
+
+
+def _clip(df, start):
+    """
+    חותך DataFrame כך שיכלול רק נרות מתאריך start ואילך
+    
+    החיתוך מבוצע לפי מיקום (searchsorted על אינדקס ממוין) ולכן מחזיר
+    view על הנתונים המקוריים ללא העתקה.
+    """
+    if df is None or start is None:
+        return df
+    return df.iloc[df.index.searchsorted(_localize(start, df.index)):]
+
+
+def _localize(ts, index):
+    """מתאים חותמת זמן ללא אזור זמן לאזור הזמן של האינדקס (נרות תוך-יומיים של yfinance)"""
+    if index.tz is not None and ts.tz is None:
+        return ts.tz_localize(index.tz)
+    return ts
+
+
+def slice_period(df, period):
+    """
+    מחזיר את החלק של ההיסטוריה הקנונית שמתאים לתקופה (1mo, 3mo, 6mo, 1y, 2y)
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        היסטוריה ממוינת לפי תאריך (למשל מ-load_stock_data)
+    period : str
+        תקופה בפורמט של yfinance
+    
+    מחזיר:
+    -------
+    pandas.DataFrame : חיתוך (view) של df ללא קריאת רשת
+    """
+    return _clip(df, period_start(period))
+
+
+def _is_readjusted(stored, fresh):
+    """
+    בודק האם מחירי הנר החופף השתנו (התאמת פיצול/דיבידנד רטרואקטיבית)
+    """
+    overlap = stored.index.intersection(fresh.index)
+    if len(overlap) < 2:
+        return False
+    
+    # הנר האחרון עשוי להיות נר פתוח של היום - משווים את זה שלפניו
+    ts = overlap[-2]
+    old_close = stored.at[ts, 'Close']
+    new_close = fresh.at[ts, 'Close']
+    if pd.isna(old_close) or pd.isna(new_close) or old_close == 0:
+        return False
+    return abs(new_close / old_close - 1) > ADJUSTMENT_TOLERANCE
+
+
+@timed('data.sync_history')
+def sync_history(tickers, period=HISTORY_PERIOD, interval="1d"):
+    """
+    מחזיר היסטוריית מחירים עבור סימולים, תוך שימוש במאגר המקומי
+    
+    סימולים שכבר שמורים במאגר (ומכסים את התקופה המבוקשת) מקבלים בקשת
+    download קטנה רק עבור הנרות שמאז הנר האחרון השמור; סימולים חדשים
+    נטענים במלואם בקריאה מרוכזת אחת. התוצאה נשמרת חזרה למאגר.
+    
+    פרמטרים:
+    ----------
+    tickers : iterable
+        סימולי המניות
+    period : str
+        תקופת ההיסטוריה המבוקשת (ברירת מחדל: 2y)
+    interval : str
+        מרווח הנרות (1d, 1h, 15m, 5m, 1m); לכל מרווח מאגר נפרד
+    
+    מחזיר:
+    -------
+    dict : מילון {סימול: DataFrame}; סימולים שנכשלו לא יופיעו
+    """
+    tickers = _normalize_tickers(tickers)
+    provider = get_provider()
+    start = period_start(period)
+    # עבור period="max" הכיסוי הנדרש הוא מתחילת ההיסטוריה
+    required_from = start if start is not None else pd.Timestamp.min
+    
+    frames = {}
+    need_full = []
+    delta_groups = {}
+    
+    with stage('store.read_bars', tickers=len(tickers)):
+        coverage = store.coverage(tickers, interval)
+        for t in tickers:
+            stored = store.read_bars(t, interval)
+            covered = coverage[t]
+            # הנר האחרון השמור ישן מתחילת התקופה - הספק לא בהכרח מחזיק את הפער
+            # (נרות תוך-יומיים זמינים רק לימים האחרונים), ולכן טעינה מלאה
+            if (stored is None or covered is None or covered > required_from
+                    or (start is not None and stored.index[-1] < _localize(start, stored.index))):
+                need_full.append(t)
+                continue
+            
+            frames[t] = stored
+            # בקשה מהנר הלפני-אחרון: מעדכנת את הנר האחרון ומאפשרת לזהות התאמות
+            delta_start = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+            delta_groups.setdefault(delta_start, []).append(t)
+    
+    # עדכון מצטבר - בקשה אחת לכל תאריך התחלה (בדרך כלל קבוצה אחת)
+    for delta_start, group in delta_groups.items():
+        with stage('provider.history', kind='delta', tickers=len(group)):
+            fresh = provider.history(group, start=delta_start, interval=interval)
+        for t in group:
+            if t not in fresh:
+                continue
+            if _is_readjusted(frames[t], fresh[t]):
+                frames.pop(t)
+                need_full.append(t)
+            else:
+                frames[t] = store.append_bars(t, fresh[t], interval, stored=frames[t])
+    
+    # טעינה מלאה מרוכזת עבור סימולים חדשים
+    if need_full:
+        with stage('provider.history', kind='full', tickers=len(need_full)):
+            fetched = provider.history(need_full, period=period, interval=interval)
+        for t, df in fetched.items():
+            store.write_bars(t, df, interval)
+            frames[t] = df
+        store.set_covered_from([t for t, df in fetched.items() if df is not None and not df.empty],
+                               required_from, interval)
+    
+    return {t: _clip(df, start) for t, df in frames.items() if df is not None and not df.empty}
+
+
+@st.cache_data(ttl=3600)
+def _load_many_cached(tickers, period):
+    """
+    טעינה מרוכזת של היסטוריות מחיר (נשמר ב-cache לפי tuple של סימולים)
+    """
+    note(cache='miss')
+    return sync_history(tickers, period)
+
+
+def load_many(tickers, period=HISTORY_PERIOD, with_info=False):
+    """
+    טוען היסטוריות מחיר עבור מספר מניות בבת אחת
+    
+    במקום קריאה נפרדת ל-yfinance עבור כל פוזיציה, הסימולים מאוחדים
+    ומורדים בקריאת download אחת, והתוצאה מפוצלת ל-DataFrame לכל סימול.
+    
+    פרמטרים:
+    ----------
+    tickers : iterable
+        סימולי המניות (כפילויות מוסרות אוטומטית)
+    period : str
+        תקופת ההיסטוריה (ברירת מחדל: 2y)
+    with_info : bool
+        האם להחזיר גם נתונים פונדמנטליים לכל סימול (מה-cache, או במקביל להורדה)
+    
+    מחזיר:
+    -------
+    dict : מילון {סימול: DataFrame עם נתוני מחיר}; סימולים שנכשלו לא יופיעו
+    אם with_info=True מוחזר tuple : (מילון מחירים, מילון {סימול: info})
+    """
+    unique = _normalize_tickers(tickers)
+    if not unique:
+        return ({}, {}) if with_info else {}
+    
+    # מיון כדי שאותה קבוצת סימולים תפגע באותו מפתח cache
+    key = tuple(sorted(unique))
+    
+    # נתונים פונדמנטליים מה-cache; חסרים נמשכים במקביל (עד FETCH_WORKERS בקשות) בזמן ההורדה
+    info_futures = {t: _submit_info(t) for t in key} if with_info else {}
+    
+    try:
+        with stage('data.load_many', cache='hit', tickers=len(key)):
+            frames = _load_many_cached(key, period)
+    except Exception as e:
+        st.warning(f"⚠️  שגיאה בטעינה מרוכזת של נתונים: {str(e)}")
+        frames = {}
+    
+    if with_info:
+        return frames, {t: f.result()[0] for t, f in info_futures.items()}
+    return frames
+
+
+def period_since(start):
+    """
+    התקופה הקנונית הקצרה ביותר שמכסה היסטוריה מתאריך start (לפחות HISTORY_PERIOD)
+    """
+    start = pd.Timestamp(start)
+    for period in (HISTORY_PERIOD, "5y", "10y"):
+        if period_start(period) <= start:
+            return period
+    return "max"
+
+
+@st.cache_data(ttl=3600)
+def load_close_panel(tickers, period=HISTORY_PERIOD):
+    """
+    פאנל מחירי סגירה (תאריכים x סימולים) לכמה מניות, נשמר ב-cache
+    
+    פרמטרים:
+    ----------
+    tickers : tuple
+        סימולי המניות (tuple כדי שישמש כמפתח cache)
+    period : str
+        תקופת ההיסטוריה
+    
+    מחזיר:
+    -------
+    pandas.DataFrame : בלוק float64 אחד; תאריך שבו לסימול אין נר הוא NaN
+    """
+    note(cache='miss')
+    return build_panel(load_many(tickers, period), ('Close',))['Close']
+
+
+@st.cache_data(ttl=3600)
+def load_return_panel(tickers, period=HISTORY_PERIOD):
+    """
+    פאנל תשואות יומיות (תאריכים x סימולים), נשמר ב-cache
+    
+    מחושב מפאנל הסגירה (load_close_panel) אחרי מילוי קדימה; השורה הראשונה
+    (ללא תשואה) מושמטת, ותאריך לפני הנר הראשון של סימול נשאר NaN.
+    
+    מחזיר:
+    -------
+    pandas.DataFrame : float64
+    """
+    note(cache='miss')
+    return load_close_panel(tickers, period).ffill().pct_change(fill_method=None).iloc[1:]
+
+
+def latest_prices(frames):
+    """
+    מחלץ את מחיר הסגירה האחרון מכל DataFrame במילון
+    
+    פרמטרים:
+    ----------
+    frames : dict
+        מילון {סימול: DataFrame} כפי שמוחזר מ-load_many
+    
+    מחזיר:
+    -------
+    dict : מילון {סימול: מחיר סגירה אחרון}
+    """
+    prices = {}
+    for t, df in frames.items():
+        if df is not None and 'Close' in df.columns:
+            close = df['Close'].dropna()
+            if not close.empty:
+                prices[t] = float(close.iloc[-1])
+    return prices
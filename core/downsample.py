@@ -0,0 +1,124 @@
+"""
+הקטנת מספר הנקודות בגרפים לפני שליחתם לדפדפן
+
+- ohlc_buckets: נרות רצופים מאוחדים לנר אחד (Open ראשון, High מקסימום, Low
+  מינימום, Close אחרון, Volume סכום), כך שמספר הנרות בטווח המוצג לא עולה על
+  max_bars. הדליים מעוגנים לנר האחרון - הנר העדכני תמיד שלם, והחלקי הוא הראשון.
+  החישוב וקטורי (np.maximum.reduceat וכו') - ללא לולאה על דליים.
+- lttb: Largest-Triangle-Three-Buckets לקווים (ממוצעים נעים ...): מכל דלי נבחרת
+  הנקודה שיוצרת את המשולש הגדול ביותר עם הנקודה שנבחרה בדלי הקודם וממוצע הדלי
+  הבא - צורת הקו והקיצונים נשמרים עם מעט נקודות.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def bucket_starts(n, max_bars):
+    """
+    תחילת כל דלי כשמחלקים n נרות לכל היותר ל-max_bars דליים שווים
+
+    מחזיר:
+    -------
+    numpy.ndarray : אינדקס הנר הראשון בכל דלי (הדלי הראשון עשוי להיות קצר יותר)
+    """
+    size = max(1, -(-n // max(1, max_bars)))
+    first = n - size * (-(-n // size))
+    return np.maximum(np.arange(first, n, size), 0)
+
+
+def ohlc_buckets(df, max_bars):
+    """
+    מאחד נרות רצופים כך שיוצגו לכל היותר max_bars נרות
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        נרות עם Open, High, Low, Close (ו-Volume אופציונלי), ממוינים לפי זמן
+    max_bars : int
+        מספר הנרות המקסימלי
+
+    מחזיר:
+    -------
+    pandas.DataFrame : אותן עמודות OHLCV; האינדקס הוא זמן הנר הראשון בכל דלי.
+    כשאין צורך באיחוד מוחזר df עצמו
+    """
+    n = len(df)
+    if n <= max_bars:
+        return df
+    starts = bucket_starts(n, max_bars)
+    ends = np.append(starts[1:], n) - 1
+
+    def values(col):
+        return df[col].to_numpy(dtype=np.float64)
+
+    # NaN בנר בודד לא מבטל את כל הדלי (fmax/fmin מדלגים על NaN)
+    out = {
+        'Open': values('Open')[starts],
+        'High': np.fmax.reduceat(values('High'), starts),
+        'Low': np.fmin.reduceat(values('Low'), starts),
+        'Close': values('Close')[ends],
+    }
+    if 'Volume' in df.columns:
+        out['Volume'] = np.add.reduceat(np.nan_to_num(values('Volume')), starts)
+    return pd.DataFrame(out, index=df.index[starts])
+
+
+def lttb(x, y, max_points):
+    """
+    בחירת נקודות לקו בשיטת Largest-Triangle-Three-Buckets
+
+    פרמטרים:
+    ----------
+    x : array-like
+        ערכי ציר X מספריים ועולים (למשל מיקום הנר)
+    y : array-like
+        ערכי הקו (ללא NaN)
+    max_points : int
+        מספר הנקודות המקסימלי (לפחות 3); הנקודה הראשונה והאחרונה נשמרות תמיד
+
+    מחזיר:
+    -------
+    numpy.ndarray : אינדקסים ממוינים של הנקודות שנבחרו
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    # n-2 הנקודות הפנימיות מחולקות ל-max_points-2 דליים
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    # ממוצע כל דלי (לשימוש כקודקוד "הבא"), ולאחרון - הנקודה האחרונה
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # פעמיים שטח המשולש (a, נקודה בדלי, ממוצע הדלי הבא)
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def reduce_line(series, max_points):
+    """
+    קו (pandas.Series לפי זמן) מוקטן ב-LTTB; NaN (למשל חימום של ממוצע נע) מושמטים
+
+    מחזיר:
+    -------
+    pandas.Series : תת-סדרה של series
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    return series.iloc[lttb(np.arange(len(series)), series.to_numpy(dtype=np.float64), max_points)]
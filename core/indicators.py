@@ -5,7 +5,11 @@
 import pandas as pd
 import numpy as np
 
+from core.registry import compute_indicators
+from core.timing import timed
+
 # --- חישובים טכניים ---
+@timed('indicators.calculate_all')
 def calculate_all_indicators(df, ma_type):
     """
     מחשב את כל האינדיקטורים הטכניים עבור DataFrame של מחירי מניות
@@ -39,50 +43,39 @@ def calculate_all_indicators(df, ma_type):
     else:
         periods = [100, 150, 200]
     
-    # חישוב Simple Moving Averages
-    for p in periods:
-        df_calc[f'SMA_{p}'] = df_calc['Close'].rolling(window=p, min_periods=1).mean()
-    
-    # חישוב RSI (Relative Strength Index)
-    delta = df_calc['Close'].diff()
-    
-    # יצירת סדרות של רווחים והפסדים
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    
-    # חישוב ממוצע נע מעריכי
-    avg_gain = gain.rolling(window=14, min_periods=1).mean()
-    avg_loss = loss.rolling(window=14, min_periods=1).mean()
+    # SMA, RSI, MACD, Bollinger Bands ו-EMA - דרך גרף האינדיקטורים (ראו core/registry)
+    df_calc = df_calc.assign(**compute_indicators(df_calc, profile='core', periods=periods))
     
-    # חישוב RS ו-RSI (עם הגנה מפני חלוקה באפס)
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    df_calc['RSI'] = 100 - (100 / (1 + rs))
-    
-    # הגבלת ערכי RSI בין 0-100 והחלפת NaN ב-50
-    df_calc['RSI'] = df_calc['RSI'].clip(0, 100).fillna(50)
-    
-    # חישוב MACD (Moving Average Convergence Divergence)
-    ema12 = df_calc['Close'].ewm(span=12, adjust=False, min_periods=1).mean()
-    ema26 = df_calc['Close'].ewm(span=26, adjust=False, min_periods=1).mean()
-    df_calc['MACD'] = ema12 - ema26
-    df_calc['MACD_Signal'] = df_calc['MACD'].ewm(span=9, adjust=False, min_periods=1).mean()
-    df_calc['MACD_Histogram'] = df_calc['MACD'] - df_calc['MACD_Signal']
+    return df_calc, periods
+
+
+# --- אינדיקטורים מתקדמים (טאב הניתוח הטכני) ---
+@timed('indicators.calculate_advanced')
+def calculate_advanced_indicators(df):
+    """מחשב את כל האינדיקטורים הטכניים"""
+    df_calc = df.copy()
     
-    # חישוב Bollinger Bands
-    df_calc['BB_Mid'] = df_calc['Close'].rolling(window=20, min_periods=1).mean()
-    df_calc['BB_Std'] = df_calc['Close'].rolling(window=20, min_periods=1).std()
-    df_calc['BB_Upper'] = df_calc['BB_Mid'] + (2 * df_calc['BB_Std'])
-    df_calc['BB_Lower'] = df_calc['BB_Mid'] - (2 * df_calc['BB_Std'])
-    df_calc['BB_Width'] = (df_calc['BB_Upper'] - df_calc['BB_Lower']) / df_calc['BB_Mid']
+    if 'Close' not in df_calc.columns:
+        if 'Adj Close' in df_calc.columns:
+            df_calc['Close'] = df_calc['Adj Close']
+        else:
+            return df_calc
     
-    # חישוב ממוצעים נעים מעריכיים נוספים
-    df_calc['EMA_20'] = df_calc['Close'].ewm(span=20, adjust=False, min_periods=1).mean()
-    df_calc['EMA_50'] = df_calc['Close'].ewm(span=50, adjust=False, min_periods=1).mean()
+    # כל האינדיקטורים דרך גרף האינדיקטורים - ביניים משותפים מחושבים פעם אחת
+    df_calc = df_calc.assign(**compute_indicators(df_calc, profile='advanced'))
     
-    return df_calc, periods
+    return df_calc
 
 
 # --- חישוב ציון טכני ---
+# (המלצה, צבע) לכל טווח ציון
+SCORE_STRONG_BUY = ("קנייה חזקה 🚀", "green")
+SCORE_BUY = ("קנייה ✅", "#90ee90")
+SCORE_STRONG_SELL = ("מכירה חזקה 📉", "red")
+SCORE_SELL = ("מכירה 🔻", "orange")
+SCORE_NEUTRAL = ("נייטרלי ✋", "gray")
+
+
 def calculate_final_score(row, periods):
     """
     מחשב ציון טכני כולל עבור שורה בודדת
@@ -144,15 +137,262 @@ def calculate_final_score(row, periods):
     
     # קביעת המלצה וצבע לפי הציון
     if score >= 80:
-        return score, "קנייה חזקה 🚀", "green"
+        return (score,) + SCORE_STRONG_BUY
     elif score >= 60:
-        return score, "קנייה ✅", "#90ee90"
+        return (score,) + SCORE_BUY
     elif score <= 20:
-        return score, "מכירה חזקה 📉", "red"
+        return (score,) + SCORE_STRONG_SELL
     elif score <= 40:
-        return score, "מכירה 🔻", "orange"
+        return (score,) + SCORE_SELL
     else:
-        return score, "נייטרלי ✋", "gray"
+        return (score,) + SCORE_NEUTRAL
+
+
+def score_columns(periods):
+    """
+    העמודות שהציון הטכני קורא (מלבד Close) - לבקשה חלקית מ-compute_indicators:
+    
+        compute_indicators(df, score_columns(periods), profile='core', periods=periods)
+    """
+    return ['RSI', 'MACD', 'MACD_Signal', f'SMA_{periods[-1]}', 'BB_Upper', 'BB_Lower']
+
+
+# משקל כל רכיב בציון וספי RSI (ברירות המחדל של calculate_final_score)
+SCORE_WEIGHTS = {'rsi': 15, 'macd': 15, 'trend': 10, 'bb': 5}
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+
+
+def score_components(df, periods, rsi_low=RSI_OVERSOLD, rsi_high=RSI_OVERBOUGHT):
+    """
+    כיוון כל רכיב של הציון הטכני לכל נר: 1 חיובי, 1- שלילי, 0 ללא תרומה
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame או dict
+        אינדיקטורים (ראו calculate_final_scores)
+    periods : list
+        רשימת תקופות SMA (המגמה נמדדת מול האחרונה)
+    rsi_low, rsi_high : float
+        ספי מכירת יתר / קניית יתר של RSI
+    
+    מחזיר:
+    -------
+    dict : {'rsi', 'macd', 'trend', 'bb': מערך int64} - רק רכיבים שהעמודות שלהם קיימות
+    """
+    names = df.columns if isinstance(df, pd.DataFrame) else df.keys()
+    
+    def col(name):
+        return np.asarray(df[name], dtype=np.float64) if name in names else None
+    
+    components = {}
+    close = col('Close')
+    
+    # RSI (השוואה עם NaN מחזירה False - אין תרומה לציון)
+    rsi = col('RSI')
+    if rsi is not None:
+        components['rsi'] = np.where(rsi < rsi_low, 1, np.where(rsi > rsi_high, -1, 0))
+    
+    # MACD
+    macd, signal = col('MACD'), col('MACD_Signal')
+    if macd is not None and signal is not None:
+        valid = ~np.isnan(macd) & ~np.isnan(signal)
+        components['macd'] = np.where(valid, np.where(macd > signal, 1, -1), 0)
+    
+    # מגמה (מחיר vs SMA ארוך טווח)
+    sma = col(f'SMA_{periods[-1]}')
+    if sma is not None and close is not None:
+        valid = ~np.isnan(sma) & ~np.isnan(close)
+        components['trend'] = np.where(valid, np.where(close > sma, 1, -1), 0)
+    
+    # Bollinger Bands
+    upper, lower = col('BB_Upper'), col('BB_Lower')
+    if close is not None and upper is not None and lower is not None:
+        components['bb'] = np.where(close < lower, 1, np.where(close > upper, -1, 0))
+    
+    return {k: v.astype(np.int64) for k, v in components.items()}
+
+
+@timed('indicators.final_scores')
+def calculate_final_scores(df, periods, weights=None, rsi_low=RSI_OVERSOLD, rsi_high=RSI_OVERBOUGHT):
+    """
+    מחשב ציון טכני לכל הנרות בבת אחת (גרסה וקטורית של calculate_final_score)
+    
+    התוצאה זהה לחלוטין להפעלת calculate_final_score על כל שורה
+    (df.apply(axis=1)), אך מחושבת במעבר NumPy אחד על כל העמודות.
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame או dict
+        DataFrame עם אינדיקטורים, או פאנל {אינדיקטור: DataFrame של נרות x סימולים}
+        (המערכים המוחזרים יהיו אז דו-ממדיים)
+    periods : list
+        רשימת תקופות SMA
+    weights : dict, optional
+        משקל לכל רכיב (ברירת מחדל: SCORE_WEIGHTS)
+    rsi_low, rsi_high : float
+        ספי RSI (ברירת מחדל: 30/70)
+    
+    מחזיר:
+    -------
+    tuple : (מערך ציונים, מערך המלצות, מערך צבעים)
+    """
+    weights = SCORE_WEIGHTS if weights is None else {**SCORE_WEIGHTS, **weights}
+    names = df.columns if isinstance(df, pd.DataFrame) else df.keys()
+    shape = np.shape(df['Close']) if 'Close' in names else (len(df),)
+    
+    score = np.full(shape, 50, dtype=np.int64)
+    for name, direction in score_components(df, periods, rsi_low, rsi_high).items():
+        score += weights[name] * direction
+    
+    score = np.clip(score, 0, 100)
+    
+    # קביעת המלצה וצבע לפי הציון - אותם ספים כמו בגרסת השורה הבודדת
+    conditions = [score >= 80, score >= 60, score <= 20, score <= 40]
+    bands = [SCORE_STRONG_BUY, SCORE_BUY, SCORE_STRONG_SELL, SCORE_SELL]
+    labels = np.select(conditions, [b[0] for b in bands], default=SCORE_NEUTRAL[0])
+    colors = np.select(conditions, [b[1] for b in bands], default=SCORE_NEUTRAL[1])
+    
+    return score, labels, colors
+
+
+# --- המלצות מסחר ---
+@timed('indicators.recommendations')
+def get_trading_recommendations(df, indicators):
+    """מספק המלצות מסחר מפורטות לפי אינדיקטורים"""
+    recommendations = []
+    last = df.iloc[-1]
+    
+    # ===== RSI המלצות =====
+    if 'RSI' in last:
+        rsi = last['RSI']
+        if rsi > 70:
+            recommendations.append({
+                'indicator': 'RSI',
+                'value': f"{rsi:.1f}",
+                'action': 'מכירה',
+                'reason': 'קניית יתר - RSI מעל 70',
+                'confidence': 'גבוהה',
+                'details': 'המניה בקניית יתר. שקול מכירה חלקית או הגנה עם Stop-Loss'
+            })
+        elif rsi < 30:
+            recommendations.append({
+                'indicator': 'RSI',
+                'value': f"{rsi:.1f}",
+                'action': 'קנייה',
+                'reason': 'מכירת יתר - RSI מתחת 30',
+                'confidence': 'גבוהה',
+                'details': 'המניה במכירת יתר. הזדמנות לכניסה עם Stop-Loss מתחת לתמיכה'
+            })
+        else:
+            recommendations.append({
+                'indicator': 'RSI',
+                'value': f"{rsi:.1f}",
+                'action': 'המתנה',
+                'reason': 'RSI בטווח ניטרלי',
+                'confidence': 'נמוכה',
+                'details': 'אין איתות ברור. המתין לאיתות חדש'
+            })
+    
+    # ===== MACD המלצות =====
+    if 'MACD' in last and 'MACD_Signal' in last:
+        if last['MACD'] > last['MACD_Signal']:
+            recommendations.append({
+                'indicator': 'MACD',
+                'value': f"{last['MACD']:.4f} > {last['MACD_Signal']:.4f}",
+                'action': 'קנייה',
+                'reason': 'MACD מעל קו הסיגנל',
+                'confidence': 'בינונית',
+                'details': 'מומנטום חיובי. ניתן להיכנס עם Stop-Loss מתחת ל-SMA 20'
+            })
+        else:
+            recommendations.append({
+                'indicator': 'MACD',
+                'value': f"{last['MACD']:.4f} < {last['MACD_Signal']:.4f}",
+                'action': 'מכירה',
+                'reason': 'MACD מתחת לקו הסיגנל',
+                'confidence': 'בינונית',
+                'details': 'מומנטום שלילי. שקול מכירה או Short'
+            })
+    
+    # ===== Bollinger Bands המלצות =====
+    if 'Close' in last and 'BB_Upper' in last and 'BB_Lower' in last:
+        if last['Close'] > last['BB_Upper']:
+            recommendations.append({
+                'indicator': 'Bollinger Bands',
+                'value': 'מחיר מעל הרצועה העליונה',
+                'action': 'מכירה',
+                'reason': 'מחיר חורג מהרצועה העליונה',
+                'confidence': 'גבוהה',
+                'details': 'יתר קנייה. צפוי תיקון. מכור או Short עם Stop-Loss מעל השיא'
+            })
+        elif last['Close'] < last['BB_Lower']:
+            recommendations.append({
+                'indicator': 'Bollinger Bands',
+                'value': 'מחיר מתחת לרצועה התחתונה',
+                'action': 'קנייה',
+                'reason': 'מחיר חורג מהרצועה התחתונה',
+                'confidence': 'גבוהה',
+                'details': 'הזדמנות קנייה. היכנס עם Stop-Loss מתחת לשפל'
+            })
+    
+    # ===== ממוצעים נעים המלצות =====
+    if 'SMA_20' in last and 'SMA_50' in last and 'SMA_200' in last:
+        # Golden Cross / Death Cross
+        if last['SMA_20'] > last['SMA_50'] > last['SMA_200']:
+            recommendations.append({
+                'indicator': 'ממוצעים נעים',
+                'value': '20 > 50 > 200',
+                'action': 'קנייה',
+                'reason': 'ממוצעים מסודרים לעלייה (Golden Cross)',
+                'confidence': 'גבוהה',
+                'details': 'מגמה עולה חזקה. קנה במשיכות למטה'
+            })
+        elif last['SMA_20'] < last['SMA_50'] < last['SMA_200']:
+            recommendations.append({
+                'indicator': 'ממוצעים נעים',
+                'value': '20 < 50 < 200',
+                'action': 'מכירה',
+                'reason': 'ממוצעים מסודרים לירידה (Death Cross)',
+                'confidence': 'גבוהה',
+                'details': 'מגמה יורדת חזקה. מכור בגואים'
+            })
+    
+    # ===== Stochastic המלצות =====
+    if '%K' in last and '%D' in last:
+        if last['%K'] > 80 and last['%D'] > 80:
+            recommendations.append({
+                'indicator': 'Stochastic',
+                'value': f"%K={last['%K']:.1f}, %D={last['%D']:.1f}",
+                'action': 'מכירה',
+                'reason': 'Stochastic בקניית יתר',
+                'confidence': 'בינונית',
+                'details': 'שקול מכירה חלקית או הגנה'
+            })
+        elif last['%K'] < 20 and last['%D'] < 20:
+            recommendations.append({
+                'indicator': 'Stochastic',
+                'value': f"%K={last['%K']:.1f}, %D={last['%D']:.1f}",
+                'action': 'קנייה',
+                'reason': 'Stochastic במכירת יתר',
+                'confidence': 'בינונית',
+                'details': 'הזדמנות קנייה. היכנס בהדרגה'
+            })
+    
+    # ===== ATR המלצות =====
+    if 'ATR' in last:
+        atr_percent = (last['ATR'] / last['Close']) * 100
+        if atr_percent > 3:
+            recommendations.append({
+                'indicator': 'ATR',
+                'value': f"{atr_percent:.1f}%",
+                'action': 'זהירות',
+                'reason': 'תנודתיות גבוהה',
+                'confidence': 'בינונית',
+                'details': 'תנודתיות גבוהה - הגדר Stop-Loss רחב יותר'
+            })
+    
+    return recommendations
 
 
 # --- פרשנות טכנית ---
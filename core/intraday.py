@@ -0,0 +1,289 @@
+"""
+נרות תוך-יומיים (1m, 5m, 15m, 1h) עם חוצץ טבעתי בזיכרון לכל סימול
+
+לכל (סימול, מרווח) נשמר BarRing בקיבולת קבועה (INTRADAY_BARS נרות): מערך
+חותמות זמן ומערך OHLCV במקום קבוע, שבו נר חדש דורס את הישן ביותר. הזיכרון
+חסום - קיבולת x מספר החוצצים (לכל היותר MAX_RINGS, פינוי LRU) - גם ברשימת
+מעקב של 100 סימולים על נרות דקה.
+
+- טעינה ראשונה של סימול: sync_history מהמאגר המקומי (core/store, מאגר נפרד
+  לכל מרווח) עם השלמת הנרות החסרים בלבד; N הנרות האחרונים נטענים לחוצץ.
+- רענון (לכל היותר פעם ב-REFRESH_SECONDS למרווח): בקשה אחת לכל הסימולים
+  שהתיישנו, מהנר האחרון בחוצץ; רק נרות חדשים נוספים (נר עם אותה חותמת -
+  הנר הפתוח - מתעדכן במקומו).
+- כתיבה למאגר: הנרות החדשים נכתבים לקובץ ה-Parquet כשהצטברו PERSIST_BARS
+  (או בפינוי החוצץ) ולא בכל רענון; נרות שטרם נכתבו ישלמו מהספק בטעינה הבאה.
+
+האינדיקטורים מחושבים לפי נרות (לא לפי ימים), ולכן נכונים על כל מרווח.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core import store
+from core.data import _normalize_tickers, sync_history
+from core.providers import get_provider
+from core.timing import stage
+
+# מאפייני כל מרווח: התקופה המקסימלית שהספק מחזיר (מגבלות yfinance), ומספר
+# הנרות בשנה (למדדים שנתיים כמו מחזור בבדיקה ההיסטורית)
+Interval = namedtuple('Interval', ['period', 'seconds', 'bars_per_year'])
+INTERVALS = {
+    '1m': Interval('7d', 60, 252 * 390),
+    '5m': Interval('60d', 300, 252 * 78),
+    '15m': Interval('60d', 900, 252 * 26),
+    '1h': Interval('730d', 3600, 252 * 7),
+}
+
+# קיבולת החוצץ לכל סימול (מספר הנרות האחרונים בזיכרון)
+INTRADAY_BARS = int(os.environ.get("STOCK_TRACKER_INTRADAY_BARS", "2000"))
+
+# מספר מקסימלי של חוצצים (סימול x מרווח) בזיכרון
+MAX_RINGS = int(os.environ.get("STOCK_TRACKER_MAX_RINGS", "512"))
+
+# מרווח מינימלי בין רענונים של אותו חוצץ (שניות) - לכל היותר נר אחד
+REFRESH_SECONDS = int(os.environ.get("STOCK_TRACKER_INTRADAY_REFRESH", "60"))
+
+# מספר נרות חדשים שמצטברים לפני כתיבה למאגר
+PERSIST_BARS = int(os.environ.get("STOCK_TRACKER_PERSIST_BARS", "60"))
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _ns(index):
+    """חותמות הזמן של אינדקס כ-int64 בננו-שניות (UTC כשיש אזור זמן)"""
+    return pd.DatetimeIndex(index).as_unit('ns').asi8
+
+
+class BarRing:
+    """
+    חוצץ טבעתי של נרות בקיבולת קבועה
+
+    פרמטרים:
+    ----------
+    capacity : int
+        מספר הנרות המקסימלי
+    tz : str או tzinfo, optional
+        אזור הזמן של חותמות הזמן (כמו באינדקס שמגיע מהספק)
+    """
+
+    def __init__(self, capacity=INTRADAY_BARS, tz=None):
+        self.capacity = max(1, int(capacity))
+        self.tz = tz
+        self._ts = np.empty(self.capacity, dtype=np.int64)
+        self._values = np.empty((self.capacity, len(FIELDS)), dtype=np.float64)
+        self._start = 0
+        self._n = 0
+        # נרות שנוספו מאז הכתיבה האחרונה למאגר, וזמן הרענון האחרון (time.monotonic)
+        self.unsaved = 0
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def nbytes(self):
+        return self._ts.nbytes + self._values.nbytes
+
+    def _order(self, k=None):
+        """מיקומי k הנרות האחרונים (כולם כש-k=None) מהישן לחדש"""
+        k = self._n if k is None else min(k, self._n)
+        return (self._start + np.arange(self._n - k, self._n)) % self.capacity
+
+    def last(self):
+        """חותמת הזמן של הנר האחרון (או None)"""
+        if not self._n:
+            return None
+        ts = pd.Timestamp(int(self._ts[(self._start + self._n - 1) % self.capacity]), tz='UTC' if self.tz else None)
+        return ts.tz_convert(self.tz) if self.tz else ts
+
+    def append(self, df):
+        """
+        מוסיף נרות (DataFrame עם אינדקס זמן ועמודות FIELDS)
+
+        נרות ישנים מהנר האחרון מתעלמים; נר עם אותה חותמת כמו האחרון דורס אותו.
+
+        מחזיר:
+        -------
+        int : מספר הנרות החדשים שנוספו
+        """
+        if df is None or df.empty:
+            return 0
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        ts = _ns(df.index)
+        values = df.reindex(columns=list(FIELDS)).to_numpy(dtype=np.float64)
+
+        if self._n:
+            last_pos = (self._start + self._n - 1) % self.capacity
+            last = self._ts[last_pos]
+            same = np.flatnonzero(ts == last)
+            if len(same):
+                self._values[last_pos] = values[same[-1]]
+            newer = ts > last
+            ts, values = ts[newer], values[newer]
+
+        k = len(ts)
+        if not k:
+            return 0
+        if k >= self.capacity:
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+            self._ts[:], self._values[:] = ts, values
+            self._start, self._n = 0, self.capacity
+        else:
+            pos = (self._start + self._n + np.arange(k)) % self.capacity
+            self._ts[pos] = ts
+            self._values[pos] = values
+            overflow = max(0, self._n + k - self.capacity)
+            self._start = (self._start + overflow) % self.capacity
+            self._n = min(self._n + k, self.capacity)
+        self.unsaved = min(self.unsaved + k, self._n)
+        return k
+
+    def tail(self, k=None):
+        """
+        k הנרות האחרונים (כולם כש-k=None) כ-DataFrame חדש מהישן לחדש
+
+        מחזיר:
+        -------
+        pandas.DataFrame : עמודות FIELDS, אינדקס Date
+        """
+        order = self._order(k)
+        index = pd.DatetimeIndex(self._ts[order].view('datetime64[ns]'), name='Date')
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return pd.DataFrame(self._values[order], index=index, columns=list(FIELDS))
+
+    def to_frame(self):
+        return self.tail()
+
+
+_rings = OrderedDict()
+_rings_lock = threading.Lock()
+
+
+def _persist(ticker, interval, ring):
+    """כותב למאגר את הנרות שטרם נכתבו"""
+    if ring.unsaved:
+        store.append_bars(ticker, ring.tail(ring.unsaved), interval)
+        ring.unsaved = 0
+
+
+def _register(key, ring):
+    """מוסיף חוצץ ל-registry ומפנה את הישנים ביותר מעבר ל-MAX_RINGS"""
+    with _rings_lock:
+        _rings[key] = ring
+        _rings.move_to_end(key)
+        evicted = []
+        while len(_rings) > MAX_RINGS:
+            evicted.append(_rings.popitem(last=False))
+    for (ticker, interval), old in evicted:
+        with old.lock:
+            _persist(ticker, interval, old)
+
+
+def _get(key):
+    with _rings_lock:
+        ring = _rings.get(key)
+        if ring is not None:
+            _rings.move_to_end(key)
+        return ring
+
+
+def memory_usage():
+    """
+    מצב החוצצים בזיכרון
+
+    מחזיר:
+    -------
+    dict : rings (מספר החוצצים), bars (סך הנרות), bytes (זיכרון המערכים)
+    """
+    with _rings_lock:
+        rings = list(_rings.values())
+    return {
+        'rings': len(rings),
+        'bars': sum(len(r) for r in rings),
+        'bytes': sum(r.nbytes for r in rings),
+    }
+
+
+def clear(persist=True):
+    """מרוקן את כל החוצצים (וכותב קודם את הנרות שטרם נכתבו)"""
+    with _rings_lock:
+        items = list(_rings.items())
+        _rings.clear()
+    if persist:
+        for (ticker, interval), ring in items:
+            with ring.lock:
+                _persist(ticker, interval, ring)
+
+
+def load_intraday(tickers, interval="5m", force=False):
+    """
+    נרות תוך-יומיים עדכניים לכמה סימולים מהחוצצים בזיכרון
+
+    פרמטרים:
+    ----------
+    tickers : iterable
+        סימולי המניות
+    interval : str
+        מרווח הנרות - אחד מ-INTERVALS
+    force : bool
+        רענון מהספק גם אם לא עבר REFRESH_SECONDS מהרענון הקודם
+
+    מחזיר:
+    -------
+    dict : {סימול: DataFrame עם עד INTRADAY_BARS הנרות האחרונים}
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"מרווח לא נתמך: {interval}")
+    spec = INTERVALS[interval]
+    tickers = _normalize_tickers(tickers)
+    now = time.monotonic()
+    refresh_every = min(spec.seconds, REFRESH_SECONDS)
+
+    with stage('intraday.load', interval=interval, tickers=len(tickers)) as record:
+        rings = {t: _get((t, interval)) for t in tickers}
+
+        # סימולים חדשים: מהמאגר המקומי (עם השלמת החסר מהספק) לחוצץ
+        missing = [t for t, ring in rings.items() if ring is None]
+        if missing:
+            for t, df in sync_history(missing, period=spec.period, interval=interval).items():
+                ring = BarRing(INTRADAY_BARS, tz=df.index.tz)
+                ring.append(df.iloc[-INTRADAY_BARS:])
+                ring.unsaved = 0
+                ring.refreshed_at = now
+                _register((t, interval), ring)
+                rings[t] = ring
+
+        # רענון: בקשה אחת לכל נקודת התחלה, מהנר האחרון בחוצץ
+        groups = {}
+        for t, ring in rings.items():
+            if ring is not None and len(ring) and (force or now - ring.refreshed_at >= refresh_every):
+                groups.setdefault(ring.last(), []).append(t)
+        added = 0
+        for start, group in groups.items():
+            with stage('provider.history', kind='intraday', tickers=len(group)):
+                fresh = get_provider().history(group, start=start, interval=interval)
+            for t in group:
+                ring = rings[t]
+                with ring.lock:
+                    added += ring.append(fresh.get(t))
+                    ring.refreshed_at = now
+                    if ring.unsaved >= PERSIST_BARS:
+                        _persist(t, interval, ring)
+        if record is not None:
+            record.update(refreshed=sum(len(g) for g in groups.values()), new_bars=added)
+
+        frames = {}
+        for t, ring in rings.items():
+            if ring is not None and len(ring):
+                with ring.lock:
+                    frames[t] = ring.to_frame()
+    return frames
@@ -0,0 +1,90 @@
+"""
+קרנלים של NumPy לחלונות נעים
+
+rolling_extrema מחשב מינימום/מקסימום נע לכמה אורכי חלון במעבר משותף אחד
+על מערך float64 רציף. השיטה היא טבלת הכפלות (sparse table): שלב k מחזיק
+את הקיצון של 2**k ערכים רצופים, וכל חלון באורך w הוא הקיצון של שני
+בלוקים חופפים מהשלב floor(log2 w). השלבים נבנים פעם אחת עבור החלון הגדול
+ביותר ומשותפים לכל החלונות הקטנים ממנו - O(n log w) לבנייה ו-O(n) לכל חלון,
+בלי לולאת Python לכל נר.
+
+התוצאה זהה לחלוטין ל-Series.rolling(w, min_periods=1).min()/max() של pandas
+(מינימום/מקסימום הם פעולות מדויקות; NaN ו-±inf מדולגים, כמו ב-pandas
+שממיר inf ל-NaN לפני חישוב rolling).
+"""
+
+import numpy as np
+
+
+def rolling_extrema(values, windows, mode='max'):
+    """
+    מינימום או מקסימום נע לכמה אורכי חלון בבת אחת
+
+    פרמטרים:
+    ----------
+    values : array-like
+        סדרת ערכים (מומרת למערך float64 רציף); מערך דו-ממדי מחושב לכל עמודה
+        בנפרד לאורך ציר 0 - פאנל של נרות x סימולים
+    windows : iterable of int
+        אורכי החלונות
+    mode : str
+        'max' או 'min'
+
+    מחזיר:
+    -------
+    dict : {אורך חלון: numpy.ndarray} - ערך לכל נר, כמו min_periods=1
+    """
+    x = np.ascontiguousarray(values, dtype=np.float64)
+    n = x.shape[0]
+    windows = sorted({int(w) for w in windows})
+    if not windows:
+        return {}
+    if windows[0] < 1:
+        raise ValueError("אורך חלון חייב להיות חיובי")
+
+    is_max = mode == 'max'
+    op = np.maximum if is_max else np.minimum
+    fill = -np.inf if is_max else np.inf
+
+    # NaN/inf מוחלפים בערך הנייטרלי; חלון בלי אף ערך תקין יחזור ל-NaN בסוף
+    nan_mask = ~np.isfinite(x)
+    has_nan = bool(nan_mask.any())
+
+    # ריפוד של W-1 ערכים נייטרליים בהתחלה: padded[i + W - 1] = x[i]
+    # כך שגם החלונות החלקיים בתחילת הסדרה (min_periods=1) מחושבים באותה נוסחה
+    big = windows[-1]
+    padded = np.full((n + big - 1,) + x.shape[1:], fill)
+    padded[big - 1:] = x
+    if has_nan:
+        padded[big - 1:][nan_mask] = fill
+        valid_cum = np.concatenate((np.zeros((1,) + x.shape[1:], dtype=np.int64),
+                                    np.cumsum(~nan_mask, axis=0)))
+
+    results = {}
+    level = padded  # level[j] = קיצון של padded[j : j + span]
+    span = 1
+    for w in windows:
+        target = 1 << (w.bit_length() - 1)
+        while span < target:
+            level = op(level[:-span], level[span:])
+            span *= 2
+
+        # החלון של נר i הוא padded[i + W - w : i + W]: בלוק מתחילתו ובלוק שמסתיים בסופו
+        out = op(level[big - w: big - w + n], level[big - span: big - span + n])
+
+        if has_nan:
+            idx = np.arange(n)
+            counts = valid_cum[idx + 1] - valid_cum[np.maximum(idx + 1 - w, 0)]
+            out[counts == 0] = np.nan
+        results[w] = out
+    return results
+
+
+def rolling_max(values, window):
+    """מקסימום נע בחלון יחיד (ראו rolling_extrema)"""
+    return rolling_extrema(values, [window], 'max')[window]
+
+
+def rolling_min(values, window):
+    """מינימום נע בחלון יחיד (ראו rolling_extrema)"""
+    return rolling_extrema(values, [window], 'min')[window]
@@ -0,0 +1,286 @@
+"""
+יומן עסקאות עמודתי - מקור האמת היחיד לפוזיציות בסשן
+
+העסקאות נשמרות במערכי numpy לכל עמודה (Ticker, EntryPrice, Shares, Date,
+TradeID) עם קיבולת שמוכפלת בעת הצורך, כך שהוספה עולה O(1) בממוצע במקום
+pd.concat של כל התיק בכל הוספה.
+
+- מחיקה לפי TradeID היא O(1): השורה מסומנת כמחוקה דרך אינדקס {TradeID: שורה};
+  כשרוב השורות מחוקות המערכים נדחסים (O(1) בממוצע לפעולה).
+- אינדקס לפי סימול {סימול: TradeIDs לפי סדר ההוספה}.
+- to_frame מחזיר DataFrame לקריאה בלבד רק כשצריך (תצוגה/ייצוא); כל עוד אין
+  מחיקות העמודות המספריות הן view על המערכים ללא העתקה, והתוצאה נשמרת עד
+  לשינוי הבא ביומן.
+- השינויים שטרם נשמרו (הוספות ומחיקות) נצברים ב-journal ונכתבים למאגר בבת
+  אחת (core/portfolio_db); from_frame בונה יומן שלם מטבלה בלי הוספה שורה-שורה.
+"""
+
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Ticker', 'EntryPrice', 'Shares', 'Date', 'TradeID']
+_DTYPES = {
+    'Ticker': object,
+    'EntryPrice': np.float64,
+    'Shares': np.int64,
+    'Date': 'datetime64[ns]',
+    'TradeID': object,
+}
+
+
+class TradeLedger:
+    """
+    יומן עסקאות עמודתי עם הוספה ומחיקה ב-O(1)
+
+    פרמטרים:
+    ----------
+    capacity : int
+        קיבולת התחלתית (מוכפלת אוטומטית)
+    """
+
+    def __init__(self, capacity=64):
+        capacity = max(1, int(capacity))
+        self._cols = {c: np.empty(capacity, dtype=d) for c, d in _DTYPES.items()}
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._n = 0
+        self._rows = {}
+        self._by_ticker = {}
+        self._view = None
+        # שינויים שטרם נשמרו: {TradeID: None} לפי סדר ההוספה, ומחיקות של עסקאות שמורות
+        self._added = {}
+        self._deleted = set()
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        בונה יומן מטבלת עסקאות בפעולות עמודתיות (ללא append לכל שורה)
+
+        פרמטרים:
+        ----------
+        df : pandas.DataFrame
+            עמודות COLUMNS (TradeID ייחודי)
+
+        מחזיר:
+        -------
+        TradeLedger : יומן ללא שינויים ממתינים (העסקאות נחשבות שמורות)
+        """
+        return cls.from_columns({c: df[c].to_numpy(dtype=_DTYPES[c]) for c in COLUMNS})
+
+    @classmethod
+    def from_columns(cls, columns):
+        """כמו from_frame, מתוך {עמודה: מערך} (למשל ישירות מתוצאת שאילתה)"""
+        n = len(columns['TradeID'])
+        ledger = cls(capacity=max(64, n + n // 2))
+        for c in COLUMNS:
+            ledger._cols[c][:n] = columns[c]
+        ledger._alive[:n] = True
+        ledger._n = n
+
+        ids = ledger._cols['TradeID'][:n]
+        ledger._rows = dict(zip(ids, range(n)))
+        if len(ledger._rows) != n:
+            raise ValueError("מזהי עסקה כפולים")
+        tickers = ledger._cols['Ticker'][:n]
+        codes, uniques = pd.factorize(tickers)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        ledger._by_ticker = {
+            t: dict.fromkeys(ids[order[bounds[k]:bounds[k + 1]]]) for k, t in enumerate(uniques)
+        }
+        return ledger
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, trade_id):
+        return trade_id in self._rows
+
+    def _grow(self, capacity):
+        """מעתיק את השורות הקיימות למערכים חדשים (מערכים ישנים נשארים שלמים עבור views קיימים)"""
+        for c in COLUMNS:
+            arr = np.empty(capacity, dtype=self._cols[c].dtype)
+            arr[:self._n] = self._cols[c][:self._n]
+            self._cols[c] = arr
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._n] = self._alive[:self._n]
+        self._alive = alive
+
+    def append(self, ticker, price, shares, date=None, trade_id=None):
+        """
+        מוסיף עסקה
+
+        פרמטרים:
+        ----------
+        ticker : str
+            סימול המניה
+        price : float
+            מחיר הכניסה
+        shares : int
+            מספר מניות
+        date : datetime, optional
+            מועד העסקה (ברירת מחדל: עכשיו)
+        trade_id : str, optional
+            מזהה (ברירת מחדל: 8 תווים אקראיים)
+
+        מחזיר:
+        -------
+        str : מזהה העסקה
+        """
+        trade_id = trade_id or uuid.uuid4().hex[:8]
+        if trade_id in self._rows:
+            raise ValueError(f"מזהה עסקה קיים: {trade_id}")
+        if self._n == len(self._alive):
+            self._grow(2 * len(self._alive))
+
+        i = self._n
+        cols = self._cols
+        cols['Ticker'][i] = ticker
+        cols['EntryPrice'][i] = price
+        cols['Shares'][i] = shares
+        cols['Date'][i] = np.datetime64(date if date is not None else datetime.now(), 'ns')
+        cols['TradeID'][i] = trade_id
+        self._alive[i] = True
+        self._n += 1
+
+        self._rows[trade_id] = i
+        self._by_ticker.setdefault(ticker, {})[trade_id] = None
+        self._added[trade_id] = None
+        self._view = None
+        return trade_id
+
+    def extend(self, df):
+        """מוסיף את כל השורות של DataFrame בעמודות COLUMNS (TradeID/Date חסרים נוצרים)"""
+        for row in df.itertuples(index=False):
+            row = row._asdict()
+            self.append(row['Ticker'], row['EntryPrice'], row['Shares'], row.get('Date'), row.get('TradeID'))
+
+    def delete(self, trade_id):
+        """
+        מוחק עסקה לפי מזהה
+
+        מחזיר:
+        -------
+        bool : האם העסקה נמצאה ונמחקה
+        """
+        i = self._rows.pop(trade_id, None)
+        if i is None:
+            return False
+        self._alive[i] = False
+        ticker = self._cols['Ticker'][i]
+        ids = self._by_ticker[ticker]
+        del ids[trade_id]
+        if not ids:
+            del self._by_ticker[ticker]
+        if trade_id in self._added:
+            del self._added[trade_id]
+        else:
+            self._deleted.add(trade_id)
+        self._view = None
+
+        # דחיסה כשרוב השורות מחוקות - עלות O(n) אחרי n/2 מחיקות
+        if self._n > 64 and len(self._rows) < self._n // 2:
+            self._compact()
+        return True
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._n])
+        capacity = max(64, 2 * len(keep))
+        for c in COLUMNS:
+            arr = np.empty(capacity, dtype=self._cols[c].dtype)
+            arr[:len(keep)] = self._cols[c][keep]
+            self._cols[c] = arr
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:len(keep)] = True
+        self._n = len(keep)
+        self._rows = dict(zip(self._cols['TradeID'][:self._n], range(self._n)))
+
+    def pending(self):
+        """
+        השינויים שטרם נשמרו
+
+        מחזיר:
+        -------
+        tuple : (DataFrame של עסקאות שנוספו, רשימת TradeID שנמחקו)
+        """
+        rows = np.fromiter((self._rows[t] for t in self._added), dtype=np.intp, count=len(self._added))
+        return self._frame(rows), sorted(self._deleted)
+
+    def mark_saved(self):
+        """מאפס את ה-journal אחרי כתיבה מוצלחת למאגר"""
+        self._added.clear()
+        self._deleted.clear()
+
+    def last_id(self):
+        """מזהה העסקה האחרונה שנוספה (או None)"""
+        return next(reversed(self._rows), None)
+
+    def tickers(self):
+        """הסימולים בתיק לפי סדר ההופעה הראשונה"""
+        return list(self._by_ticker)
+
+    def trade_ids(self, ticker=None):
+        """מזהי העסקאות (של סימול אחד או של כולן) לפי סדר ההוספה"""
+        if ticker is None:
+            return list(self._rows)
+        return list(self._by_ticker.get(ticker, ()))
+
+    def get(self, trade_id):
+        """עסקה אחת כ-dict (או None)"""
+        i = self._rows.get(trade_id)
+        if i is None:
+            return None
+        return {c: self._cols[c][i] for c in COLUMNS}
+
+    def to_frame(self, ticker=None):
+        """
+        DataFrame של העסקאות הפעילות (לקריאה בלבד - יש להעתיק לפני שינוי)
+
+        פרמטרים:
+        ----------
+        ticker : str, optional
+            רק העסקאות של סימול זה
+
+        מחזיר:
+        -------
+        pandas.DataFrame : עמודות COLUMNS לפי סדר ההוספה
+        """
+        if ticker is not None:
+            rows = np.fromiter((self._rows[t] for t in self._by_ticker.get(ticker, ())), dtype=np.intp)
+            return self._frame(rows)
+        if self._view is None:
+            n = self._n
+            # ללא מחיקות - slice (view ללא העתקה); אחרת בחירת השורות החיות
+            rows = slice(0, n) if len(self._rows) == n else np.flatnonzero(self._alive[:n])
+            self._view = self._frame(rows)
+        return self._view
+
+    def _frame(self, rows):
+        data = {}
+        for c in COLUMNS:
+            arr = self._cols[c][rows]
+            arr.flags.writeable = False
+            data[c] = arr
+        return pd.DataFrame(data, copy=False)
+
+    def export_frame(self):
+        """העסקאות בפורמט קובצי הייצוא (Price, Date כמחרוזת)"""
+        return export_columns(self.to_frame())
+
+
+def export_columns(df):
+    """
+    טבלת עסקאות (עמודות COLUMNS) בפורמט קובצי הייצוא
+
+    פונקציה נפרדת מהיומן כדי שאפשר יהיה להריץ אותה מאוחר יותר (למשל ב-thread של
+    הורדה) על snapshot של to_frame(), שלא משתנה כשהיומן משתנה.
+    """
+    return pd.DataFrame({
+        'Ticker': df['Ticker'],
+        'Price': df['EntryPrice'].round(2),
+        'Shares': df['Shares'],
+        'Date': df['Date'].dt.strftime("%Y-%m-%d %H:%M"),
+        'TradeID': df['TradeID'],
+    })
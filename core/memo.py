@@ -0,0 +1,118 @@
+"""
+Cache לתוצאות חישובי אינדיקטורים
+
+כל rerun של Streamlit (לחיצת כפתור, שינוי number_input) מריץ מחדש את כל
+הסקריפט. כל עוד נתוני המחיר לא השתנו אין טעם לחשב שוב את האינדיקטורים
+וההמלצות - התוצאות נשמרות תחת מפתח של (סימול, הנר האחרון, טביעת מחירי
+הסגירה, הגדרות החישוב).
+
+בשונה מ-st.cache_data, המפתח דורש hash של עמודת Close בלבד (ולא של כל
+ה-DataFrame) והתוצאה מוחזרת ללא העתקה (pickle).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from core.indicators import (
+    calculate_advanced_indicators,
+    calculate_all_indicators,
+    get_trading_recommendations,
+)
+from core.timing import note, stage
+
+
+class LRUCache:
+    """
+    Cache בגודל חסום עם פינוי LRU ומוני פגיעות/החטאות
+
+    פרמטרים:
+    ----------
+    maxsize : int
+        מספר מקסימלי של רשומות
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """מחזיר את הערך השמור עבור key, או מחשב אותו עם compute() ושומר"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                note(cache='hit')
+                return self._data[key]
+            self.misses += 1
+        note(cache='miss')
+
+        # החישוב מתבצע מחוץ לנעילה - חישובים של סימולים שונים לא חוסמים זה את זה
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """מחזיר dict עם מוני פגיעות/החטאות וגודל נוכחי"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+# cache משותף לכל הסשנים (גודל ניתן לשינוי דרך משתנה סביבה)
+indicator_cache = LRUCache(maxsize=int(os.environ.get("STOCK_TRACKER_INDICATOR_CACHE", "64")))
+
+
+def _frame_key(ticker, df):
+    """
+    מפתח שמזהה גרסה של נתוני המחיר: הנר האחרון, מספר הנרות ו-hash של מחירי
+    הסגירה. הנר של היום עשוי להתעדכן בלי לשנות את חותמת הזמן, ו-sync_history
+    כותב מחדש נרות קודמים אחרי פיצול/דיבידנד בלי לשנות את הנר האחרון.
+    """
+    if df is None or df.empty:
+        return (ticker, None, 0, None)
+    closes = hash(df['Close'].to_numpy().tobytes()) if 'Close' in df.columns else None
+    return (ticker, df.index[-1], len(df), closes)
+
+
+def get_advanced_indicators(ticker, df):
+    """calculate_advanced_indicators עם cache לפי (סימול, נר אחרון)"""
+    key = ('advanced',) + _frame_key(ticker, df)
+    with stage('memo.advanced_indicators'):
+        return indicator_cache.get_or_compute(key, lambda: calculate_advanced_indicators(df))
+
+
+def get_all_indicators(ticker, df, ma_type):
+    """calculate_all_indicators עם cache לפי (סימול, נר אחרון, ma_type)"""
+    key = ('core', ma_type) + _frame_key(ticker, df)
+    with stage('memo.all_indicators'):
+        return indicator_cache.get_or_compute(key, lambda: calculate_all_indicators(df, ma_type))
+
+
+def get_recommendations(ticker, df_indicators):
+    """get_trading_recommendations עם cache לפי (סימול, נר אחרון)"""
+    key = ('recommendations',) + _frame_key(ticker, df_indicators)
+    with stage('memo.recommendations'):
+        return indicator_cache.get_or_compute(
+            key, lambda: get_trading_recommendations(df_indicators, df_indicators.columns)
+        )
@@ -0,0 +1,94 @@
+"""
+פאנל רחב (נרות x סימולים) של עמודות מחיר מכמה היסטוריות
+
+משמש את הסורק (core/screener), הבדיקה ההיסטורית (core/backtest) ושכבת
+הנתונים (פאנל מחירי הסגירה לתיק) - אינדיקטורים ומדדים מחושבים על הפאנל
+עמודה-עמודה לכל הסימולים בבת אחת.
+"""
+
+import numpy as np
+import pandas as pd
+
+# עמודות המחיר שנכנסות לפאנל
+PANEL_FIELDS = ('Close', 'High', 'Low', 'Volume')
+
+
+def build_panel(frames, fields=PANEL_FIELDS):
+    """
+    מאחד היסטוריות של כמה סימולים לפאנל רחב
+
+    פרמטרים:
+    ----------
+    frames : dict
+        {סימול: DataFrame עם נתוני מחיר}
+    fields : tuple
+        עמודות המחיר לפאנל
+
+    מחזיר:
+    -------
+    dict : {עמודת מחיר: DataFrame של נרות x סימולים}; תאריכים חסרים הם NaN
+
+    האינדקס הוא איחוד התאריכים של כל הסימולים. NaN לפני הנר הראשון או אחרי
+    האחרון של סימול לא משנים את האינדיקטורים שלו. אבל תאריך שחסר באמצע
+    ההיסטוריה (לוח מסחר אחר, נר חסר) הופך לשורת NaN שנספרת בחלונות הנעים.
+    לכן מחשבים על פאנל נפרד לכל קבוצה מ-calendar_groups.
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    tickers = list(frames)
+    if not tickers:
+        return {field: pd.DataFrame(dtype=np.float64) for field in fields}
+
+    # אינדקס תאריכים משותף ומיקום כל נר בו - מחושב פעם אחת לכל העמודות
+    index = frames[tickers[0]].index
+    for t in tickers[1:]:
+        if not frames[t].index.equals(index):
+            index = index.union(frames[t].index)
+    rows = [index.get_indexer(frames[t].index) for t in tickers]
+
+    # בלוק float64 רציף אחד לכל עמודת מחיר (ולא עמודה נפרדת לכל סימול) -
+    # פעולות pandas על הפאנל רצות אז פעם אחת על כל המטריצה
+    panel = {}
+    for field in fields:
+        values = np.full((len(index), len(tickers)), np.nan)
+        for j, t in enumerate(tickers):
+            values[rows[j], j] = frames[t][field].to_numpy(dtype=np.float64)
+        panel[field] = pd.DataFrame(values, index=index, columns=pd.Index(tickers, name='Ticker'))
+    return panel
+
+
+def calendar_groups(frames):
+    """
+    מחלק סימולים לקבוצות שבהן האינדקס של כל סימול הוא קטע רציף מלוח הקבוצה
+
+    בפאנל של קבוצה אין לאף סימול שורות NaN באמצע ההיסטוריה (ראו build_panel),
+    ולכן האינדיקטורים על הפאנל שווים לחישוב על כל סימול בנפרד. סימולים עם
+    היסטוריה קצרה יותר (הנפקה חדשה, הפסקת מסחר) נכנסים לקבוצה של הלוח המלא;
+    לוח מסחר אחר (למשל בורסה שנסחרת ביום א') או נרות חסרים - לקבוצה משלהם.
+
+    פרמטרים:
+    ----------
+    frames : dict
+        {סימול: DataFrame עם אינדקס זמן ממוין}
+
+    מחזיר:
+    -------
+    list : רשימות סימולים (לפי סדר frames בתוך כל קבוצה)
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    order = {t: i for i, t in enumerate(frames)}
+    calendars = []  # [(אינדקס הלוח, סימולים)]
+
+    # הלוחות נקבעים מההיסטוריות הארוכות ביותר
+    for t in sorted(frames, key=lambda t: -len(frames[t])):
+        index = frames[t].index
+        for calendar, members in calendars:
+            if index.equals(calendar):
+                members.append(t)
+                break
+            rows = calendar.get_indexer(index)
+            if rows.min() >= 0 and rows[-1] - rows[0] == len(index) - 1:
+                members.append(t)
+                break
+        else:
+            calendars.append((index, [t]))
+    return [sorted(members, key=order.get) for _, members in calendars]
@@ -0,0 +1,204 @@
+"""
+שמירת תיקי העסקאות במסד SQLite מקומי
+
+התיק שורד רענון דפדפן והפעלה מחדש של השרת. לכל משתמש תיק נפרד (עמודת user).
+
+- מצב WAL: קוראים לא נחסמים ע"י כתיבה, וכתיבה היא append לקובץ ה-WAL.
+- הטבלה מאוחסנת לפי (user, seq) (WITHOUT ROWID), כך שהתיק של משתמש הוא טווח
+  רציף ממוין לפי סדר ההוספה - טעינה ללא מיון; אינדקסים על (user, trade_id),
+  (user, ticker) ו-(user, date) לשאילתות לפי מזהה/סימול/תקופה.
+- כתיבה במנות: השינויים שנצברו ב-journal של TradeLedger נכתבים בטרנזקציה
+  אחת (executemany) ולא שורה-שורה.
+- טעינה: שאילתה אחת לכל התיק; העמודות נבנות ישירות למערכי היומן
+  (TradeLedger.from_frame) בלי להריץ מחדש את ההוספות.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.ledger import COLUMNS, TradeLedger
+from core.store import DATA_DIR
+from core.timing import stage
+
+# קובץ המסד (ניתן לשנות דרך משתנה סביבה)
+DB_PATH = os.environ.get("STOCK_TRACKER_DB", os.path.join(DATA_DIR, "portfolio.db"))
+
+# המשתמש כשאין זיהוי אחר (?user= או STOCK_TRACKER_USER)
+DEFAULT_USER = os.environ.get("STOCK_TRACKER_USER", "default")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    user        TEXT    NOT NULL,
+    seq         INTEGER NOT NULL,
+    trade_id    TEXT    NOT NULL,
+    ticker      TEXT    NOT NULL,
+    entry_price REAL    NOT NULL,
+    shares      INTEGER NOT NULL,
+    date_ns     INTEGER NOT NULL,
+    PRIMARY KEY (user, seq)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_user_id ON trades (user, trade_id);
+CREATE INDEX IF NOT EXISTS idx_trades_user_ticker ON trades (user, ticker);
+CREATE INDEX IF NOT EXISTS idx_trades_user_date ON trades (user, date_ns);
+"""
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def connect(path=None):
+    """
+    פותח חיבור למסד (ויוצר את הסכמה בפעם הראשונה)
+
+    חיבור חדש לכל פעולה - sqlite3 לא מאפשר שיתוף חיבור בין threads, ו-Streamlit
+    מריץ כל סשן ב-thread משלו; פתיחת חיבור לקובץ מקומי זולה.
+
+    מחזיר:
+    -------
+    sqlite3.Connection
+    """
+    path = path or DB_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized.add(path)
+    return conn
+
+
+def _query_columns(user, path=None):
+    """שאילתה אחת לכל התיק של משתמש; מחזיר {עמודה: מערך numpy} לפי סדר ההוספה"""
+    conn = connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT ticker, entry_price, shares, date_ns, trade_id FROM trades WHERE user = ? ORDER BY seq",
+            (user,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    ticker, price, shares, date_ns, trade_id = zip(*rows) if rows else ((),) * 5
+    return {
+        'Ticker': np.array(ticker, dtype=object),
+        'EntryPrice': np.array(price, dtype=np.float64),
+        'Shares': np.array(shares, dtype=np.int64),
+        'Date': np.array(date_ns, dtype=np.int64).view('datetime64[ns]'),
+        'TradeID': np.array(trade_id, dtype=object),
+    }
+
+
+def load_trades(user=DEFAULT_USER, path=None):
+    """
+    כל העסקאות של משתמש בשאילתה אחת
+
+    פרמטרים:
+    ----------
+    user : str
+        מזהה המשתמש
+    path : str, optional
+        נתיב המסד (ברירת מחדל: DB_PATH)
+
+    מחזיר:
+    -------
+    pandas.DataFrame : עמודות COLUMNS לפי סדר ההוספה
+    """
+    return pd.DataFrame(_query_columns(user, path), columns=COLUMNS)
+
+
+def write_trades(conn, user, df):
+    """מוסיף עסקאות (טבלה בעמודות COLUMNS) בפקודת executemany אחת, בסוף התיק של המשתמש"""
+    if df.empty:
+        return 0
+    last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM trades WHERE user = ?", (user,)).fetchone()[0]
+    params = zip(
+        [user] * len(df),
+        range(last + 1, last + 1 + len(df)),
+        df['TradeID'].tolist(),
+        df['Ticker'].tolist(),
+        df['EntryPrice'].to_numpy(dtype=np.float64).tolist(),
+        df['Shares'].to_numpy(dtype=np.int64).tolist(),
+        df['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist(),
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO trades (user, seq, trade_id, ticker, entry_price, shares, date_ns) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        params,
+    )
+    return len(df)
+
+
+def delete_trades(conn, user, trade_ids):
+    """מוחק עסקאות לפי מזהה בפקודת executemany אחת"""
+    conn.executemany("DELETE FROM trades WHERE user = ? AND trade_id = ?", [(user, t) for t in trade_ids])
+    return len(trade_ids)
+
+
+def load_ledger(user=DEFAULT_USER, path=None):
+    """
+    טוען את התיק של משתמש כ-TradeLedger מוכן לתצוגה
+
+    מחזיר:
+    -------
+    TradeLedger : ללא שינויים ממתינים
+    """
+    with stage('portfolio_db.load', user=user) as record:
+        ledger = TradeLedger.from_columns(_query_columns(user, path))
+        if record is not None:
+            record['trades'] = len(ledger)
+    return ledger
+
+
+def save_ledger(ledger, user=DEFAULT_USER, path=None):
+    """
+    כותב את השינויים הממתינים של היומן בטרנזקציה אחת
+
+    פרמטרים:
+    ----------
+    ledger : TradeLedger
+        היומן (ה-journal שלו מתאפס אחרי כתיבה מוצלחת)
+    user : str
+        מזהה המשתמש
+    path : str, optional
+        נתיב המסד
+
+    מחזיר:
+    -------
+    tuple : (מספר העסקאות שנוספו, מספר העסקאות שנמחקו)
+    """
+    added, deleted = ledger.pending()
+    if added.empty and not deleted:
+        return 0, 0
+
+    with stage('portfolio_db.save', added=len(added), deleted=len(deleted)):
+        conn = connect(path)
+        try:
+            with conn:
+                # מחיקות לפני הוספות - מזהה שנמחק ונוסף מחדש באותה מנה נשאר
+                n_deleted = delete_trades(conn, user, deleted)
+                n_added = write_trades(conn, user, added)
+        finally:
+            conn.close()
+    ledger.mark_saved()
+    return n_added, n_deleted
+
+
+def clear(user=None, path=None):
+    """מוחק את התיק של משתמש (או של כל המשתמשים)"""
+    conn = connect(path)
+    try:
+        with conn:
+            if user is None:
+                conn.execute("DELETE FROM trades")
+            else:
+                conn.execute("DELETE FROM trades WHERE user = ?", (user,))
+    finally:
+        conn.close()
@@ -0,0 +1,326 @@
+"""
+ספקי נתוני שוק
+
+כל הגישה לנתונים חיצוניים עוברת דרך ספק (DataProvider) עם שתי פעולות:
+history (נתוני OHLCV) ו-info (נתונים פונדמנטליים).
+
+- YFinanceProvider: נתונים חיים מ-yfinance (ברירת מחדל)
+- ReplayProvider: ללא רשת - מנגן נתונים מוקלטים מתיקייה, או מייצר נתוני
+  OHLCV סינתטיים דטרמיניסטיים לפי seed (לבדיקות, בנצ'מרקים וסביבה מנותקת)
+
+בחירת הספק: משתנה הסביבה STOCK_TRACKER_PROVIDER (yfinance / replay),
+ותיקיית ההקלטות ב-STOCK_TRACKER_FIXTURES; או set_provider() מהקוד.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+
+class DataProvider(Protocol):
+    """ממשק לספק נתוני שוק"""
+
+    def history(self, tickers, period=None, start=None, interval="1d"):
+        """
+        מחזיר נתוני OHLCV עבור רשימת סימולים בבקשה אחת
+
+        יש לציין period (למשל 2y) או start (תאריך התחלה, כולל).
+
+        מחזיר:
+        -------
+        dict : מילון {סימול: DataFrame עם Open, High, Low, Close, Volume}
+        """
+        ...
+
+    def info(self, ticker):
+        """מחזיר dict עם נתונים פונדמנטליים עבור סימול"""
+        ...
+
+
+def period_start(period, now=None):
+    """
+    ממיר מחרוזת תקופה של yfinance (1mo, 6mo, 2y, ytd, max...) לתאריך התחלה
+
+    מחזיר None עבור max (כל ההיסטוריה).
+    """
+    today = (now if now is not None else pd.Timestamp.today()).normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return today.replace(month=1, day=1)
+
+    unit_map = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in sorted(unit_map.items(), key=lambda kv: -len(kv[0])):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+
+    raise ValueError(f"תקופה לא נתמכת: {period}")
+
+
+def split_batch(df, tickers):
+    """
+    מפצל תוצאת download מרובת סימולים (MultiIndex) ל-DataFrame נפרד לכל סימול
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        תוצאת yf.download עבור מספר סימולים
+    tickers : list
+        רשימת הסימולים שהתבקשו
+
+    מחזיר:
+    -------
+    dict : מילון {סימול: DataFrame}
+    """
+    frames = {}
+
+    if df is None or df.empty:
+        return frames
+
+    if not isinstance(df.columns, pd.MultiIndex):
+        # סימול יחיד ללא MultiIndex
+        if len(tickers) == 1:
+            frames[tickers[0]] = df
+        return frames
+
+    # זיהוי הרמה שבה נמצאים הסימולים (תלוי ב-group_by ובגרסת yfinance)
+    level = 0 if set(tickers) & set(df.columns.get_level_values(0)) else 1
+    available = set(df.columns.get_level_values(level))
+
+    for t in tickers:
+        if t not in available:
+            continue
+        sub = df.xs(t, axis=1, level=level).dropna(how='all')
+        if not sub.empty:
+            frames[t] = sub
+
+    return frames
+
+
+class YFinanceProvider:
+    """ספק נתונים חיים מ-yfinance"""
+
+    # yf.download משתמש במצב גלובלי משותף ואינו בטוח להרצה מקבילה - קריאה אחת בכל פעם
+    _download_lock = threading.Lock()
+
+    def history(self, tickers, period=None, start=None, interval="1d"):
+        import yfinance as yf
+
+        tickers = list(tickers)
+        kwargs = {'start': pd.Timestamp(start).strftime('%Y-%m-%d')} if start is not None else {'period': period}
+        with self._download_lock:
+            df = yf.download(
+                tickers,
+                interval=interval,
+                auto_adjust=True,
+                progress=False,
+                group_by='ticker',
+                threads=True,
+                timeout=10,
+                **kwargs
+            )
+        return split_batch(df, tickers)
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info or {}
+
+
+def synthetic_ohlcv(bars, seed=0, end=None, freq="B", start_price=100.0, volatility=0.015,
+                   drift=0.0003):
+    """
+    מייצר נתוני OHLCV סינתטיים (הילוך אקראי גאומטרי) באופן דטרמיניסטי
+
+    פרמטרים:
+    ----------
+    bars : int
+        מספר הנרות
+    seed : int או list
+        seed למחולל האקראי - אותו seed מחזיר בדיוק אותם ערכים
+    end : pandas.Timestamp, optional
+        חותמת הזמן של הנר האחרון (ברירת מחדל: היום)
+    freq : str
+        תדירות הנרות (B לימי מסחר, min/5min/h לנרות תוך-יומיים)
+    start_price : float
+        מחיר פתיחה ראשוני
+    volatility : float
+        סטיית תקן של התשואה לנר
+    drift : float
+        תשואה ממוצעת לנר (בסדרות ארוכות מאוד - מיליוני נרות - יש להקטין
+        כדי שהמחיר לא יחרוג מטווח float64)
+
+    מחזיר:
+    -------
+    pandas.DataFrame : עמודות Open, High, Low, Close, Volume
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    index = pd.date_range(end=end, periods=bars, freq=freq, name='Date')
+
+    returns = rng.normal(drift, volatility, bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.empty(bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    open_ *= 1 + rng.normal(0, volatility / 4, bars)
+
+    wick = np.abs(rng.normal(0, volatility / 2, (2, bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(15, 0.4, bars).astype(np.int64)
+
+    return pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+        index=index,
+    )
+
+
+class ReplayProvider:
+    """
+    ספק נתונים ללא רשת
+
+    אם בתיקיית ההקלטות קיים קובץ {סימול}.parquet / {סימול}.json הוא מנוגן כפי
+    שהוא; אחרת נוצרת היסטוריה סינתטית דטרמיניסטית (לפי seed וסימול).
+
+    פרמטרים:
+    ----------
+    fixtures_dir : str, optional
+        תיקייה עם נתונים מוקלטים (ראו record_fixtures)
+    seed : int
+        seed בסיסי לנתונים סינתטיים
+    bars : int
+        מספר נרות יומיים בהיסטוריה סינתטית
+    latency : float
+        השהיה מדומה (בשניות) לכל בקשה - לבנצ'מרקים של מספר קריאות רשת
+    """
+
+    def __init__(self, fixtures_dir=None, seed=0, bars=2520, latency=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+        self.bars = bars
+        self.latency = latency
+        self.requests = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _fixture(self, ticker, ext):
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, f"{_fixture_name(ticker)}.{ext}")
+        return path if os.path.exists(path) else None
+
+    def _full_history(self, ticker, interval):
+        key = (ticker, interval)
+        if key not in self._cache:
+            path = self._fixture(ticker, 'parquet')
+            if path and interval == "1d":
+                df = pd.read_parquet(path)
+            else:
+                df = synthetic_ohlcv(
+                    self.bars, seed=[self.seed, zlib.crc32(ticker.encode())], freq=_interval_freq(interval)
+                )
+            self._cache[key] = df
+        return self._cache[key]
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def history(self, tickers, period=None, start=None, interval="1d"):
+        self._request()
+        start = pd.Timestamp(start) if start is not None else period_start(period) if period else None
+
+        frames = {}
+        for t in tickers:
+            df = self._full_history(t, interval)
+            if start is not None:
+                df = df.iloc[df.index.searchsorted(start):]
+            if not df.empty:
+                frames[t] = df.copy()
+        return frames
+
+    def info(self, ticker):
+        self._request()
+        path = self._fixture(ticker, 'json')
+        if path:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'longName': ticker, 'shortName': ticker, 'currency': 'USD'}
+
+
+def _interval_freq(interval):
+    """ממיר מרווח של yfinance (1d, 1h, 5m) לתדירות של pandas"""
+    if interval == "1d":
+        return "B"
+    if interval.endswith('m'):
+        return f"{interval[:-1]}min"
+    return interval
+
+
+def _fixture_name(ticker):
+    return ''.join(c if c.isalnum() or c in '.-' else '_' for c in ticker.upper())
+
+
+def record_fixtures(tickers, fixtures_dir, period="max", provider=None):
+    """
+    מקליט היסטוריה ו-info מספק חי לתיקייה, לניגון מאוחר יותר ב-ReplayProvider
+
+    פרמטרים:
+    ----------
+    tickers : iterable
+        סימולים להקלטה
+    fixtures_dir : str
+        תיקיית היעד
+    period : str
+        תקופת ההיסטוריה להקלטה
+    provider : DataProvider, optional
+        ספק המקור (ברירת מחדל: YFinanceProvider)
+    """
+    provider = provider or YFinanceProvider()
+    os.makedirs(fixtures_dir, exist_ok=True)
+    tickers = list(tickers)
+
+    for t, df in provider.history(tickers, period=period).items():
+        df.to_parquet(os.path.join(fixtures_dir, f"{_fixture_name(t)}.parquet"))
+
+    for t in tickers:
+        with open(os.path.join(fixtures_dir, f"{_fixture_name(t)}.json"), 'w', encoding='utf-8') as f:
+            json.dump(provider.info(t), f, ensure_ascii=False, default=str)
+
+
+_provider = None
+
+
+def _provider_from_env():
+    name = os.environ.get("STOCK_TRACKER_PROVIDER", "yfinance").lower()
+    if name == "replay":
+        return ReplayProvider(
+            fixtures_dir=os.environ.get("STOCK_TRACKER_FIXTURES"),
+            seed=int(os.environ.get("STOCK_TRACKER_SEED", "0")),
+        )
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"ספק נתונים לא מוכר: {name}")
+
+
+def get_provider():
+    """מחזיר את ספק הנתונים הפעיל"""
+    global _provider
+    if _provider is None:
+        _provider = _provider_from_env()
+    return _provider
+
+
+def set_provider(provider):
+    """מחליף את ספק הנתונים הפעיל (למשל ל-ReplayProvider בבנצ'מרקים)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,324 @@
+"""
+רישום הצהרתי של אינדיקטורים עם גרף תלויות
+
+כל צומת בגרף מצהיר על הקלטים שלו (עמודות מחיר או צמתים אחרים), על
+הפרמטרים שלו ועל פונקציית החישוב. חישוב של קבוצת עמודות מריץ רק את
+הצמתים הדרושים להן, וכל צומת מחושב פעם אחת בלבד גם אם כמה עמודות
+משתמשות בו (למשל SMA_20 ו-BB_Middle, או Close.shift(10) של Momentum ו-ROC).
+
+שני פרופילים מגדירים את שמות העמודות של הפונקציות הקיימות:
+- advanced: calculate_advanced_indicators (ewm עם adjust=True)
+- core: calculate_all_indicators (ewm עם adjust=False, תקופות SMA לפי ma_type)
+
+שימוש:
+    compute_indicators(df, ['RSI', 'MACD', 'MACD_Signal'])        # רק מה שצריך
+    compute_indicators(df, profile='core', periods=[9, 20, 50])   # כל הפרופיל
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core.kernels import rolling_extrema
+
+# עמודות המחיר הגולמיות - קלטים של הגרף
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+Node = namedtuple('Node', ['key', 'deps', 'fn'])
+
+# כל הצמתים הרשומים: {מפתח: Node}
+NODES = {}
+
+
+def _like(obj, values):
+    """עוטף מערך NumPy באותו אינדקס (ועמודות, בפאנל) כמו obj"""
+    if isinstance(obj, pd.DataFrame):
+        return pd.DataFrame(values, index=obj.index, columns=obj.columns)
+    return pd.Series(values, index=obj.index, name=obj.name)
+
+
+def node(key, deps, fn):
+    """רושם צומת (אם עדיין לא קיים) ומחזיר את המפתח שלו"""
+    if key not in NODES:
+        NODES[key] = Node(key, tuple(deps), fn)
+    return key
+
+
+# ----------------------------------------------------------------------
+# צמתים בסיסיים (מפתח נגזר מהפרמטרים, כך שצמתים זהים משותפים)
+# ----------------------------------------------------------------------
+
+def sma(src, window):
+    return node(f"sma({src},{window})", [src], lambda s: s.rolling(window, min_periods=1).mean())
+
+
+def rolling_std(src, window):
+    return node(f"std({src},{window})", [src], lambda s: s.rolling(window, min_periods=1).std())
+
+
+def extrema(src, mode, windows):
+    """קיצונים נעים לכמה חלונות במעבר אחד (core/kernels) - {חלון: Series}"""
+    windows = tuple(sorted(set(windows)))
+    return node(
+        f"{mode}({src},{','.join(map(str, windows))})", [src],
+        lambda s: {w: _like(s, v) for w, v in rolling_extrema(s.to_numpy(), windows, mode).items()}
+    )
+
+
+def rolling_min(src, window, share=()):
+    """מינימום נע; share - חלונות נוספים על אותה עמודה שיחושבו באותו מעבר"""
+    group = extrema(src, 'min', (window,) + tuple(share))
+    return node(f"min({src},{window})", [group], lambda g: g[window])
+
+
+def rolling_max(src, window, share=()):
+    """מקסימום נע; share - חלונות נוספים על אותה עמודה שיחושבו באותו מעבר"""
+    group = extrema(src, 'max', (window,) + tuple(share))
+    return node(f"max({src},{window})", [group], lambda g: g[window])
+
+
+def ewm(src, span, adjust):
+    return node(
+        f"ewm({src},{span},{adjust})", [src],
+        lambda s: s.ewm(span=span, adjust=adjust, min_periods=1).mean()
+    )
+
+
+def shift(src, periods):
+    return node(f"shift({src},{periods})", [src], lambda s: s.shift(periods))
+
+
+def diff(a, b):
+    return node(f"diff({a},{b})", [a, b], lambda x, y: x - y)
+
+
+# ----------------------------------------------------------------------
+# אינדיקטורים מורכבים
+# ----------------------------------------------------------------------
+
+def macd(adjust):
+    return diff(ewm('Close', 12, adjust), ewm('Close', 26, adjust))
+
+
+def macd_signal(adjust):
+    return ewm(macd(adjust), 9, adjust)
+
+
+def rsi_raw(window=14):
+    """RSI לפני טיפול ב-NaN (ממוצע פשוט של רווחים/הפסדים)"""
+    delta = node("delta(Close)", ['Close'], lambda c: c.diff())
+    avg_gain = node(
+        f"avg_gain({window})", [delta],
+        lambda d: d.where(d > 0, 0).rolling(window, min_periods=1).mean()
+    )
+    avg_loss = node(
+        f"avg_loss({window})", [delta],
+        lambda d: (-d.where(d < 0, 0)).rolling(window, min_periods=1).mean()
+    )
+    return node(
+        f"rsi_raw({window})", [avg_gain, avg_loss],
+        lambda g, l: 100 - (100 / (1 + g / l.replace(0, np.nan)))
+    )
+
+
+def bollinger(window=20, fill_std=False):
+    """מחזיר מפתחות (אמצע, סטיית תקן, עליונה, תחתונה, רוחב)"""
+    mid = sma('Close', window)
+    std = rolling_std('Close', window)
+    if fill_std:
+        std = node(f"fillna0({std})", [std], lambda s: s.fillna(0))
+    upper = node(f"bb_upper({window},{fill_std})", [mid, std], lambda m, s: m + (s * 2))
+    lower = node(f"bb_lower({window},{fill_std})", [mid, std], lambda m, s: m - (s * 2))
+    width = node(f"bb_width({window},{fill_std})", [upper, lower, mid], lambda u, l, m: (u - l) / m)
+    return mid, std, upper, lower, width
+
+
+def stochastic(window=14, smooth=3, share=()):
+    low_n = rolling_min('Low', window, share)
+    high_n = rolling_max('High', window, share)
+    pct_k = node(
+        f"%K({window})", ['Close', low_n, high_n],
+        lambda c, lo, hi: 100 * ((c - lo) / (hi - lo).replace(0, np.nan))
+    )
+    return pct_k, sma(pct_k, smooth)
+
+
+def atr(window=14):
+    prev_close = shift('Close', 1)
+    true_range = node(
+        "true_range", ['High', 'Low', prev_close],
+        # fmax מדלג על NaN כמו max(axis=1) של pandas ועובד גם על פאנל
+        lambda h, l, pc: np.fmax(np.fmax(h - l, np.abs(h - pc)), np.abs(l - pc))
+    )
+    return sma(true_range, window)
+
+
+def volume_ratio(window=20):
+    vol_sma = sma('Volume', window)
+    return node(
+        f"volume_ratio({window})", ['Volume', vol_sma],
+        lambda v, s: (v / s.replace(0, np.nan)).fillna(1)
+    )
+
+
+def momentum(periods=10):
+    return diff('Close', shift('Close', periods))
+
+
+def roc(periods=10):
+    prev = shift('Close', periods)
+    return node(f"roc({periods})", ['Close', prev], lambda c, p: ((c - p) / p) * 100)
+
+
+# ----------------------------------------------------------------------
+# פרופילים: {שם עמודה: מפתח צומת}
+# ----------------------------------------------------------------------
+
+# חלונות High/Low של Stochastic ו-Support/Resistance - מחושבים במעבר משותף
+HIGH_LOW_WINDOWS = (14, 20)
+
+def advanced_profile():
+    """העמודות של calculate_advanced_indicators (לפי הסדר)"""
+    bb_mid, _, bb_upper, bb_lower, bb_width = bollinger(20, fill_std=True)
+    pct_k, pct_d = stochastic(14, 3, share=HIGH_LOW_WINDOWS)
+    return {
+        'SMA_10': sma('Close', 10),
+        'SMA_20': sma('Close', 20),
+        'SMA_50': sma('Close', 50),
+        'SMA_200': sma('Close', 200),
+        'EMA_12': ewm('Close', 12, True),
+        'EMA_26': ewm('Close', 26, True),
+        'MACD': macd(True),
+        'MACD_Signal': macd_signal(True),
+        'MACD_Histogram': diff(macd(True), macd_signal(True)),
+        'RSI': node("rsi_fill(14)", [rsi_raw(14)], lambda r: r.fillna(50)),
+        'BB_Middle': bb_mid,
+        'BB_Upper': bb_upper,
+        'BB_Lower': bb_lower,
+        'BB_Width': bb_width,
+        '%K': pct_k,
+        '%D': pct_d,
+        'ATR': atr(14),
+        'Volume_SMA': sma('Volume', 20),
+        'Volume_Ratio': volume_ratio(20),
+        'Momentum': momentum(10),
+        'ROC': roc(10),
+        'Resistance_20': rolling_max('High', 20, share=HIGH_LOW_WINDOWS),
+        'Support_20': rolling_min('Low', 20, share=HIGH_LOW_WINDOWS),
+    }
+
+
+def core_profile(periods):
+    """העמודות של calculate_all_indicators עבור תקופות SMA נתונות (לפי הסדר)"""
+    bb_mid, bb_std, bb_upper, bb_lower, bb_width = bollinger(20, fill_std=False)
+    columns = {f'SMA_{p}': sma('Close', p) for p in periods}
+    columns.update({
+        'RSI': node("rsi_clip(14)", [rsi_raw(14)], lambda r: r.clip(0, 100).fillna(50)),
+        'MACD': macd(False),
+        'MACD_Signal': macd_signal(False),
+        'MACD_Histogram': diff(macd(False), macd_signal(False)),
+        'BB_Mid': bb_mid,
+        'BB_Std': bb_std,
+        'BB_Upper': bb_upper,
+        'BB_Lower': bb_lower,
+        'BB_Width': bb_width,
+        'EMA_20': ewm('Close', 20, False),
+        'EMA_50': ewm('Close', 50, False),
+    })
+    return columns
+
+
+def get_profile(profile='advanced', periods=None):
+    """מחזיר מיפוי {שם עמודה: מפתח צומת} עבור פרופיל"""
+    if profile == 'advanced':
+        return advanced_profile()
+    if profile == 'core':
+        return core_profile(periods or [9, 20, 50])
+    raise ValueError(f"פרופיל לא מוכר: {profile}")
+
+
+# ----------------------------------------------------------------------
+# חישוב
+# ----------------------------------------------------------------------
+
+def resolve(keys):
+    """
+    מחזיר את כל הצמתים הדרושים לחישוב keys בסדר טופולוגי (תלויות קודם)
+    """
+    order = []
+    seen = set()
+
+    def visit(key):
+        if key in seen or key in PRICE_COLUMNS:
+            return
+        seen.add(key)
+        for dep in NODES[key].deps:
+            visit(dep)
+        order.append(key)
+
+    for key in keys:
+        visit(key)
+    return order
+
+
+def evaluate(df, keys, memo=None):
+    """
+    מחשב צמתים לפי מפתח, כל צומת פעם אחת
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame או dict
+        נתוני מחיר, או פאנל {עמודת מחיר: DataFrame רחב של נרות x סימולים} -
+        כל הצמתים מחושבים אז לכל הסימולים בבת אחת, עמודה-עמודה
+    keys : iterable
+        מפתחות הצמתים המבוקשים
+    memo : dict, optional
+        תוצאות ביניים מחישוב קודם על אותו df - מאפשר שימוש חוזר בין קריאות
+        (למשל בסריקת פרמטרים)
+
+    מחזיר:
+    -------
+    dict : {מפתח: pandas.Series} - כולל כל תוצאות הביניים
+    """
+    memo = {} if memo is None else memo
+    for key in resolve(keys):
+        if key in memo:
+            continue
+        spec = NODES[key]
+        args = [memo[d] if d in memo else df[d] for d in spec.deps]
+        memo[key] = spec.fn(*args)
+    return memo
+
+
+def compute_indicators(df, columns=None, profile='advanced', periods=None, memo=None):
+    """
+    מחשב רק את עמודות האינדיקטורים המבוקשות
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame או dict
+        DataFrame עם עמודות Open, High, Low, Close, Volume, או פאנל (ראו evaluate)
+    columns : list, optional
+        שמות העמודות המבוקשות (ברירת מחדל: כל עמודות הפרופיל)
+    profile : str
+        'advanced' או 'core'
+    periods : list, optional
+        תקופות SMA עבור פרופיל core
+    memo : dict, optional
+        תוצאות ביניים לשימוש חוזר (ראו evaluate)
+
+    מחזיר:
+    -------
+    dict : {שם עמודה: pandas.Series} לפי סדר הבקשה
+    """
+    mapping = get_profile(profile, periods)
+    if columns is None:
+        columns = list(mapping)
+
+    missing = [c for c in columns if c not in mapping]
+    if missing:
+        raise KeyError(f"עמודות לא מוכרות בפרופיל {profile}: {missing}")
+
+    results = evaluate(df, [mapping[c] for c in columns], memo)
+    return {c: results[mapping[c]] for c in columns}
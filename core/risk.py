@@ -0,0 +1,136 @@
+"""
+מדדי סיכון לתיק: תנודתיות, VaR/CVaR היסטורי ופרמטרי, בטא מול מדד ייחוס
+ומטריצת קורלציות בין הפוזיציות
+
+הקלט הוא פאנל תשואות יומיות (תאריכים x סימולים, למשל core.data.load_return_panel)
+ווקטור משקלים (Weight מ-core.valuation.valuate). הכול מחושב בפעולות מטריצה:
+תשואת התיק היא R @ w, מטריצת השונויות היא Rc.T @ Rc, והבטא של כל הסימולים
+היא מכפלה אחת מול סדרת המדד - ללא לולאה על סימולים או על ימים.
+
+יום שבו לסימול אין תשואה (לפני הנפקה, חג בבורסה אחרת) נספר כתשואה 0.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from core.timing import timed
+
+# ימי מסחר בשנה (להמרת תנודתיות יומית לשנתית)
+TRADING_DAYS = 252
+
+# מדד הייחוס לחישוב בטא
+BENCHMARK = "SPY"
+
+# מדדי הסיכון לכל סימול
+HOLDING_COLUMNS = ['Weight', 'Volatility', 'Beta', 'Risk Contribution']
+
+
+def _historical_tail(returns, confidence):
+    """VaR ו-CVaR היסטוריים (כהפסד חיובי) מסדרת תשואות"""
+    if len(returns) == 0:
+        return np.nan, np.nan
+    cutoff = np.quantile(returns, 1 - confidence)
+    tail = returns[returns <= cutoff]
+    return -cutoff, -tail.mean()
+
+
+def _parametric_tail(mu, sigma, confidence):
+    """VaR ו-CVaR בהנחת התפלגות נורמלית (כהפסד חיובי)"""
+    normal = NormalDist()
+    z = normal.inv_cdf(1 - confidence)
+    var = -(mu + z * sigma)
+    cvar = -(mu - sigma * normal.pdf(z) / (1 - confidence))
+    return var, cvar
+
+
+@timed('risk.portfolio_risk')
+def portfolio_risk(returns, weights, benchmark=None, confidence=0.95, horizon=1):
+    """
+    מדדי סיכון לתיק ולכל פוזיציה
+
+    פרמטרים:
+    ----------
+    returns : pandas.DataFrame
+        תשואות יומיות (תאריכים x סימולים)
+    weights : pandas.Series
+        משקל כל סימול משווי התיק; סימולים ללא תשואות מושמטים והמשקלים
+        מנורמלים מחדש לסכום 1
+    benchmark : pandas.Series, optional
+        תשואות יומיות של מדד הייחוס (מיושר לתאריכי returns)
+    confidence : float
+        רמת הביטחון ל-VaR/CVaR (למשל 0.95)
+    horizon : int
+        אופק בימים ל-VaR/CVaR (הגדלה לפי שורש הזמן)
+
+    מחזיר:
+    -------
+    dict : summary (מדדי התיק), holdings (DataFrame לכל סימול - HOLDING_COLUMNS)
+           ו-correlation (מטריצת קורלציות כ-DataFrame)
+    """
+    weights = weights[weights.index.isin(returns.columns)].astype(np.float64)
+    weights = weights[weights.notna()]
+    tickers = weights.index
+    R = returns[tickers].to_numpy(dtype=np.float64, na_value=np.nan)
+    R = np.nan_to_num(R, nan=0.0)
+    total = weights.sum()
+    w = weights.to_numpy() / total if total else np.zeros(len(tickers))
+    t, k = R.shape
+
+    summary = dict.fromkeys([
+        'Volatility (ann.)', 'Mean (daily)', 'VaR (hist)', 'CVaR (hist)',
+        'VaR (param)', 'CVaR (param)', 'Beta', 'Days',
+    ], np.nan)
+    summary['Days'] = t
+    empty = pd.DataFrame(np.nan, index=tickers, columns=HOLDING_COLUMNS)
+    if t < 2 or k == 0:
+        return {'summary': summary, 'holdings': empty, 'correlation': pd.DataFrame(index=tickers, columns=tickers)}
+
+    # מטריצת שונויות ותשואת התיק
+    mean = R.mean(axis=0)
+    Rc = R - mean
+    cov = Rc.T @ Rc / (t - 1)
+    port = R @ w
+    mu = float(port.mean())
+    sigma = float(np.sqrt(max(w @ cov @ w, 0.0)))
+
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+        # תרומה לסיכון: w_i * (Σw)_i / σ_p - סכומן הוא σ_p
+        contribution = w * (cov @ w) / sigma if sigma > 0 else np.full(k, np.nan)
+    np.fill_diagonal(corr, 1.0)
+
+    # VaR/CVaR - יומיים, מוגדלים לאופק לפי שורש הזמן
+    scale = np.sqrt(horizon)
+    hist_var, hist_cvar = _historical_tail(port, confidence)
+    param_var, param_cvar = _parametric_tail(mu, sigma, confidence)
+
+    # בטא מול המדד: cov(R_i, b) / var(b) לכל הסימולים במכפלה אחת
+    beta = np.full(k, np.nan)
+    if benchmark is not None:
+        b = benchmark.reindex(returns.index).to_numpy(dtype=np.float64, na_value=np.nan)
+        b = np.nan_to_num(b, nan=0.0)
+        bc = b - b.mean()
+        denom = bc @ bc
+        if denom > 0:
+            beta = Rc.T @ bc / denom
+            summary['Beta'] = float(w @ beta)
+
+    summary.update({
+        'Volatility (ann.)': float(sigma * np.sqrt(TRADING_DAYS)),
+        'Mean (daily)': mu,
+        'VaR (hist)': float(hist_var * scale),
+        'CVaR (hist)': float(hist_cvar * scale),
+        'VaR (param)': float(param_var * scale),
+        'CVaR (param)': float(param_cvar * scale),
+    })
+    holdings = pd.DataFrame({
+        'Weight': w,
+        'Volatility': std * np.sqrt(TRADING_DAYS),
+        'Beta': beta,
+        'Risk Contribution': contribution,
+    }, index=tickers)
+    correlation = pd.DataFrame(corr, index=tickers, columns=tickers)
+    return {'summary': summary, 'holdings': holdings, 'correlation': correlation}
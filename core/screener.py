@@ -0,0 +1,171 @@
+"""
+סורק מניות - אינדיקטורים וציון טכני לכל יקום הסימולים בחישוב פאנל אחד
+
+במקום לנתח כל סימול בנפרד, ההיסטוריות מאוחדות לפאנל רחב (נרות x סימולים)
+לכל אחת מעמודות Close/High/Low/Volume, והאינדיקטורים של
+calculate_advanced_indicators מחושבים דרך גרף האינדיקטורים (core/registry)
+עמודה-עמודה לכל הסימולים בבת אחת. מכל סימול נלקח הנר האחרון, והסימולים
+מדורגים לפי הציון הטכני (calculate_final_scores). לכל לוח מסחר (calendar_groups)
+נבנה פאנל נפרד, כך שהתוצאה שווה לניתוח כל סימול בנפרד.
+
+יקום גדול מחולק לקבוצות של SCREEN_CHUNK סימולים שמחושבות במקביל
+ב-ProcessPoolExecutor.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import calculate_final_scores, score_columns
+from core.panel import build_panel, calendar_groups
+from core.registry import compute_indicators
+from core.timing import timed
+
+# תיקיית רשימות היקום (קובץ txt - סימול בכל שורה, או csv עם עמודת Symbol)
+UNIVERSE_DIR = Path(__file__).resolve().parent.parent / "universes"
+
+# תקופות SMA לציון (SMA_200 - המגמה הארוכה של הפרופיל המתקדם)
+SCREEN_PERIODS = [50, 200]
+
+# האינדיקטורים שמחושבים לסריקה: מה שהציון קורא ועוד עמודות תצוגה
+SCREEN_COLUMNS = list(dict.fromkeys(
+    score_columns(SCREEN_PERIODS) + ['SMA_50', '%K', 'ATR', 'Volume_Ratio', 'ROC']
+))
+
+# מספר סימולים בכל קבוצה ומספר תהליכים לסריקה מקבילית
+SCREEN_CHUNK = int(os.environ.get("STOCK_TRACKER_SCREEN_CHUNK", "250"))
+SCREEN_WORKERS = int(os.environ.get("STOCK_TRACKER_SCREEN_WORKERS", str(os.cpu_count() or 1)))
+
+
+def list_universes():
+    """
+    מחזיר את רשימות היקום הזמינות
+
+    מחזיר:
+    -------
+    dict : {שם: נתיב קובץ}
+    """
+    if not UNIVERSE_DIR.is_dir():
+        return {}
+    return {
+        path.stem: path
+        for path in sorted(UNIVERSE_DIR.iterdir())
+        if path.suffix in ('.txt', '.csv')
+    }
+
+
+def load_universe(path):
+    """
+    קורא רשימת סימולים מקובץ
+
+    פרמטרים:
+    ----------
+    path : str או Path
+        קובץ txt (סימול בכל שורה, # להערות) או csv (עמודת Symbol/Ticker,
+        אחרת העמודה הראשונה)
+
+    מחזיר:
+    -------
+    list : סימולים ייחודיים באותיות גדולות, לפי סדר הופעתם
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        table = pd.read_csv(path)
+        column = next((c for c in table.columns if c.lower() in ('symbol', 'ticker')), table.columns[0])
+        raw = table[column].dropna().astype(str)
+    else:
+        raw = [line.split('#')[0] for line in path.read_text(encoding='utf-8').splitlines()]
+
+    # סימולים כמו BRK.B נכתבים ב-Yahoo עם מקף
+    tickers = [t.strip().upper().replace('.', '-') for t in raw]
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def _last_valid_rows(close):
+    """מיקום הנר האחרון עם מחיר סגירה לכל סימול (סימול שנסחר לאחרונה לפני היום)"""
+    valid = close.notna().to_numpy()
+    return len(close) - 1 - np.argmax(valid[::-1], axis=0)
+
+
+def screen_panel(panel):
+    """
+    מחשב אינדיקטורים וציון טכני לכל הסימולים בפאנל
+
+    פרמטרים:
+    ----------
+    panel : dict
+        פאנל כפי שמוחזר מ-build_panel
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל סימול (הנר האחרון) עם האינדיקטורים והציון
+    """
+    close = panel['Close']
+    if close.empty:
+        return pd.DataFrame()
+
+    values = compute_indicators(panel, SCREEN_COLUMNS, profile='advanced')
+
+    rows = _last_valid_rows(close)
+    cols = np.arange(close.shape[1])
+    snapshot = pd.DataFrame(
+        {name: frame.to_numpy()[rows, cols] for name, frame in {'Close': close, **values}.items()},
+        index=pd.Index(close.columns, name='Ticker'),
+    )
+    snapshot.insert(0, 'Date', close.index[rows])
+
+    score, labels, colors = calculate_final_scores(snapshot, SCREEN_PERIODS)
+    snapshot.insert(0, 'Score', score)
+    snapshot.insert(1, 'Recommendation', labels)
+    snapshot.insert(2, 'Color', colors)
+    return snapshot
+
+
+def _chunks(tickers, size):
+    return [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+
+@timed('screener.screen_universe')
+def screen_universe(frames, workers=None, chunk_size=None):
+    """
+    מדרג יקום סימולים לפי הציון הטכני
+
+    פרמטרים:
+    ----------
+    frames : dict
+        {סימול: DataFrame עם נתוני מחיר} (למשל מ-load_many)
+    workers : int, optional
+        מספר תהליכים (ברירת מחדל: SCREEN_WORKERS); 1 - חישוב בתהליך הנוכחי
+    chunk_size : int, optional
+        מספר סימולים לכל פאנל (ברירת מחדל: SCREEN_CHUNK)
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל סימול, ממוינת לפי ציון (ואז ROC) עם עמודת Rank
+    """
+    workers = SCREEN_WORKERS if workers is None else workers
+    chunk_size = chunk_size or SCREEN_CHUNK
+
+    tickers = sorted(t for t, df in frames.items() if df is not None and not df.empty)
+    if not tickers:
+        return pd.DataFrame()
+
+    # פאנל לכל קבוצה בלוח מסחר אחד - ללא שורות NaN באמצע ההיסטוריה של סימול
+    panels = [
+        build_panel({t: frames[t] for t in group})
+        for calendar in calendar_groups({t: frames[t] for t in tickers})
+        for group in _chunks(calendar, chunk_size)
+    ]
+
+    if workers > 1 and len(panels) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(panels))) as pool:
+            parts = list(pool.map(screen_panel, panels))
+    else:
+        parts = [screen_panel(panel) for panel in panels]
+
+    result = pd.concat(parts).sort_values(['Score', 'ROC'], ascending=False, na_position='last')
+    result.insert(0, 'Rank', np.arange(1, len(result) + 1))
+    return result
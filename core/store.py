@@ -0,0 +1,285 @@
+"""
+מאגר מקומי של נתוני שוק
+
+- נתוני OHLCV בפורמט Parquet (קובץ אחד לכל סימול): המאגר שומר כל נר
+  שכבר נטען, כך שבטעינה הבאה יש צורך להוריד רק את הנרות שאחרי חותמת
+  הזמן האחרונה השמורה.
+- נתונים פונדמנטליים (Ticker.info) בקובץ JSON לכל סימול, עם חותמת זמן
+  לצורך תפוגה.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+# תיקיית הנתונים (ניתן לשנות דרך משתנה סביבה)
+DATA_DIR = os.environ.get(
+    "STOCK_TRACKER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+STORE_DIR = os.path.join(DATA_DIR, "ohlcv")
+FUNDAMENTALS_DIR = os.path.join(DATA_DIR, "fundamentals")
+
+_MANIFEST = "_manifest.json"
+_lock = threading.Lock()
+
+# שכבת זיכרון מעל קבצי ה-JSON: {שם קובץ: (זמן משיכה, נתונים)}
+_fundamentals_memory = {}
+
+
+def _safe_name(ticker):
+    """ממיר סימול לשם קובץ בטוח (למשל ^GSPC, USDILS=X)"""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', ticker.upper())
+
+
+def _interval_dir(interval):
+    return os.path.join(STORE_DIR, interval)
+
+
+def _path(ticker, interval):
+    return os.path.join(_interval_dir(interval), f"{_safe_name(ticker)}.parquet")
+
+
+def _read_manifest(interval):
+    path = os.path.join(_interval_dir(interval), _MANIFEST)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(interval, manifest):
+    path = os.path.join(_interval_dir(interval), _MANIFEST)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def read_bars(ticker, interval="1d"):
+    """
+    קורא את כל הנרות השמורים עבור סימול
+
+    פרמטרים:
+    ----------
+    ticker : str
+        סימול המניה
+    interval : str
+        מרווח הנרות (ברירת מחדל: 1d)
+
+    מחזיר:
+    -------
+    DataFrame או None אם אין נתונים שמורים
+    """
+    path = _path(ticker, interval)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # קובץ פגום - נתייחס אליו כאילו לא קיים
+        return None
+    return df if not df.empty else None
+
+
+def covered_from(ticker, interval="1d"):
+    """
+    מחזיר את תחילת התקופה שכבר נטענה במלואה עבור הסימול (או None)
+
+    תאריך זה נשמר בעת טעינה מלאה ועשוי להיות מוקדם מהנר הראשון בפועל
+    (סופי שבוע, חגים או מניה שהונפקה מאוחר יותר).
+    """
+    value = _read_manifest(interval).get(_safe_name(ticker), {}).get('covered_from')
+    return pd.Timestamp(value) if value else None
+
+
+def coverage(tickers, interval="1d"):
+    """
+    covered_from עבור כמה סימולים בקריאה אחת של קובץ המניפסט
+
+    מחזיר:
+    -------
+    dict : {סימול: pandas.Timestamp או None}
+    """
+    manifest = _read_manifest(interval)
+    result = {}
+    for t in tickers:
+        value = manifest.get(_safe_name(t), {}).get('covered_from')
+        result[t] = pd.Timestamp(value) if value else None
+    return result
+
+
+def set_covered_from(tickers, covered_from, interval="1d"):
+    """מעדכן את covered_from של כמה סימולים בכתיבה אחת של המניפסט"""
+    if not tickers:
+        return
+    with _lock:
+        os.makedirs(_interval_dir(interval), exist_ok=True)
+        manifest = _read_manifest(interval)
+        value = pd.Timestamp(covered_from).isoformat()
+        for t in tickers:
+            manifest.setdefault(_safe_name(t), {})['covered_from'] = value
+        _write_manifest(interval, manifest)
+
+
+def write_bars(ticker, df, interval="1d", covered_from=None):
+    """
+    שומר (דורס) את כל הנרות של סימול
+
+    פרמטרים:
+    ----------
+    ticker : str
+        סימול המניה
+    df : pandas.DataFrame
+        נתוני OHLCV עם אינדקס זמן
+    interval : str
+        מרווח הנרות
+    covered_from : pandas.Timestamp, optional
+        תחילת התקופה שהתבקשה בטעינה המלאה
+    """
+    if df is None or df.empty:
+        return
+
+    with _lock:
+        os.makedirs(_interval_dir(interval), exist_ok=True)
+        path = _path(ticker, interval)
+
+        # כתיבה לקובץ זמני והחלפה אטומית - קוראים מקבילים לא יראו קובץ חלקי
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.sort_index().to_parquet(tmp)
+        os.replace(tmp, path)
+
+        if covered_from is not None:
+            manifest = _read_manifest(interval)
+            manifest.setdefault(_safe_name(ticker), {})['covered_from'] = pd.Timestamp(covered_from).isoformat()
+            _write_manifest(interval, manifest)
+
+
+def append_bars(ticker, df_new, interval="1d", stored=None):
+    """
+    מוסיף נרות חדשים לנתונים השמורים
+
+    נרות עם חותמת זמן קיימת מוחלפים בערכים החדשים (למשל הנר של היום
+    שעדיין לא נסגר). אם לא השתנה דבר הקובץ לא נכתב מחדש.
+
+    פרמטרים:
+    ----------
+    stored : DataFrame, optional
+        הנרות השמורים אם כבר נקראו (חוסך קריאה נוספת של הקובץ)
+
+    מחזיר:
+    -------
+    DataFrame : כל הנרות השמורים לאחר העדכון
+    """
+    if stored is None:
+        stored = read_bars(ticker, interval)
+    if df_new is None or df_new.empty:
+        return stored
+
+    if stored is None:
+        merged = df_new.sort_index()
+    else:
+        merged = pd.concat([stored, df_new[stored.columns.intersection(df_new.columns)]])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        if merged.equals(stored):
+            return stored
+
+    write_bars(ticker, merged, interval)
+    return merged
+
+
+def clear(ticker=None, interval="1d"):
+    """מוחק נתונים שמורים עבור סימול (או את כל המרווח אם לא צוין סימול)"""
+    directory = _interval_dir(interval)
+    if not os.path.isdir(directory):
+        return
+
+    with _lock:
+        manifest = _read_manifest(interval)
+        if ticker:
+            names = [_safe_name(ticker)]
+        else:
+            names = [f[:-len('.parquet')] for f in os.listdir(directory) if f.endswith('.parquet')]
+
+        for name in names:
+            path = os.path.join(_interval_dir(interval), f"{name}.parquet")
+            if os.path.exists(path):
+                os.remove(path)
+            manifest.pop(name, None)
+
+        _write_manifest(interval, manifest)
+
+
+def _fundamentals_path(ticker):
+    return os.path.join(FUNDAMENTALS_DIR, f"{_safe_name(ticker)}.json")
+
+
+def read_fundamentals(ticker, max_age):
+    """
+    מחזיר נתונים פונדמנטליים שמורים אם אינם ישנים מ-max_age שניות
+
+    פרמטרים:
+    ----------
+    ticker : str
+        סימול המניה
+    max_age : float
+        גיל מקסימלי בשניות
+
+    מחזיר:
+    -------
+    dict או None אם אין נתונים שמורים או שפג תוקפם
+    """
+    name = _safe_name(ticker)
+    entry = _fundamentals_memory.get(name)
+
+    if entry is None:
+        try:
+            with open(_fundamentals_path(ticker), encoding='utf-8') as f:
+                payload = json.load(f)
+            entry = (payload['fetched_at'], payload['info'])
+        except (OSError, ValueError, KeyError):
+            return None
+        _fundamentals_memory[name] = entry
+
+    fetched_at, info = entry
+    if time.time() - fetched_at > max_age:
+        return None
+    return dict(info)
+
+
+def write_fundamentals(ticker, info):
+    """שומר נתונים פונדמנטליים עבור סימול יחד עם זמן המשיכה"""
+    name = _safe_name(ticker)
+    fetched_at = time.time()
+
+    with _lock:
+        os.makedirs(FUNDAMENTALS_DIR, exist_ok=True)
+        path = _fundamentals_path(ticker)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': fetched_at, 'info': info}, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+        _fundamentals_memory[name] = (fetched_at, dict(info))
+
+
+def clear_fundamentals(ticker=None):
+    """מוחק נתונים פונדמנטליים שמורים עבור סימול (או את כולם אם לא צוין סימול)"""
+    if not os.path.isdir(FUNDAMENTALS_DIR):
+        return
+
+    with _lock:
+        if ticker:
+            names = [_safe_name(ticker)]
+        else:
+            names = [f[:-len('.json')] for f in os.listdir(FUNDAMENTALS_DIR) if f.endswith('.json')]
+
+        for name in names:
+            path = os.path.join(FUNDAMENTALS_DIR, f"{name}.json")
+            if os.path.exists(path):
+                os.remove(path)
+            _fundamentals_memory.pop(name, None)
@@ -0,0 +1,372 @@
+"""
+מנוע אינדיקטורים מצטבר (streaming)
+
+במקום לחשב מחדש את כל הסדרות על כל ההיסטוריה בכל נר חדש, המנוע שומר את
+המצב הרץ של כל אינדיקטור (סכומים בחלון, EWM, דקים מונוטוניים למינימום/
+מקסימום) ומעדכן את כולם ב-O(1) לכל נר.
+
+המנוע משחזר את אותן נוסחאות של pandas (rolling עם min_periods=1, ewm)
+כך שהתוצאות שוות לפונקציות ה-batch ב-core/indicators עד לשגיאת עיגול:
+- StreamingIndicators.advanced() ↔ calculate_advanced_indicators
+- StreamingIndicators.core(ma_type) ↔ calculate_all_indicators
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+def _valid(x):
+    return x == x
+
+
+def _fmax(*values):
+    """מקסימום שמדלג על NaN (כמו np.fmax); NaN רק כשכל הערכים NaN"""
+    valid = [x for x in values if x == x]
+    return max(valid) if valid else NAN
+
+
+class RollingMoments:
+    """
+    ממוצע וסטיית תקן בחלון נע (מתעלם מ-NaN, כמו rolling עם min_periods=1)
+
+    משחזר את האלגוריתם של pandas: סכום עם פיצוי Kahan לממוצע, Welford
+    מפוצה לשונות, וערך מדויק כשכל החלון זהה (למשל רצף אפסים ב-RSI).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        # ממוצע
+        self.sum_x = 0.0
+        self.sum_comp = 0.0
+        self.neg_ct = 0
+        # שונות
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.var_comp = 0.0
+        # רצף ערכים זהים
+        self.same_ct = 0
+        self.prev_value = NAN
+
+    def push(self, x):
+        self.values.append(x)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._add(x)
+
+    def _add(self, x):
+        if not _valid(x):
+            return
+        self.nobs += 1
+
+        y = x - self.sum_comp
+        t = self.sum_x + y
+        self.sum_comp = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, x) < 0:
+            self.neg_ct += 1
+
+        self.same_ct = self.same_ct + 1 if x == self.prev_value else 1
+        self.prev_value = x
+
+        prev_mean = self.mean_x - self.var_comp
+        y = x - self.var_comp
+        t = y - self.mean_x
+        self.var_comp = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (x - prev_mean) * (x - self.mean_x)
+
+    def _remove(self, x):
+        if not _valid(x):
+            return
+        self.nobs -= 1
+
+        y = -x - self.sum_comp
+        t = self.sum_x + y
+        self.sum_comp = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, x) < 0:
+            self.neg_ct -= 1
+
+        if self.nobs:
+            prev_mean = self.mean_x - self.var_comp
+            y = x - self.var_comp
+            t = y - self.mean_x
+            self.var_comp = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (x - prev_mean) * (x - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def get_mean(self):
+        if not self.nobs:
+            return NAN
+        if self.same_ct >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+    def get_std(self):
+        if self.nobs < 2:
+            return NAN
+        if self.same_ct >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self.ssqdm_x, 0.0) / (self.nobs - 1))
+
+
+class RollingExtreme:
+    """
+    מינימום או מקסימום בחלון נע בעזרת דק מונוטוני - O(1) בממוצע לכל נר
+    """
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.items = deque()
+        self.i = -1
+
+    def push(self, x):
+        self.i += 1
+        if _valid(x):
+            if self.is_max:
+                while self.items and self.items[-1][1] <= x:
+                    self.items.pop()
+            else:
+                while self.items and self.items[-1][1] >= x:
+                    self.items.pop()
+            self.items.append((self.i, x))
+        while self.items and self.items[0][0] <= self.i - self.window:
+            self.items.popleft()
+
+    def get(self):
+        return self.items[0][1] if self.items else NAN
+
+
+class EWMean:
+    """
+    ממוצע נע מעריכי - שחזור של הרקורסיה של pandas ewm(span, adjust, min_periods=1)
+    """
+
+    def __init__(self, span, adjust=True):
+        alpha = 2.0 / (span + 1.0)
+        self.decay = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.weighted = NAN
+        self.old_wt = 1.0
+
+    def push(self, x):
+        if _valid(self.weighted):
+            # ignore_na=False: גם תצפית חסרה מקטינה את משקל העבר
+            self.old_wt *= self.decay
+            if _valid(x):
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.new_wt * x) / (self.old_wt + self.new_wt)
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif _valid(x):
+            self.weighted = x
+        return self.weighted
+
+
+class StreamingIndicators:
+    """
+    מנוע אינדיקטורים שמתעדכן נר אחר נר
+
+    פרמטרים:
+    ----------
+    sma_periods : iterable
+        תקופות SMA
+    adjust : bool
+        פרמטר adjust של ewm (True ב-calculate_advanced_indicators, False ב-calculate_all_indicators)
+    profile : str
+        'advanced' - העמודות של calculate_advanced_indicators
+        'core' - העמודות של calculate_all_indicators
+
+    שימוש:
+    -------
+    engine = StreamingIndicators.advanced()
+    engine.update_frame(df_history)          # אתחול מההיסטוריה
+    row = engine.update(o, h, l, c, v)       # נר חדש - O(1)
+    """
+
+    def __init__(self, sma_periods, adjust, profile):
+        self.profile = profile
+        self.sma = {p: RollingMoments(p) for p in sma_periods}
+        self.bb = RollingMoments(20)
+        self.ema_12 = EWMean(12, adjust)
+        self.ema_26 = EWMean(26, adjust)
+        self.signal = EWMean(9, adjust)
+        self.avg_gain = RollingMoments(14)
+        self.avg_loss = RollingMoments(14)
+        self.prev_close = NAN
+
+        if profile == 'core':
+            self.ema_20 = EWMean(20, adjust)
+            self.ema_50 = EWMean(50, adjust)
+        else:
+            self.low_14 = RollingExtreme(14, 'min')
+            self.high_14 = RollingExtreme(14, 'max')
+            self.pct_d = RollingMoments(3)
+            self.tr = RollingMoments(14)
+            self.volume = RollingMoments(20)
+            self.closes = deque(maxlen=11)
+            self.resistance = RollingExtreme(20, 'max')
+            self.support = RollingExtreme(20, 'min')
+
+        self.bars = 0
+
+    @classmethod
+    def advanced(cls):
+        """מנוע שמקביל ל-calculate_advanced_indicators"""
+        return cls(sma_periods=(10, 20, 50, 200), adjust=True, profile='advanced')
+
+    @classmethod
+    def core(cls, ma_type):
+        """מנוע שמקביל ל-calculate_all_indicators(df, ma_type)"""
+        periods = [9, 20, 50] if "קצר" in ma_type else [100, 150, 200]
+        return cls(sma_periods=periods, adjust=False, profile='core')
+
+    def update(self, open_, high, low, close, volume):
+        """
+        מעדכן את כל האינדיקטורים בנר חדש (סגור) ומחזיר את ערכיהם
+
+        מחזיר:
+        -------
+        dict : {שם עמודה: ערך} - אותם שמות עמודות כמו בפונקציית ה-batch
+        """
+        self.bars += 1
+        row = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+
+        # ממוצעים נעים
+        for p, window in self.sma.items():
+            window.push(close)
+            row[f'SMA_{p}'] = window.get_mean()
+
+        # MACD
+        ema_12 = self.ema_12.push(close)
+        ema_26 = self.ema_26.push(close)
+        macd = ema_12 - ema_26
+        signal = self.signal.push(macd)
+        if self.profile == 'advanced':
+            row['EMA_12'] = ema_12
+            row['EMA_26'] = ema_26
+
+        # RSI (ממוצע פשוט של רווחים/הפסדים ב-14 נרות)
+        delta = close - self.prev_close
+        self.avg_gain.push(delta if delta > 0 else 0.0)
+        self.avg_loss.push(-delta if delta < 0 else 0.0)
+        avg_gain, avg_loss = self.avg_gain.get_mean(), self.avg_loss.get_mean()
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss != 0 else NAN
+
+        # Bollinger Bands
+        self.bb.push(close)
+        bb_mid = self.bb.get_mean()
+        bb_std = self.bb.get_std()
+
+        if self.profile == 'core':
+            row['RSI'] = min(max(rsi, 0.0), 100.0) if _valid(rsi) else 50.0
+            row['MACD'] = macd
+            row['MACD_Signal'] = signal
+            row['MACD_Histogram'] = macd - signal
+            row['BB_Mid'] = bb_mid
+            row['BB_Std'] = bb_std
+            row['BB_Upper'] = bb_mid + 2 * bb_std
+            row['BB_Lower'] = bb_mid - 2 * bb_std
+            row['BB_Width'] = (row['BB_Upper'] - row['BB_Lower']) / bb_mid
+            row['EMA_20'] = self.ema_20.push(close)
+            row['EMA_50'] = self.ema_50.push(close)
+        else:
+            row['MACD'] = macd
+            row['MACD_Signal'] = signal
+            row['MACD_Histogram'] = macd - signal
+            row['RSI'] = rsi if _valid(rsi) else 50.0
+
+            bb_std = bb_std if _valid(bb_std) else 0.0
+            row['BB_Middle'] = bb_mid
+            row['BB_Upper'] = bb_mid + bb_std * 2
+            row['BB_Lower'] = bb_mid - bb_std * 2
+            row['BB_Width'] = (row['BB_Upper'] - row['BB_Lower']) / bb_mid
+
+            # Stochastic
+            self.low_14.push(low)
+            self.high_14.push(high)
+            low_14, high_14 = self.low_14.get(), self.high_14.get()
+            rng = high_14 - low_14
+            pct_k = 100 * ((close - low_14) / rng) if rng != 0 else NAN
+            self.pct_d.push(pct_k)
+            row['%K'] = pct_k
+            row['%D'] = self.pct_d.get_mean()
+
+            # ATR - NaN (למשל High חסר, או הסגירה הקודמת בנר הראשון) מדולג כמו ב-batch
+            tr = _fmax(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.tr.push(tr)
+            row['ATR'] = self.tr.get_mean()
+
+            # נפח
+            self.volume.push(volume)
+            volume_sma = self.volume.get_mean()
+            row['Volume_SMA'] = volume_sma
+            ratio = volume / volume_sma if volume_sma != 0 else NAN
+            row['Volume_Ratio'] = ratio if _valid(ratio) else 1.0
+
+            # מומנטום
+            self.closes.append(close)
+            close_10 = self.closes[0] if len(self.closes) == 11 else NAN
+            row['Momentum'] = close - close_10
+            row['ROC'] = ((close - close_10) / close_10) * 100
+
+            # תמיכה והתנגדות
+            self.resistance.push(high)
+            self.support.push(low)
+            row['Resistance_20'] = self.resistance.get()
+            row['Support_20'] = self.support.get()
+
+        self.prev_close = close
+        return row
+
+    def update_frame(self, df):
+        """
+        מעדכן את המנוע בכל הנרות של DataFrame (לפי הסדר)
+
+        מחזיר:
+        -------
+        pandas.DataFrame : ערכי האינדיקטורים לכל נר שנוסף
+        """
+        columns = [df[c].to_numpy(dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        rows = [self.update(*bar) for bar in zip(*columns)]
+        return pd.DataFrame(rows, index=df.index)
+
+
+def compare_with_batch(df, engine, batch_df, rtol=1e-9, atol=1e-8):
+    """
+    מריץ את המנוע על df ומשווה לתוצאת פונקציית ה-batch
+
+    מחזיר:
+    -------
+    dict : {עמודה: הפרש מוחלט מקסימלי}; מעלה AssertionError אם יש חריגה מהסבילות
+    """
+    streamed = engine.update_frame(df)
+    diffs = {}
+    for col in streamed.columns:
+        if col not in batch_df.columns:
+            continue
+        a = streamed[col].to_numpy(dtype=np.float64)
+        b = batch_df[col].to_numpy(dtype=np.float64)
+        if not np.array_equal(np.isnan(a), np.isnan(b)):
+            raise AssertionError(f"{col}: מיקומי NaN שונים")
+        ok = ~np.isnan(a)
+        diffs[col] = float(np.max(np.abs(a[ok] - b[ok]))) if ok.any() else 0.0
+        if not np.allclose(a[ok], b[ok], rtol=rtol, atol=atol):
+            raise AssertionError(f"{col}: הפרש מקסימלי {diffs[col]:.3e}")
+    return diffs
@@ -0,0 +1,290 @@
+"""
+סריקת פרמטרים לציון הטכני (grid / חיפוש אקראי) עם בדיקה היסטורית לכל צירוף
+
+הפרמטרים הנסרקים הם ספי ה-RSI, סט תקופות ה-SMA (כמו ma_type: 9/20/50 או
+100/150/200 - המגמה נמדדת מול האחרונה), משקלי רכיבי הציון וספי הכניסה/יציאה.
+
+שימוש חוזר בחישובים:
+- האינדיקטורים מחושבים פעם אחת לכל סימול דרך גרף האינדיקטורים (memo משותף),
+  כולל כל תקופות ה-SMA שמופיעות בסריקה.
+- כיווני רכיבי הציון (score_components) מחושבים פעם אחת לכל צירוף של ספי RSI
+  ותקופת מגמה; הציון של כל צירופי המשקלים הוא מכפלת מטריצות אחת.
+- הסימולציה רצה על מטריצה של נרות x צירופים (core/backtest), ומנות של צירופים
+  מתחלקות בין תהליכים ב-ProcessPoolExecutor.
+
+הרצה:
+    python -m core.sweep --tickers AAPL --combos 1000 --out sweep.csv
+"""
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.backtest import _hold, simulate, summarize
+from core.data import sync_history
+from core.indicators import SCORE_WEIGHTS, RSI_OVERBOUGHT, RSI_OVERSOLD, score_components
+from core.registry import compute_indicators
+
+# מרחב החיפוש: {פרמטר: ערכים אפשריים}
+PARAM_SPACE = {
+    'rsi_low': [20, 25, 30, 35, 40],
+    'rsi_high': [60, 65, 70, 75, 80],
+    'sma_periods': ["9,20,50", "100,150,200", "20,50,100", "50,100,200"],
+    'w_rsi': [5, 10, 15, 20, 25],
+    'w_macd': [5, 10, 15, 20, 25],
+    'w_trend': [0, 5, 10, 15, 20],
+    'w_bb': [0, 5, 10],
+    'buy': [55, 60, 65, 70],
+    'sell': [30, 35, 40, 45],
+}
+
+# ברירות המחדל הנוכחיות (ma_type "קצר")
+DEFAULT_PARAMS = {
+    'rsi_low': RSI_OVERSOLD,
+    'rsi_high': RSI_OVERBOUGHT,
+    'sma_periods': "9,20,50",
+    'w_rsi': SCORE_WEIGHTS['rsi'],
+    'w_macd': SCORE_WEIGHTS['macd'],
+    'w_trend': SCORE_WEIGHTS['trend'],
+    'w_bb': SCORE_WEIGHTS['bb'],
+    'buy': 60,
+    'sell': 40,
+}
+
+COMPONENTS = ('rsi', 'macd', 'trend', 'bb')
+WEIGHT_COLUMNS = ['w_' + c for c in COMPONENTS]
+
+# צירופים לכל מנת עבודה ומספר תהליכים
+SWEEP_CHUNK = int(os.environ.get("STOCK_TRACKER_SWEEP_CHUNK", "250"))
+SWEEP_WORKERS = int(os.environ.get("STOCK_TRACKER_SWEEP_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _periods(value):
+    """'9,20,50' -> [9, 20, 50]"""
+    return [int(p) for p in str(value).split(',')]
+
+
+def grid(space=None, **fixed):
+    """
+    כל הצירופים של מרחב החיפוש (מכפלה קרטזית)
+
+    פרמטרים:
+    ----------
+    space : dict, optional
+        {פרמטר: ערכים}; פרמטרים חסרים מקבלים את ברירת המחדל שלהם
+    **fixed :
+        ערכים קבועים לפרמטרים (דורסים את space)
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל צירוף
+    """
+    space = {**{k: [v] for k, v in DEFAULT_PARAMS.items()}, **(space or {}),
+             **{k: [v] for k, v in fixed.items()}}
+    combos = pd.DataFrame(list(itertools.product(*space.values())), columns=list(space))
+    return _valid(combos)
+
+
+def random_search(n, space=None, seed=0):
+    """
+    n צירופים ייחודיים אקראיים ממרחב החיפוש
+
+    פרמטרים:
+    ----------
+    n : int
+        מספר הצירופים
+    space : dict, optional
+        {פרמטר: ערכים} (ברירת מחדל: PARAM_SPACE)
+    seed : int
+        seed למחולל האקראי
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל צירוף (ברירות המחדל תמיד כלולות בשורה הראשונה)
+    """
+    space = {**{k: [v] for k, v in DEFAULT_PARAMS.items()}, **(space or PARAM_SPACE)}
+    rng = np.random.default_rng(seed)
+
+    combos = pd.DataFrame([DEFAULT_PARAMS])
+    for _ in range(20):
+        if len(combos) >= n:
+            break
+        draw = pd.DataFrame({k: rng.choice(np.array(v, dtype=object), 2 * n) for k, v in space.items()})
+        combos = _valid(pd.concat([combos, draw], ignore_index=True).drop_duplicates())
+    return combos.head(n).reset_index(drop=True).astype({k: type(DEFAULT_PARAMS[k]) for k in DEFAULT_PARAMS})
+
+
+def _valid(combos):
+    """מסנן צירופים לא הגיוניים (סף תחתון מעל העליון)"""
+    ok = (combos['rsi_low'] < combos['rsi_high']) & (combos['sell'] < combos['buy'])
+    return combos[ok].reset_index(drop=True)
+
+
+def prepare(df, combos, memo=None):
+    """
+    מחשב פעם אחת את כל מה שהצירופים צריכים עבור סימול
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        נתוני מחיר של סימול
+    combos : pandas.DataFrame
+        הצירופים שיוערכו
+    memo : dict, optional
+        תוצאות ביניים של גרף האינדיקטורים (לשימוש חוזר בין קריאות)
+
+    מחזיר:
+    -------
+    tuple : (מחירי סגירה, {(rsi_low, rsi_high, sma_periods): מטריצת כיוונים נרות x 4})
+    """
+    trend_periods = sorted({_periods(p)[-1] for p in combos['sma_periods'].unique()})
+    columns = ['RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower'] + [f'SMA_{p}' for p in trend_periods]
+    ind = {'Close': df['Close'],
+           **compute_indicators(df, columns, profile='core', periods=trend_periods, memo=memo)}
+
+    components = {}
+    for key in combos[['rsi_low', 'rsi_high', 'sma_periods']].drop_duplicates().itertuples(index=False):
+        parts = score_components(ind, _periods(key.sma_periods), key.rsi_low, key.rsi_high)
+        components[tuple(key)] = np.column_stack([parts[c] for c in COMPONENTS])
+    return df['Close'].to_numpy(dtype=np.float64), components
+
+
+def evaluate(close, components, combos, cost_bps=5.0, slippage_bps=5.0):
+    """
+    ציון, איתותים, סימולציה ומדדים לכל הצירופים בבת אחת
+
+    פרמטרים:
+    ----------
+    close : numpy.ndarray
+        מחירי סגירה
+    components : dict
+        כפי שמוחזר מ-prepare
+    combos : pandas.DataFrame
+        הצירופים להערכה
+    cost_bps, slippage_bps : float
+        עלויות לכל שינוי פוזיציה
+
+    מחזיר:
+    -------
+    pandas.DataFrame : הצירופים עם מדדי הביצוע (summarize)
+    """
+    combos = combos.reset_index(drop=True)
+    score = np.empty((len(close), len(combos)), dtype=np.int64)
+    for key, idx in combos.groupby(['rsi_low', 'rsi_high', 'sma_periods']).indices.items():
+        weights = combos.loc[idx, WEIGHT_COLUMNS].to_numpy(dtype=np.int64).T
+        score[:, idx] = 50 + components[key] @ weights
+    score = np.clip(score, 0, 100)
+
+    target = _hold(score >= combos['buy'].to_numpy(), score <= combos['sell'].to_numpy())
+    sim = simulate(close[:, None], target, cost_bps, slippage_bps)
+    return pd.concat([combos, summarize(sim)], axis=1)
+
+
+def _evaluate_task(args):
+    return evaluate(*args)
+
+
+def run_sweep(frames, combos, cost_bps=5.0, slippage_bps=5.0, workers=None, chunk_size=None, out=None):
+    """
+    מריץ סריקת פרמטרים על סימול אחד או יותר
+
+    פרמטרים:
+    ----------
+    frames : dict
+        {סימול: DataFrame עם נתוני מחיר}
+    combos : pandas.DataFrame
+        צירופים (grid או random_search)
+    cost_bps, slippage_bps : float
+        עלויות לכל שינוי פוזיציה
+    workers : int, optional
+        מספר תהליכים (ברירת מחדל: SWEEP_WORKERS); 1 - בתהליך הנוכחי
+    chunk_size : int, optional
+        צירופים לכל מנת עבודה (ברירת מחדל: SWEEP_CHUNK)
+    out : str, optional
+        נתיב לשמירת הטבלה (.parquet או .csv)
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל (סימול, צירוף) עם הפרמטרים והמדדים
+    """
+    workers = SWEEP_WORKERS if workers is None else workers
+    chunk_size = chunk_size or SWEEP_CHUNK
+    combos = combos.reset_index(drop=True)
+    combos.insert(0, 'Combo', np.arange(len(combos)))
+
+    tasks, owners = [], []
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            continue
+        close, components = prepare(df, combos)
+        for start in range(0, len(combos), chunk_size):
+            tasks.append((close, components, combos.iloc[start:start + chunk_size], cost_bps, slippage_bps))
+            owners.append(ticker)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            parts = list(pool.map(_evaluate_task, tasks))
+    else:
+        parts = [_evaluate_task(task) for task in tasks]
+
+    if not parts:
+        return pd.DataFrame()
+    for ticker, part in zip(owners, parts):
+        part.insert(0, 'Ticker', ticker)
+    results = pd.concat(parts, ignore_index=True)
+
+    if out:
+        write_results(results, out)
+    return results
+
+
+def rank(results, objective='Sharpe'):
+    """
+    מדרג צירופים לפי ממוצע המדד על פני כל הסימולים
+
+    מחזיר:
+    -------
+    pandas.DataFrame : שורה לכל צירוף, מהטוב לגרוע
+    """
+    params = ['Combo'] + list(DEFAULT_PARAMS)
+    metrics = results.drop(columns=['Ticker']).groupby(params).mean().reset_index()
+    return metrics.sort_values(objective, ascending=False).reset_index(drop=True)
+
+
+def write_results(results, path):
+    """שומר את טבלת התוצאות לפי סיומת הקובץ (.parquet או .csv)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if str(path).endswith('.parquet'):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="סריקת פרמטרים לציון הטכני")
+    parser.add_argument('--tickers', nargs='+', default=["AAPL"])
+    parser.add_argument('--period', default="10y")
+    parser.add_argument('--combos', type=int, default=1000, help="מספר צירופים אקראיים (0 - grid מלא)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cost-bps', type=float, default=5.0)
+    parser.add_argument('--slippage-bps', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--objective', default='Sharpe')
+    parser.add_argument('--out', default="sweep.csv")
+    args = parser.parse_args()
+
+    combos = grid(PARAM_SPACE) if args.combos == 0 else random_search(args.combos, seed=args.seed)
+    frames = sync_history(args.tickers, args.period)
+    results = run_sweep(frames, combos, args.cost_bps, args.slippage_bps, workers=args.workers, out=args.out)
+    print(rank(results, args.objective).head(10).to_string())
+    print(f"\n{len(results)} שורות נשמרו ב-{args.out}")
+
+
+if __name__ == "__main__":
+    main()
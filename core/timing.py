@@ -0,0 +1,169 @@
+"""
+מדידת זמנים לפי שלבים בכל rerun של האפליקציה
+
+app.py פותח ריצה (begin_run) בתחילת הסקריפט; כל שלב - באפליקציה או במודולי
+core - נמדד עם stage() או עם הדקורטור timed(), והרשומות נאספות לריצה הפעילה.
+מחוץ לריצה (בנצ'מרקים, תהליכי pool, threads של רשת) המדידה לא נרשמת ועלותה
+זניחה.
+
+סטטוס cache: stage(..., cache='hit') קובע ערך התחלתי, ו-note(cache='miss')
+מעדכן את השלב הפנימי ביותר שפתוח - כך פונקציה עם st.cache_data מסמנת החטאה
+מתוך הגוף שלה (שרץ רק כשאין פגיעה).
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+from core.store import DATA_DIR
+
+# קובץ JSON Lines לרישום הזמנים (שורה לכל rerun)
+TIMING_LOG = os.environ.get("STOCK_TRACKER_TIMING_LOG", os.path.join(DATA_DIR, "timings.jsonl"))
+
+# רישום כל rerun ללוג (גם בלי חלונית הדיבאג)
+TIMING_JSON = os.environ.get("STOCK_TRACKER_TIMING_JSON") == "1"
+
+_current = ContextVar("timing_run", default=None)
+
+
+class Run:
+    """
+    הזמנים של rerun אחד
+
+    records הוא רשימה של dict לפי סדר הסיום: stage, ms, depth, start_ms
+    ושדות נוספים (cache ...).
+    """
+
+    def __init__(self, name="rerun"):
+        self.name = name
+        self.started = datetime.now()
+        self.records = []
+        self._t0 = time.perf_counter()
+        self._stack = []
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def summary(self):
+        """
+        טבלת סיכום לפי שלב
+
+        מחזיר:
+        -------
+        pandas.DataFrame : stage, calls, total_ms, max_ms, hits, misses (לפי סדר ההופעה)
+        """
+        if not self.records:
+            return pd.DataFrame(columns=['stage', 'calls', 'total_ms', 'max_ms', 'hits', 'misses'])
+        df = pd.DataFrame(self.records)
+        cache = df['cache'] if 'cache' in df else pd.Series(None, index=df.index, dtype=object)
+        df = df.assign(hits=cache.eq('hit'), misses=cache.eq('miss'), order=df['start_ms'])
+        out = df.groupby('stage', sort=False).agg(
+            calls=('ms', 'size'), total_ms=('ms', 'sum'), max_ms=('ms', 'max'),
+            hits=('hits', 'sum'), misses=('misses', 'sum'), order=('order', 'min'), depth=('depth', 'min'),
+        )
+        return out.sort_values('order').drop(columns='order').reset_index()
+
+    def to_dict(self):
+        return {
+            'run': self.name,
+            'started': self.started.isoformat(timespec='milliseconds'),
+            'total_ms': round(self.elapsed_ms(), 3),
+            'stages': self.records,
+        }
+
+
+def begin_run(name="rerun"):
+    """פותח ריצה חדשה בהקשר הנוכחי ומחזיר אותה"""
+    run = Run(name)
+    _current.set(run)
+    return run
+
+
+def current_run():
+    """הריצה הפעילה בהקשר הנוכחי (או None)"""
+    return _current.get()
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    מודד את זמן הבלוק ורושם אותו בריצה הפעילה
+
+    פרמטרים:
+    ----------
+    name : str
+        שם השלב (למשל 'data.load_stock_data')
+    **fields :
+        שדות נוספים לרשומה (למשל cache='hit')
+
+    מחזיר:
+    -------
+    dict : הרשומה (ניתנת לעדכון בתוך הבלוק), או None כשאין ריצה פעילה
+    """
+    run = _current.get()
+    if run is None:
+        yield None
+        return
+
+    record = {'stage': name, **fields}
+    run._stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        end = time.perf_counter()
+        run._stack.pop()
+        record.update(
+            ms=round((end - start) * 1000, 3),
+            start_ms=round((start - run._t0) * 1000, 3),
+            depth=len(run._stack),
+        )
+        run.records.append(record)
+
+
+def timed(name):
+    """דקורטור: כל קריאה לפונקציה נמדדת כשלב בשם name"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def note(**fields):
+    """מעדכן את השלב הפנימי ביותר שפתוח בריצה הפעילה (למשל cache='miss')"""
+    run = _current.get()
+    if run is not None and run._stack:
+        run._stack[-1].update(fields)
+
+
+def write_json(run, path=None):
+    """
+    מוסיף את הריצה כשורת JSON לקובץ הלוג
+
+    פרמטרים:
+    ----------
+    run : Run
+        הריצה לרישום
+    path : str, optional
+        נתיב הקובץ (ברירת מחדל: TIMING_LOG)
+
+    מחזיר:
+    -------
+    str : נתיב הקובץ
+    """
+    path = path or TIMING_LOG
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run.to_dict(), ensure_ascii=False, default=str) + "\n")
+    return path
@@ -0,0 +1,192 @@
+"""
+שערוך התיק: ערכים לכל עסקה (lot) ואגרגציה לכל סימול במעבר אחד
+
+הסימולים של כל העסקאות מקודדים פעם אחת (pd.factorize); המחיר העדכני של
+כל סימול נבחר מווקטור מחירים אחד לפי הקוד, והסכומים לכל סימול מחושבים
+ב-np.bincount - ללא לולאה על עסקאות או על סימולים.
+
+עמודות:
+- לכל עסקה: CurrentPrice, Invested, CurrentValue, P&L ($), P&L (%)
+- לכל סימול: Lots, Shares, AvgCost (ממוצע משוקלל לפי מניות), Invested,
+  CurrentPrice, CurrentValue, P&L ($), P&L (%), Weight (משקל משווי התיק)
+
+עקומת ההון ההיסטורית (equity_curve) משלבת את תאריכי העסקאות והכמויות עם פאנל
+מחירי סגירה (נרות x סימולים): שינויי הפוזיציה מפוזרים למטריצה ומצטברים
+(cumsum), והשווי היומי הוא מכפלה במטריצת המחירים - ללא לולאה על ימים.
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.timing import timed
+
+EQUITY_COLUMNS = ['Equity', 'Invested', 'P&L ($)', 'Return Index', 'Drawdown']
+LOT_COLUMNS = ['CurrentPrice', 'Invested', 'CurrentValue', 'P&L ($)', 'P&L (%)']
+POSITION_COLUMNS = ['Lots', 'Shares', 'AvgCost', 'Invested', 'CurrentPrice',
+                    'CurrentValue', 'P&L ($)', 'P&L (%)', 'Weight']
+
+
+def price_vector(tickers, prices):
+    """
+    מחירים עדכניים כמערך לפי סדר הסימולים
+
+    פרמטרים:
+    ----------
+    tickers : array-like
+        הסימולים
+    prices : dict או pandas.Series
+        {סימול: מחיר}; סימול חסר מקבל NaN
+
+    מחזיר:
+    -------
+    numpy.ndarray : float64
+    """
+    prices = pd.Series(prices, dtype=np.float64)
+    return prices.reindex(pd.Index(tickers, dtype=object)).to_numpy(dtype=np.float64)
+
+
+def _pct(pnl, invested):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(invested != 0, pnl / invested * 100, np.nan)
+
+
+@timed('valuation.valuate')
+def valuate(portfolio, prices):
+    """
+    שערוך כל העסקאות ואגרגציה לכל סימול
+
+    פרמטרים:
+    ----------
+    portfolio : pandas.DataFrame
+        עסקאות עם Ticker, EntryPrice, Shares (למשל TradeLedger.to_frame())
+    prices : dict או pandas.Series
+        מחיר עדכני לכל סימול (למשל latest_prices)
+
+    מחזיר:
+    -------
+    tuple : (DataFrame לכל עסקה - portfolio + LOT_COLUMNS,
+             DataFrame לכל סימול לפי סדר ההופעה - POSITION_COLUMNS)
+    """
+    codes, tickers = pd.factorize(portfolio['Ticker'].to_numpy(dtype=object))
+    k = len(tickers)
+    entry = portfolio['EntryPrice'].to_numpy(dtype=np.float64)
+    shares = portfolio['Shares'].to_numpy(dtype=np.float64)
+    is_integer = pd.api.types.is_integer_dtype(portfolio['Shares'].dtype)
+
+    ticker_price = price_vector(tickers, prices)
+    current = ticker_price[codes] if len(codes) else np.empty(0)
+    invested = entry * shares
+    value = current * shares
+    pnl = value - invested
+
+    lots = portfolio.assign(**{
+        'CurrentPrice': current,
+        'Invested': invested,
+        'CurrentValue': value,
+        'P&L ($)': pnl,
+        'P&L (%)': _pct(pnl, invested),
+    })
+
+    total_shares = np.bincount(codes, weights=shares, minlength=k)
+    total_invested = np.bincount(codes, weights=invested, minlength=k)
+    total_value = total_shares * ticker_price
+    total_pnl = total_value - total_invested
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_cost = np.where(total_shares != 0, total_invested / total_shares, np.nan)
+        portfolio_value = np.nansum(total_value)
+        weight = total_value / portfolio_value if portfolio_value else np.full(k, np.nan)
+
+    positions = pd.DataFrame({
+        'Lots': np.bincount(codes, minlength=k),
+        'Shares': total_shares.astype(np.int64) if is_integer else total_shares,
+        'AvgCost': avg_cost,
+        'Invested': total_invested,
+        'CurrentPrice': ticker_price,
+        'CurrentValue': total_value,
+        'P&L ($)': total_pnl,
+        'P&L (%)': _pct(total_pnl, total_invested),
+        'Weight': weight,
+    }, index=pd.Index(tickers, name='Ticker'))
+    return lots, positions
+
+
+def totals(positions):
+    """
+    סיכום התיק מטבלת הסימולים (סימולים ללא מחיר לא נספרים)
+
+    מחזיר:
+    -------
+    dict : Invested, CurrentValue, P&L ($), P&L (%)
+    """
+    priced = positions[positions['CurrentPrice'].notna()]
+    invested = float(priced['Invested'].sum())
+    value = float(priced['CurrentValue'].sum())
+    pnl = value - invested
+    return {
+        'Invested': invested,
+        'CurrentValue': value,
+        'P&L ($)': pnl,
+        'P&L (%)': pnl / invested * 100 if invested > 0 else 0.0,
+    }
+
+
+@timed('valuation.equity_curve')
+def equity_curve(portfolio, close):
+    """
+    עקומת הון יומית של התיק מאז העסקה הראשונה
+
+    פרמטרים:
+    ----------
+    portfolio : pandas.DataFrame
+        עסקאות עם Ticker, EntryPrice, Shares, Date
+    close : pandas.DataFrame
+        פאנל מחירי סגירה (תאריכים x סימולים), למשל core.data.load_close_panel
+
+    מחזיר:
+    -------
+    pandas.DataFrame : לכל יום מסחר -
+        Equity (שווי שוק), Invested (הון מושקע מצטבר), P&L ($),
+        Return Index (תשואה משוקללת-זמן שמנטרלת הפקדות, 1 = התחלה)
+        ו-Drawdown (ירידה מהשיא של Return Index)
+    """
+    close = close.sort_index()
+    index = close.index
+    known = portfolio['Ticker'].isin(close.columns).to_numpy()
+    trades = portfolio[known]
+    if trades.empty or index.empty:
+        return pd.DataFrame(columns=EQUITY_COLUMNS, index=index[:0], dtype=np.float64)
+
+    # שורת היום שבו כל עסקה נכנסת לתוקף (עסקה לפני תחילת הפאנל - מהשורה הראשונה)
+    dates = pd.DatetimeIndex(trades['Date']).normalize()
+    if index.tz is not None and dates.tz is None:
+        dates = dates.tz_localize(index.tz)
+    rows = np.minimum(index.searchsorted(dates, side='left'), len(index) - 1)
+    cols = close.columns.get_indexer(trades['Ticker'])
+    shares = trades['Shares'].to_numpy(dtype=np.float64)
+    cost = trades['EntryPrice'].to_numpy(dtype=np.float64) * shares
+
+    # כמויות מוחזקות: שינויים מפוזרים למטריצה ומצטברים לאורך הזמן
+    held = np.zeros(close.shape)
+    np.add.at(held, (rows, cols), shares)
+    np.cumsum(held, axis=0, out=held)
+
+    prices = close.ffill().to_numpy(dtype=np.float64)
+    equity = np.nansum(held * prices, axis=1)
+    flows = np.bincount(rows, weights=cost, minlength=len(index))
+    invested = np.cumsum(flows)
+
+    # תשואה יומית ללא ההפקדות של אותו יום: (V_t - F_t) / V_{t-1} - 1
+    prev = np.concatenate([[np.nan], equity[:-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(prev > 0, (equity - flows) / prev - 1, 0.0)
+    ret_index = np.cumprod(1 + daily)
+    drawdown = ret_index / np.maximum.accumulate(ret_index) - 1
+
+    curve = pd.DataFrame({
+        'Equity': equity,
+        'Invested': invested,
+        'P&L ($)': equity - invested,
+        'Return Index': ret_index,
+        'Drawdown': drawdown,
+    }, index=index)
+    return curve.iloc[rows.min():]
@@ -0,0 +1,12 @@
+"""
+הבדיקות רצות על מאגר נתונים זמני ועל ספק ה-replay (ללא רשת)
+
+משתני הסביבה נקבעים כאן, לפני שמודול כלשהו של core נטען (core/store קורא
+את STOCK_TRACKER_DATA_DIR בטעינה).
+"""
+
+import os
+import tempfile
+
+os.environ["STOCK_TRACKER_DATA_DIR"] = tempfile.mkdtemp(prefix="test_data_")
+os.environ["STOCK_TRACKER_PROVIDER"] = "replay"
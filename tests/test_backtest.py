@@ -0,0 +1,31 @@
+"""
+תוצאות הבדיקה ההיסטורית של סימול לא תלויות בסימולים האחרים בהרצה
+"""
+
+import pandas as pd
+import pytest
+
+from core.backtest import run_backtest
+from core.providers import synthetic_ohlcv
+
+SUNDAY_WEEK = pd.offsets.CustomBusinessDay(weekmask='Sun Mon Tue Wed Thu')
+
+
+@pytest.mark.parametrize('rule', ['score', 'recommendations'])
+def test_other_calendar_does_not_change_metrics(rule):
+    a = synthetic_ohlcv(750, seed=1)
+    alone, equity_alone = run_backtest({'A': a}, rule)
+    mixed, equity_mixed = run_backtest({'A': a, 'TA': synthetic_ohlcv(750, seed=2, freq=SUNDAY_WEEK)}, rule)
+
+    pd.testing.assert_series_equal(alone.loc['A'], mixed.loc['A'])
+    pd.testing.assert_series_equal(equity_alone['A'], equity_mixed['A'].dropna(), check_freq=False)
+    assert len(equity_mixed) > len(equity_alone)
+
+
+def test_longer_history_does_not_change_metrics():
+    a = synthetic_ohlcv(750, seed=1).iloc[-400:]
+    alone, _ = run_backtest({'A': a})
+    mixed, equity = run_backtest({'A': a, 'L': synthetic_ohlcv(750, seed=3)})
+
+    pd.testing.assert_series_equal(alone.loc['A'], mixed.loc['A'])
+    assert equity['A'].first_valid_index() == a.index[0]
@@ -0,0 +1,133 @@
+"""
+כפתורי ההורדה עם data=callable עוברים את מסלול ההמרה של Streamlit
+
+Streamlit מריץ את ה-callable בלחיצה (MediaFileManager.execute_deferred) וממיר
+את התוצאה ל-bytes ב-convert_data_to_bytes_and_infer_mime. הבדיקות מריצות את
+אותו מסלול על פונקציות הייצוא ועל כל כפתורי ההורדה באפליקציה, וגם על קובץ
+Excel שנמחק לפני הלחיצה.
+"""
+
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from core.providers import synthetic_ohlcv
+from utils.export import (EXPORT_DIR, EXPORT_MAX_AGE, EXPORT_TTL, csv_bytes, submit_workbook, to_arrow_ipc,
+                          to_parquet)
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def download(manager, file_id):
+    """מריץ את ה-callable כמו בלחיצה ומחזיר את ה-bytes שנשמרו להורדה"""
+    url = manager.execute_deferred(file_id)
+    return manager._storage.get_file(url.rsplit('/', 1)[-1]).content
+
+
+@pytest.fixture
+def manager():
+    return MediaFileManager(MemoryMediaFileStorage("/media"))
+
+
+def test_csv_bytes_deferred(manager):
+    df = synthetic_ohlcv(25, seed=1).rename(columns={'Close': 'סגירה'})
+    file_id = manager.add_deferred(lambda: csv_bytes(df, chunk=7, index=True), "text/csv", "csv")
+    data = download(manager, file_id)
+    assert data == '\ufeff'.encode('utf-8') + df.to_csv().encode('utf-8')
+
+
+def test_binary_exports_deferred(manager):
+    df = synthetic_ohlcv(25, seed=2)
+    parquet = download(manager, manager.add_deferred(lambda: to_parquet(df), None, "parquet"))
+    arrow = download(manager, manager.add_deferred(lambda: to_arrow_ipc(df), None, "arrow"))
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(parquet)), df, check_freq=False)
+    pd.testing.assert_frame_equal(pd.read_feather(io.BytesIO(arrow)), df, check_freq=False)
+
+
+@pytest.fixture
+def deferred(monkeypatch):
+    """{file_id: MediaFileManager} לכל callable שהאפליקציה רושמת"""
+    managers = {}
+    add_deferred = MediaFileManager.add_deferred
+
+    def record(self, *args, **kwargs):
+        file_id = add_deferred(self, *args, **kwargs)
+        managers[file_id] = self
+        return file_id
+
+    monkeypatch.setattr(MediaFileManager, "add_deferred", record)
+    return managers
+
+
+def portfolio_app():
+    """האפליקציה עם שתי עסקאות וקובץ Excel מוכן להורדה"""
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    for ticker in ("AAPL", "MSFT"):
+        at.text_input[0].set_value(ticker)
+        at.run()
+        at.button(key="add_position").click()
+        at.run()
+    at.button(key="excel_export_start").click()
+    at.run()
+    at.session_state["excel_export"].result(timeout=60)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def download_buttons(at):
+    return {b.proto.label: b.proto.deferred_file_id for b in at.get("download_button")}
+
+
+def test_app_download_buttons(deferred):
+    at = portfolio_app()
+    buttons = download_buttons(at)
+    assert {"📥 הורד CSV", "⬇️ CSV", "📊 הורד Excel"} <= set(buttons)
+    for label, file_id in buttons.items():
+        assert download(deferred[file_id], file_id), label
+
+    csv = download(deferred[buttons["📥 הורד CSV"]], buttons["📥 הורד CSV"])
+    trades = pd.read_csv(io.BytesIO(csv), encoding='utf-8-sig')
+    assert len(trades) == 2
+
+
+def test_deleted_excel_export(deferred):
+    at = portfolio_app()
+    file_id = download_buttons(at)["📊 הורד Excel"]
+    os.remove(at.session_state["excel_export"].result())
+
+    # הלחיצה לא נכשלת, וה-rerun שאחריה מציע להכין את הקובץ מחדש
+    assert download(deferred[file_id], file_id) == b""
+    at.run()
+    assert not at.exception
+    assert "excel_export" not in at.session_state
+    assert "📊 הורד Excel" not in download_buttons(at)
+    assert at.button(key="excel_export_start")
+
+
+def test_submit_keeps_other_sessions_exports():
+    def export_file(name, age):
+        path = os.path.join(EXPORT_DIR, name)
+        with open(path, 'wb') as f:
+            f.write(b"x")
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    own_old = export_file("portfolio_aaaa_old.xlsx", EXPORT_TTL + 60)
+    other_old = export_file("portfolio_bbbb_old.xlsx", EXPORT_TTL + 60)
+    other_expired = export_file("portfolio_bbbb_expired.xlsx", EXPORT_MAX_AGE + 60)
+
+    path = submit_workbook([("Sheet", pd.DataFrame({'a': [1]}))], prefix="portfolio_aaaa_").result(timeout=60)
+    assert os.path.exists(path)
+    assert not os.path.exists(own_old)
+    assert os.path.exists(other_old)
+    assert not os.path.exists(other_expired)
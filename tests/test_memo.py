@@ -0,0 +1,35 @@
+"""
+מפתח ה-cache של האינדיקטורים מזהה שינוי בנרות קודמים (התאמה לפיצול/דיבידנד)
+"""
+
+from core.memo import LRUCache, _frame_key, get_advanced_indicators, indicator_cache
+from core.providers import synthetic_ohlcv
+
+
+def test_frame_key_same_prices():
+    df = synthetic_ohlcv(300, seed=1)
+    assert _frame_key('A', df) == _frame_key('A', df.copy())
+
+
+def test_readjusted_history_misses():
+    indicator_cache.clear()
+    df = synthetic_ohlcv(300, seed=1)
+    get_advanced_indicators('A', df)
+
+    # פיצול 1:2 שמותאם לאחור: כל הנרות שלפני הנר האחרון משתנים, והנר האחרון,
+    # מספר הנרות ומחיר הסגירה האחרון נשארים
+    readjusted = df.copy()
+    readjusted.iloc[:-1, readjusted.columns.get_indexer(['Open', 'High', 'Low', 'Close'])] *= 0.5
+    assert readjusted.index[-1] == df.index[-1] and readjusted['Close'].iloc[-1] == df['Close'].iloc[-1]
+
+    result = get_advanced_indicators('A', readjusted)
+    assert indicator_cache.stats()['misses'] == 2
+    assert result['SMA_20'].iloc[-2] != get_advanced_indicators('A', df)['SMA_20'].iloc[-2]
+
+
+def test_lru_hit_on_unchanged_frame():
+    cache = LRUCache(maxsize=4)
+    df = synthetic_ohlcv(50, seed=2)
+    cache.get_or_compute(_frame_key('A', df), lambda: 1)
+    assert cache.get_or_compute(_frame_key('A', df.copy()), lambda: 2) == 1
+    assert cache.stats()['hits'] == 1
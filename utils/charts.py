@@ -0,0 +1,86 @@
+"""
+בניית גרפי Plotly עם הקטנת נקודות (core/downsample) לפני השליחה לדפדפן
+
+גרף הנרות מוגבל ל-CHART_MAX_BARS נרות בטווח המוצג (איחוד OHLC), וקווי
+הממוצעים ל-CHART_MAX_POINTS נקודות (LTTB) המצוירות ב-WebGL (Scattergl).
+"""
+
+import os
+
+import plotly.graph_objects as go
+
+from core.downsample import ohlc_buckets, reduce_line
+
+# מספר הנרות המקסימלי בגרף (ברירת מחדל: ~2 פיקסלים לנר ברוחב מסך רגיל)
+CHART_MAX_BARS = int(os.environ.get("STOCK_TRACKER_CHART_MAX_BARS", "600"))
+
+# מספר הנקודות המקסימלי לכל קו
+CHART_MAX_POINTS = int(os.environ.get("STOCK_TRACKER_CHART_MAX_POINTS", "1200"))
+
+# קווי הממוצעים שמעל הנרות: (עמודה, אורך החלון, צבע)
+OVERLAYS = (
+    ('SMA_20', 20, 'orange'),
+    ('SMA_50', 50, 'purple'),
+)
+
+
+def candlestick_figure(df, title, max_bars=None, max_points=None, webgl=True, bar_label="ימים"):
+    """
+    גרף נרות עם קווי ממוצעים נעים
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        הטווח המוצג - OHLC ועמודות OVERLAYS (מחושבות על כל ההיסטוריה)
+    title : str
+        כותרת הגרף
+    max_bars : int, optional
+        מספר הנרות המקסימלי (ברירת מחדל: CHART_MAX_BARS; 0 - ללא הקטנה)
+    max_points : int, optional
+        מספר הנקודות המקסימלי לכל קו (ברירת מחדל: CHART_MAX_POINTS; 0 - ללא הקטנה)
+    webgl : bool
+        ציור הקווים ב-Scattergl במקום Scatter (SVG)
+    bar_label : str
+        יחידת החלון בשם הממוצע ("ימים", או "נרות" בנרות תוך-יומיים)
+
+    מחזיר:
+    -------
+    plotly.graph_objects.Figure
+    """
+    max_bars = CHART_MAX_BARS if max_bars is None else max_bars
+    max_points = CHART_MAX_POINTS if max_points is None else max_points
+
+    candles = ohlc_buckets(df, max_bars) if max_bars else df
+    if len(candles) < len(df):
+        title = f"{title} (כל נר מאחד עד {-(-len(df) // len(candles))} נרות)"
+
+    fig = go.Figure(data=[go.Candlestick(
+        x=candles.index,
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name='מחיר'
+    )])
+
+    line_trace = go.Scattergl if webgl else go.Scatter
+    for column, window, color in OVERLAYS:
+        if column not in df.columns:
+            continue
+        line = reduce_line(df[column], max_points) if max_points else df[column]
+        fig.add_trace(line_trace(
+            x=line.index,
+            y=line.to_numpy(),
+            name=f"ממוצע {window} {bar_label}",
+            line=dict(color=color, width=1)
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="תאריך",
+        yaxis_title="מחיר (USD)",
+        template="plotly_white",
+        height=600,
+        xaxis_rangeslider_visible=True
+    )
+    return fig
@@ -1,29 +1,224 @@
 """
 מודול ליצוא נתונים לפורמטים שונים
+
+קובצי Excel נכתבים במצב write-only של openpyxl: כל גיליון נכתב בזרם, במנות
+של EXCEL_CHUNK שורות, ולא נבנה כעץ תאים בזיכרון. הגיליונות מגיעים מ-iterable
+(אפשר generator), כך שרק מנה אחת של גיליון אחד נמצאת בזיכרון בכל רגע. ייצוא
+גדול רץ ב-thread רקע (submit_workbook) ונכתב לקובץ זמני, כדי לא לחסום את ה-rerun.
+
+Parquet ו-Arrow IPC (Feather v2) נכתבים מטבלת Arrow שנבנית ישירות מה-DataFrame
+(ללא reset_index/copy; עמודות מספריות מועברות בלי העתקה), כך שמחברות ניתוח
+טוענות אותם ב-pd.read_parquet / pd.read_feather במקום לפרסר CSV. CSV נוצר
+כ-generator של מנות bytes (iter_csv), ולכפתור ההורדה מחובר ל-bytes (csv_bytes).
 """
 
 import io
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from core.store import DATA_DIR
+from core.valuation import valuate
+
+# מספר השורות שמומרות לערכי Python בכל מנה
+EXCEL_CHUNK = int(os.environ.get("STOCK_TRACKER_EXCEL_CHUNK", "10000"))
+
+# מספר השורות בכל מנת CSV
+CSV_CHUNK = int(os.environ.get("STOCK_TRACKER_CSV_CHUNK", "10000"))
+
+# תיקיית קובצי הייצוא הזמניים
+EXPORT_DIR = os.path.join(DATA_DIR, "exports")
+
+# קובצי ייצוא קודמים עם אותה קידומת (אותו סשן) ישנים מזה (שניות) נמחקים בייצוא הבא
+EXPORT_TTL = 3600
+
+# קובצי ייצוא של סשנים אחרים (כנראה סגורים) נמחקים רק אחרי זמן זה (שניות)
+EXPORT_MAX_AGE = 24 * 3600
+
+# תווים שאסורים בשם גיליון Excel
+_INVALID_SHEET_CHARS = re.compile(r"[\\/*?:\[\]]")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """thread יחיד לייצוא (נוצר בקריאה הראשונה) - ייצוא אחד בכל פעם"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        return _executor
+
+
+def sheet_title(name, used=()):
+    """שם גיליון חוקי (עד 31 תווים, ללא תווים אסורים) ושונה מהשמות ב-used"""
+    base = _INVALID_SHEET_CHARS.sub("_", str(name))[:31] or "Sheet"
+    title, i = base, 1
+    while title in used:
+        suffix = f"_{i}"
+        title, i = base[:31 - len(suffix)] + suffix, i + 1
+    return title
+
+
+def _cell_values(series):
+    """עמודה כמערך ערכי Python ש-openpyxl כותב (NaN/NaT -> תא ריק, ללא אזור זמן)"""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)
+    values = series.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values
+
+
+def iter_rows(df, chunk=None):
+    """
+    שורות DataFrame (כולל כותרת) כרשימות ערכים, מומרות במנות
+
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        הטבלה (האינדקס לא נכתב - יש לאפס אותו לפני כן אם הוא נדרש)
+    chunk : int, optional
+        שורות בכל מנה (ברירת מחדל: EXCEL_CHUNK)
+
+    מחזיר:
+    -------
+    generator : רשימה לכל שורה
+    """
+    chunk = chunk or EXCEL_CHUNK
+    yield [str(c) for c in df.columns]
+    for start in range(0, len(df), chunk):
+        part = df.iloc[start:start + chunk]
+        columns = [_cell_values(part[c]) for c in part.columns]
+        yield from map(list, zip(*columns))
+
+
+def write_workbook(sheets, target):
+    """
+    כותב חוברת Excel בזרם (openpyxl write-only)
+
+    פרמטרים:
+    ----------
+    sheets : iterable
+        זוגות (שם גיליון, DataFrame); נצרך פעם אחת, לפי הסדר
+    target : str או file-like
+        נתיב או buffer בינארי לכתיבה
+
+    מחזיר:
+    -------
+    str או file-like : target
+    """
+    wb = Workbook(write_only=True)
+    used = set()
+    for name, df in sheets:
+        title = sheet_title(name, used)
+        used.add(title)
+        ws = wb.create_sheet(title=title)
+        for row in iter_rows(df):
+            ws.append(row)
+    if not used:
+        wb.create_sheet(title="Sheet")
+    wb.save(target)
+    return target
+
+
+def portfolio_sheets(trades, lots=None, positions=None, indicators=()):
+    """
+    הגיליונות של קובץ התיק: עסקאות, שערוך לכל עסקה, פוזיציות ואינדיקטורים
+
+    פרמטרים:
+    ----------
+    trades : pandas.DataFrame
+        יומן העסקאות (TradeLedger.export_frame)
+    lots, positions : pandas.DataFrame, optional
+        תוצאות core.valuation.valuate
+    indicators : iterable
+        זוגות (סימול, DataFrame אינדיקטורים לפי תאריך) - נצרכים אחד-אחד
+
+    מחזיר:
+    -------
+    generator : זוגות (שם גיליון, DataFrame)
+    """
+    yield 'Trades', trades
+    if lots is not None:
+        yield 'Valuation', lots
+    if positions is not None:
+        yield 'Positions', positions.reset_index()
+    for ticker, df in indicators:
+        yield ticker, df.rename_axis(df.index.name or 'Date').reset_index()
+
+
+def submit_workbook(sheets, prefix="export_"):
+    """
+    כותב חוברת ב-thread הרקע לקובץ זמני ב-EXPORT_DIR
+
+    פרמטרים:
+    ----------
+    sheets : iterable
+        כמו ב-write_workbook (generator נצרך בתוך ה-thread)
+    prefix : str
+        קידומת שם הקובץ - ייחודית לכל סשן, כדי שהניקוי לא ימחק קובץ שסשן
+        אחר עוד מציע להורדה
+
+    מחזיר:
+    -------
+    concurrent.futures.Future : תוצאה - נתיב הקובץ
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    now = time.time()
+    for entry in os.scandir(EXPORT_DIR):
+        if not entry.is_file():
+            continue
+        max_age = EXPORT_TTL if entry.name.startswith(prefix) else EXPORT_MAX_AGE
+        if entry.stat().st_mtime < now - max_age:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=".xlsx", dir=EXPORT_DIR)
+    os.close(fd)
+    return _get_executor().submit(write_workbook, sheets, path)
+
+
+def read_export(path):
+    """
+    תוכן קובץ ייצוא שהוכן ברקע (לכפתור ההורדה)
+
+    מחזיר:
+    -------
+    bytes : תוכן הקובץ, או b"" אם הוא כבר נמחק
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
 
-def to_excel(df):
+
+def to_excel(df, sheet_name='Portfolio'):
     """
-    ממיר DataFrame לקובץ Excel
+    ממיר DataFrame לקובץ Excel (כתיבה בזרם)
     
     פרמטרים:
     ----------
     df : pandas.DataFrame
         DataFrame לייצוא
+    sheet_name : str
+        שם הגיליון
     
     מחזיר:
     -------
     BytesIO : buffer עם קובץ Excel
     """
-    buffer = io.BytesIO()
-    
-    # יצירת Excel writer
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Portfolio')
-    
+    buffer = write_workbook([(sheet_name, df)], io.BytesIO())
     buffer.seek(0)
     return buffer
 
@@ -44,6 +239,117 @@ def to_csv(df):
     return df.to_csv(index=False, encoding='utf-8-sig')
 
 
+def iter_csv(df, chunk=None, index=False):
+    """
+    CSV כ-generator של מנות bytes (UTF-8 עם BOM, כדי ש-Excel יזהה עברית)
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        DataFrame לייצוא
+    chunk : int, optional
+        שורות בכל מנה (ברירת מחדל: CSV_CHUNK)
+    index : bool
+        האם לכתוב את האינדקס
+    
+    מחזיר:
+    -------
+    generator : bytes לכל מנה; הראשונה כוללת את ה-BOM והכותרת
+    """
+    chunk = chunk or CSV_CHUNK
+    yield '\ufeff'.encode('utf-8')
+    if df.empty:
+        yield df.to_csv(index=index).encode('utf-8')
+        return
+    for start in range(0, len(df), chunk):
+        part = df.iloc[start:start + chunk]
+        yield part.to_csv(index=index, header=start == 0).encode('utf-8')
+
+
+def csv_bytes(df, chunk=None, index=False):
+    """
+    CSV כ-bytes לכפתור ההורדה, מחוברים ממנות iter_csv
+
+    Streamlit ממיר כל תוצאה של data=callable ל-bytes בזיכרון (וקורא ל-seek(0)
+    על קבצים), ולכן הכפתור מקבל bytes ולא זרם.
+
+    מחזיר:
+    -------
+    bytes : UTF-8 עם BOM
+    """
+    return b"".join(iter_csv(df, chunk, index))
+
+
+def to_arrow(df, index=True):
+    """
+    DataFrame כטבלת Arrow
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        DataFrame לייצוא
+    index : bool
+        האם לשמור את האינדקס (למשל תאריכי האינדיקטורים) כעמודה
+    
+    מחזיר:
+    -------
+    pyarrow.Table : עמודות מספריות משתמשות באותו זיכרון כמו ה-DataFrame
+    """
+    return pa.Table.from_pandas(df, preserve_index=index)
+
+
+def to_parquet(df, target=None, index=True, compression='zstd'):
+    """
+    כותב DataFrame כ-Parquet
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        DataFrame לייצוא
+    target : str או file-like, optional
+        נתיב או buffer בינארי (ברירת מחדל: BytesIO חדש)
+    index : bool
+        האם לשמור את האינדקס
+    compression : str
+        דחיסה (zstd, snappy, none ...)
+    
+    מחזיר:
+    -------
+    str או BytesIO : target (buffer מוחזר בתחילתו)
+    """
+    target = io.BytesIO() if target is None else target
+    pq.write_table(to_arrow(df, index), target, compression=compression)
+    if hasattr(target, 'seek'):
+        target.seek(0)
+    return target
+
+
+def to_arrow_ipc(df, target=None, index=True):
+    """
+    כותב DataFrame כקובץ Arrow IPC (Feather v2, ללא דחיסה - ניתן למיפוי זיכרון)
+    
+    פרמטרים:
+    ----------
+    df : pandas.DataFrame
+        DataFrame לייצוא
+    target : str או file-like, optional
+        נתיב או buffer בינארי (ברירת מחדל: BytesIO חדש)
+    index : bool
+        האם לשמור את האינדקס
+    
+    מחזיר:
+    -------
+    str או BytesIO : target (buffer מוחזר בתחילתו)
+    """
+    target = io.BytesIO() if target is None else target
+    table = to_arrow(df, index)
+    with pa.ipc.new_file(target, table.schema) as writer:
+        writer.write_table(table)
+    if hasattr(target, 'seek'):
+        target.seek(0)
+    return target
+
+
 def format_portfolio_summary(df_portfolio, latest_prices):
     """
     מעצב סיכום פורטפוליו לתצוגה
@@ -62,16 +368,7 @@ def format_portfolio_summary(df_portfolio, latest_prices):
     if df_portfolio.empty:
         return pd.DataFrame()
     
-    # יצירת עותק
-    df_summary = df_portfolio.copy()
-    
-    # הוספת מחירים נוכחיים
-    df_summary['CurrentPrice'] = df_summary['Ticker'].map(latest_prices)
-    
-    # חישוב ערכים
-    df_summary['Invested'] = df_summary['EntryPrice'] * df_summary['Shares']
-    df_summary['CurrentValue'] = df_summary['CurrentPrice'] * df_summary['Shares']
-    df_summary['P&L ($)'] = df_summary['CurrentValue'] - df_summary['Invested']
-    df_summary['P&L (%)'] = (df_summary['P&L ($)'] / df_summary['Invested']) * 100
+    # שערוך וקטורי של כל העסקאות (core/valuation)
+    df_summary, _ = valuate(df_portfolio, latest_prices)
     
     return df_summary